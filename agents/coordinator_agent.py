@@ -4,10 +4,11 @@ import time
 import uuid
 import requests
 
-from infra.embedding import embed_text
+from infra.embedding import embed_text, mean_embedding
 from memory_bank.product_memory import ProductMemory
 from memory_bank.sentiment_memory import SentimentMemory
 from memory_bank.pricing_memory import PricingMemory
+from memory_bank.price_history import get_price_history
 
 from scrapers.logger import get_logger
 
@@ -88,6 +89,7 @@ class RemoteCoordinator:
         self.product_mem = ProductMemory()
         self.sentiment_mem = SentimentMemory()
         self.pricing_mem = PricingMemory()
+        self.price_history = get_price_history()
 
     # -----------------------------
     # Discover agent
@@ -149,9 +151,9 @@ class RemoteCoordinator:
         ).strip()
         product_emb = embed_text(product_text)
 
-        review_texts = [r.get("text", "") for r in reviews]
-        agg_review_text = " ".join(review_texts).strip()
-        agg_review_emb = embed_text(agg_review_text) if agg_review_text else None
+        # Running mean over per-review vectors, encoded chunk by chunk
+        review_texts = (r.get("text", "").strip() for r in reviews)
+        agg_review_emb = mean_embedding(t for t in review_texts if t)
 
         return product_emb, agg_review_emb
 
@@ -218,14 +220,27 @@ class RemoteCoordinator:
         return pricing, emb
 
     @trace_stage("MEMORY_INSIGHTS")
-    def stage_memory_insights(self, ctx, product_emb, sent_emb, pricing_emb):
+    def stage_memory_insights(self, ctx, product_id, product_emb, sent_emb):
         try:
             similar_products = self.product_mem.search(product_emb, top_k=5)
             recent_sentiments = self.sentiment_mem.search(sent_emb, top_k=5)
-            pricing_history = self.pricing_mem.search(pricing_emb, top_k=5)
         except Exception as e:
             ctx.log("[ERROR] Memory search", error=str(e))
-            return [], [], []
+            return [], [], {}
+
+        # This product's own price series, not prices that embed similarly
+        try:
+            recent = self.price_history.tail(product_id, 10)
+            pricing_history = {
+                "summary": self.price_history.summary(product_id, days=90),
+                "recent": [
+                    {"ts": t, "price": p, "recommended_price": r, "sentiment": s}
+                    for t, p, r, s in zip(*(recent[c].tolist() for c in ("ts", "price", "recommended", "sentiment")))
+                ],
+            }
+        except Exception as e:
+            ctx.log("[ERROR] Price history", error=str(e))
+            pricing_history = {}
 
         return similar_products, recent_sentiments, pricing_history
 
@@ -316,11 +331,11 @@ class RemoteCoordinator:
         sentiment, sent_emb = self.stage_sentiment(ctx, product, reviews)
 
         # Stage 5 → Pricing
-        pricing, pricing_emb = self.stage_pricing(ctx, product, reviews, sentiment)
+        pricing, _ = self.stage_pricing(ctx, product, reviews, sentiment)
 
         # Stage 6 → Memory Insights
         similar_products, recent_sentiments, pricing_history = self.stage_memory_insights(
-            ctx, product_emb, sent_emb, pricing_emb
+            ctx, product.get("product_id"), product_emb, sent_emb
         )
 
         ctx.log("[PIPELINE] END")
@@ -1,15 +1,29 @@
 import os
+import math
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, List
 from infra.embedding import embed_text
+from infra.pricing_rules import compute_recommended_price, compute_recommended_prices, batch_results
 from memory_bank.pricing_memory import PricingMemory
+from memory_bank.price_index import get_price_index, category_key
+from memory_bank.price_history import get_price_history
 from scrapers.logger import get_logger
 
 
 API_KEY = os.getenv("A2A_API_KEY", "secret")
-app = FastAPI(title="Pricing Agent")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # the index snapshots itself periodically; keep the last updates too
+    get_price_index().save()
+
+
+app = FastAPI(title="Pricing Agent", lifespan=lifespan)
 
 logger = get_logger("pricing_agent")
 
@@ -23,88 +37,6 @@ class PricingReq(BaseModel):
     reviews: List[Dict[str, Any]]
 
 
-# ------------------------------------------------------------
-# BUSINESS LOGIC
-# ------------------------------------------------------------
-
-def compute_recommended_price(
-    base_price: float,
-    competitor_prices: List[float],
-    positive_ratio: float
-) -> Dict[str, Any]:
-    import numpy as np
-
-    if not competitor_prices:
-        return {
-            "recommended_price": round(base_price, 2),
-            "competitor_average_price": None,
-            "sentiment_score": positive_ratio,
-            "business_reason": [
-                "No competitor pricing available – keeping current price."
-            ]
-        }
-
-    competitor_avg = float(np.mean(competitor_prices))
-
-    # SENTIMENT FACTOR
-    if positive_ratio >= 0.85:
-        sentiment_factor = 0.12
-    elif positive_ratio >= 0.70:
-        sentiment_factor = 0.05
-    else:
-        sentiment_factor = -0.03
-
-    # MARKET GAP
-    gap = (competitor_avg - base_price) / competitor_avg
-    competitor_adjust = gap * 0.40
-
-    # PROPOSED PRICE
-    new_price = base_price + competitor_adjust + (base_price * sentiment_factor)
-
-    # LIMIT
-    new_price = max(min(new_price, base_price * 1.20), base_price * 0.85)
-
-    # REASONS
-    reasons = []
-
-    if positive_ratio < 0.60:
-        reasons.append("Customer sentiment is neutral or weak – avoid aggressive pricing changes.")
-    elif positive_ratio > 0.80:
-        reasons.append("Customer sentiment is very strong – pricing can be more confident.")
-
-    if gap > 0.10:
-        if positive_ratio > 0.70:
-            reasons.append("Product is significantly underpriced relative to competitors – controlled price increase is justified.")
-        else:
-            reasons.append("Market price is significantly higher – but sentiment is weak, so keep adjustments conservative.")
-    elif gap > 0.02:
-        if positive_ratio > 0.70:
-            reasons.append("Slightly below competitor pricing with good sentiment – mild uplift acceptable.")
-        else:
-            reasons.append("Pricing slightly below competitors – better to maintain position until sentiment improves.")
-    elif abs(gap) <= 0.02:
-        if positive_ratio > 0.75:
-            reasons.append("Pricing matches market and sentiment is strong – small upward correction reasonable.")
-        else:
-            reasons.append("Pricing aligns with competitors – focus on strengthening sentiment.")
-    else:
-        if positive_ratio < 0.65:
-            reasons.append("Product priced above competitors with weak sentiment – consider slight reduction.")
-        else:
-            reasons.append("Product priced above competitors but sentiment strong – premium pricing acceptable.")
-
-    if not reasons:
-        reasons.append("Pricing adjustment generated based on market and sentiment factors.")
-
-    return {
-        "recommended_price": round(new_price, 2),
-        "competitor_average_price": round(competitor_avg, 2),
-        "sentiment_score": round(positive_ratio, 2),
-        "business_reason": reasons
-    }
-
-
-
 # ------------------------------------------------------------
 # MAIN ENDPOINT
 # ------------------------------------------------------------
@@ -114,6 +46,9 @@ def pricing_api(req: Dict[str, Any], x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
+    if req.get("task") == "recommend_price_batch":
+        return recommend_price_batch(req.get("input", {}))
+
     if req.get("task") != "recommend_price":
         return {"status": "error", "msg": "Unknown task"}
 
@@ -126,24 +61,33 @@ def pricing_api(req: Dict[str, Any], x_api_key: str = Header(None)):
         raise HTTPException(status_code=400, detail="Missing product_id")
 
     pricing_mem = PricingMemory()
+    price_index = get_price_index()
 
-    # Extract competitor prices from memory
+    title = product.get("title", "") or product.get("product_id")
+    category = product.get("category") or category_key(title)
+
+    # Competitor average straight from the category index; the index keeps
+    # the mean itself, so it stands in as the one "competitor price"
     competitor_prices = []
-    try:
-        # Use product title embedding for similarity
-        title = product.get("title", "") or product.get("product_id")
-        q_emb = embed_text(title)
+    competitor_avg = price_index.competitor_average(category, exclude=pid)
+    if competitor_avg is not None:
+        competitor_prices = [competitor_avg]
+    else:
+        # Too few known products in the category: nearest pricing memories
+        try:
+            # Use product title embedding for similarity
+            q_emb = embed_text(title)
 
-        search_results = pricing_mem.search(q_emb, top_k=10)
+            search_results = pricing_mem.search(q_emb, top_k=10)
 
-        for r in search_results:
-            meta = r["record"]["metadata"]
-            cp = meta.get("base_price") or meta.get("recommended_price")
-            if cp:
-                competitor_prices.append(cp)
+            for r in search_results:
+                meta = r["record"]["metadata"]
+                cp = meta.get("base_price") or meta.get("recommended_price")
+                if cp:
+                    competitor_prices.append(cp)
 
-    except Exception as e:
-        logger.exception(f"[ERROR] Failed loading competitor memory: {e}")
+        except Exception as e:
+            logger.exception(f"[ERROR] Failed loading competitor memory: {e}")
 
     # Extract positive ratio from sentiment agent (or baseline)
     # If sentiment not present, assume neutral 50%
@@ -155,7 +99,10 @@ def pricing_api(req: Dict[str, Any], x_api_key: str = Header(None)):
             positive_ratio = max(0.1, min(0.9, score / 5))
 
     # Base price – if missing, fallback
-    base_price = product.get("price") or product.get("base_price") or 100.0
+    listed_price = product.get("price") or product.get("base_price")
+    base_price = listed_price or 100.0
+    # the parser's placeholder and the fallback above are not market prices
+    price_placeholder = bool(product.get("price_placeholder")) or not listed_price
 
     result = compute_recommended_price(
         base_price=base_price,
@@ -170,15 +117,77 @@ def pricing_api(req: Dict[str, Any], x_api_key: str = Header(None)):
             pid,
             {"recommended_price": result["recommended_price"],
              "base_price": base_price,
+             "price_placeholder": price_placeholder,
              "positive_ratio": positive_ratio},
             embedding=emb
         )
     except Exception as e:
         logger.exception(f"[ERROR] Failed saving pricing memory: {e}")
 
+    # placeholder prices stay out of the category index and the price history
+    if not price_placeholder:
+        price_index.update(category, pid, base_price)
+        try:
+            get_price_history().record(pid, base_price, result["recommended_price"], positive_ratio)
+        except OSError as e:
+            logger.exception(f"[ERROR] Failed recording price history: {e}")
+
     return {"status": "ok", "result": result}
 
 
+def _finite(value, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{what} must be a finite number, got {value!r}")
+    return float(value)
+
+
+def _batch_inputs(items: List[Any]):
+    """Columns for compute_recommended_prices; ValueError names the first bad item."""
+    base_prices, competitors, ratios = [], [], []
+    for i, it in enumerate(items):
+        try:
+            if not isinstance(it, dict):
+                raise ValueError(f"expected an object, got {type(it).__name__}")
+            base = it.get("base_price")
+            base_prices.append(_finite(base, "base_price") if base else 100.0)
+            comps = it.get("competitor_prices") or []
+            if not isinstance(comps, list):
+                raise ValueError("competitor_prices must be a list")
+            competitors.append([_finite(c, "competitor price") for c in comps])
+            ratios.append(_finite(it.get("positive_ratio", 0.50), "positive_ratio"))
+        except ValueError as e:
+            raise ValueError(f"item {i}: {e}")
+    return base_prices, competitors, ratios
+
+
+def recommend_price_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Price many products in one call. Input: {"items": [{"product_id",
+    "base_price", "competitor_prices", "positive_ratio"}, ...]}, with the
+    competitors and sentiment already known – nothing is looked up in or
+    written to pricing memory.
+    """
+    items = payload.get("items")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Missing items")
+
+    try:
+        base_prices, competitors, ratios = _batch_inputs(items)
+        batch = compute_recommended_prices(
+            base_prices=base_prices,
+            competitor_matrix=competitors,
+            positive_ratios=ratios,
+        )
+    except (TypeError, ValueError, ZeroDivisionError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid items: {e}")
+
+    results = batch_results(batch)
+    for it, result in zip(items, results):
+        result["product_id"] = it.get("product_id")
+
+    return {"status": "ok", "result": results}
+
+
 # ------------------------------------------------------------
 # AGENT CARD
 # ------------------------------------------------------------
@@ -190,7 +199,7 @@ def agent_card():
         "name": "pricing_agent",
         "version": "0.3.0",
         "description": "Competitive AI pricing model agent",
-        "capabilities": ["recommend_price"],
+        "capabilities": ["recommend_price", "recommend_price_batch"],
         "url": base
     }
 
@@ -1,17 +1,47 @@
-import uvicorn, os, json
+import uvicorn, os, json, asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
 from memory_bank.product_memory import ProductMemory
 from infra.embedding import embed_text
-from scrapers.product_page import scrape_product_page
+from scrapers.product_page import scrape_product_page_async, PRODUCT_SPEC
 from scrapers.review_page import scrape_product_reviews_async
 from scrapers.search_page import scrape_search_results
+from scrapers.browser_pool import start_browser_pool, stop_browser_pool, get_browser_pool
+from scrapers.parse_pool import start_parse_pool, stop_parse_pool, get_parse_pool
 from scrapers.logger import get_logger
+from infra.util import close_async_clients, get_http_cache, domain_stats, stream_stats
+from infra.proxy_pool import get_proxy_pool
 
 logger = get_logger("scraper_agent")
+get_logger("proxy_pool")  # structured output for infra.proxy_pool's messages
 
 API_KEY = os.getenv("A2A_API_KEY", "secret")
-app = FastAPI(title="Scraper Agent (A2A + MCP)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Shared scrape resources live as long as the agent process."""
+    try:
+        await start_browser_pool()
+    except Exception as e:
+        logger.warning(f"[POOL] Browser pool unavailable, Playwright fallbacks launch per URL ({e})")
+
+    # HTML parsing is CPU-bound; keep it off the event loop
+    start_parse_pool()
+
+    yield
+
+    await stop_browser_pool()
+    stop_parse_pool()
+    await close_async_clients()
+
+    proxy_pool = get_proxy_pool()
+    if proxy_pool:
+        proxy_pool.save()
+
+
+app = FastAPI(title="Scraper Agent (A2A + MCP)", lifespan=lifespan)
 
 class A2AReq(BaseModel):
     task: str
@@ -24,16 +54,28 @@ class FetchReviewsReq(BaseModel):
     product_id: str
     page: int = 1
 
-def handle_real_amazon_scrape(url: str):
+def store_product(product: dict):
+    """Embed + persist (blocking; run off the event loop)."""
+    pm = ProductMemory()
+    vector = embed_text(json.dumps(product, ensure_ascii=False))
+    pm.save(
+        key=product["product_id"],
+        metadata=product,
+        embedding=vector
+        )
+
+
+async def handle_real_amazon_scrape(url: str):
     """Scrape Amazon product page and persist to vector memory."""
     # 1. scrape
     logger.info(f"[PRODUCT] Begin scrape: {url}")
     
-    data = scrape_product_page(url)
+    data = await scrape_product_page_async(url)
     product = {
         "product_id": data.get("product_id"),
         "title": data.get("title"),
         "price": data.get("price"),
+        "price_placeholder": data.get("price_placeholder", False),
         "rating": data.get("rating"),
         "rating_raw": data.get("rating_raw"),
         "marketplace": "amazon",
@@ -41,19 +83,13 @@ def handle_real_amazon_scrape(url: str):
         }
     
     # 2. Store in vector memory
-    pm = ProductMemory()
-    vector = embed_text(json.dumps(product, ensure_ascii=False))
-    pm.save(
-        key=product["product_id"],
-        metadata=product,
-        embedding=vector
-        )
+    await asyncio.to_thread(store_product, product)
     
     logger.info(f"[PRODUCT] Stored: {product['product_id']}")
     return product
 
 
-def handle_mock_scrape(url: str):
+async def handle_mock_scrape(url: str):
     """Fallback old mock behavior for non-Amazon targets."""
     import random
     
@@ -69,28 +105,22 @@ def handle_mock_scrape(url: str):
         "base_price": 1999.0 + random.choice([-50, 0, 50])
         }
     
-    pm = ProductMemory()
-    vector = embed_text(json.dumps(mock, ensure_ascii=False))
-    pm.save(
-        key=mock["product_id"],
-        metadata=mock,
-        embedding=vector
-        )
+    await asyncio.to_thread(store_product, mock)
     
     logger.info(f"[PRODUCT] Stored MOCK: {pid}")
     return mock
 
 
 @app.post("/fetch_product_page")
-def fetch_product_page(req: FetchProductReq):
+async def fetch_product_page(req: FetchProductReq):
     url = req.url.lower()
     
     if "amazon." in url:
-        product = handle_real_amazon_scrape(req.url)
+        product = await handle_real_amazon_scrape(req.url)
         return {"status": "ok", "product": product}
     
     # fallback to mock for anything else
-    product = handle_mock_scrape(req.url)
+    product = await handle_mock_scrape(req.url)
     return {"status": "ok", "product": product}
 
 
@@ -129,7 +159,7 @@ async def a2a_execute(req: A2AReq, x_api_key: str = Header(None)):
     
     if req.task == "fetch_product_page":
         url = req.input.get("url")
-        return fetch_product_page(FetchProductReq(url=url))
+        return await fetch_product_page(FetchProductReq(url=url))
 
     if req.task == "fetch_reviews":
         pid = req.input.get("product_id")
@@ -149,6 +179,25 @@ async def a2a_execute(req: A2AReq, x_api_key: str = Header(None)):
     return {"status": "error", "msg": "unknown task"}
 
 
+@app.get("/metrics")
+def metrics():
+    cache = get_http_cache()
+    pool = get_browser_pool()
+    parse_pool = get_parse_pool()
+    proxy_pool = get_proxy_pool()
+    return {
+        "http_cache": cache.stats() if cache else None,
+        "browser_pool": pool.stats() if pool else None,
+        "parse_pool": parse_pool.stats() if parse_pool else None,
+        # per-domain adaptive rate, block rate and circuit state
+        "domains": domain_stats(),
+        "proxies": proxy_pool.stats() if proxy_pool else None,
+        "streaming": stream_stats(),
+        # which product page selectors produce values (counted here, whichever process parsed)
+        "extraction": PRODUCT_SPEC.stats(),
+    }
+
+
 @app.get("/.well-known/agent-card.json")
 def agent_card():
     base = os.getenv("AGENT_BASE_URL", "http://localhost:8001")
@@ -1,25 +1,115 @@
 from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
-from sklearn.linear_model import LogisticRegression
 from memory_bank.sentiment_memory import SentimentMemory
-from infra.embedding import embed_text
+from memory_bank.review_prediction_store import ReviewPredictionStore, review_hash
+from infra.embedding import get_embedder, iter_chunks, iter_embeddings, DEFAULT_CHUNK_SIZE
+from infra.issue_tagger import get_issue_tagger, top_issues
+from infra.sentiment_model import (
+    BatchPredictor, load_or_bootstrap, REVIEW_INDEX_PATH, REVIEW_METADATA_PATH
+)
+from scrapers.logger import get_logger
 import numpy as np
 import uvicorn, os, json
 
 API_KEY = os.getenv("A2A_API_KEY", "secret")
 app = FastAPI(title="Sentiment Agent (A2A)")
 
+logger = get_logger("sentiment_agent")
+
 class A2AReq(BaseModel):
     task: str
     input: dict
 
-# Static embedder + toy model
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-X = embedder.encode(["good","excellent","bad","terrible"])
-y = [1,1,0,0]
-clf = LogisticRegression()
-clf.fit(X,y)
+# Shared embedder + persisted classifier (train with `python -m infra.sentiment_model`)
+embedder = get_embedder()
+model = load_or_bootstrap(logger=logger)
+predictor = BatchPredictor(model)
+prediction_store = ReviewPredictionStore()
+logger.info(f"[MODEL] Loaded sentiment model {json.dumps(model.info())}")
+
+
+def rating_label(rating):
+    """Rated reviews become training data: 4-5 stars positive, 1-2 negative."""
+    if rating is None:
+        return None
+    if rating >= 4:
+        return 1
+    if rating <= 2:
+        return 0
+    return None
+
+
+def store_labeled_reviews(product_id, reviews, embs):
+    keys, metas, vecs = [], [], []
+    for r, emb in zip(reviews, embs):
+        label = rating_label(r.get("rating"))
+        if label is None:
+            continue
+        keys.append(product_id)
+        metas.append({"label": label, "rating": r.get("rating")})
+        vecs.append(emb)
+
+    if not keys:
+        return
+
+    try:
+        SentimentMemory(
+            index_path=REVIEW_INDEX_PATH, metadata_path=REVIEW_METADATA_PATH
+        ).save_batch(keys, metas, embeddings=np.vstack(vecs))
+    except Exception as e:
+        logger.exception(f"[ERROR] Failed saving labeled reviews: {e}")
+
+
+def classify_reviews(product_id, reviews):
+    """
+    Label every review, encoding only the ones the prediction store has not
+    seen under the current model version. New reviews are encoded, classified
+    and persisted one chunk at a time so memory stays bounded.
+    Returns (hashes, labels, n_computed).
+    """
+    hashes = [review_hash(r) for r in reviews]
+    known = prediction_store.get_many(set(hashes), model.model_version)
+
+    new_hashes, new_reviews, pending = [], [], set()
+    for h, r in zip(hashes, reviews):
+        if h not in known and h not in pending:
+            pending.add(h)
+            new_hashes.append(h)
+            new_reviews.append(r)
+
+    for start in range(0, len(new_reviews), DEFAULT_CHUNK_SIZE):
+        chunk = new_reviews[start:start + DEFAULT_CHUNK_SIZE]
+        chunk_hashes = new_hashes[start:start + DEFAULT_CHUNK_SIZE]
+
+        embs = np.asarray(embedder.encode([r.get("text", "") for r in chunk]), dtype="float32")
+        labels = predictor.predict(embs)
+        prediction_store.put_many(
+            product_id, chunk_hashes, labels, model.model_version, embeddings=embs
+        )
+        store_labeled_reviews(product_id, chunk, embs)
+        known.update(zip(chunk_hashes, (int(l) for l in labels)))
+
+    labels = np.asarray([known[h] for h in hashes], dtype="int64")
+    return hashes, labels, len(new_reviews)
+
+
+def backfill_review_vectors(product_id, hashes, reviews):
+    """
+    Embed the reviews whose stored prediction has no vector (stored before
+    vectors were kept, or the sidecar write was lost) and keep the vectors,
+    so the product vector is the mean over every review.
+    """
+    missing = set(prediction_store.missing_vectors(hashes))
+    if not missing:
+        return
+    texts = {}
+    for h, r in zip(hashes, reviews):
+        if h in missing and h not in texts:
+            texts[h] = r.get("text", "")
+    todo = list(texts)
+    for chunk, embs in zip(iter_chunks(todo), iter_embeddings(texts[h] for h in todo)):
+        prediction_store.put_vectors(product_id, chunk, embs)
+
 
 @app.post("/a2a/execute")
 def a2a_execute(req: A2AReq, x_api_key: str = Header(None)):
@@ -35,7 +125,9 @@ def a2a_execute(req: A2AReq, x_api_key: str = Header(None)):
             result = {
                 "n_reviews": 0,
                 "positive_ratio": 0.0,
-                "top_issues": []
+                "top_issues": [],
+                "issue_counts": {},
+                "issue_frequencies": {}
             }
 
             sm = SentimentMemory()
@@ -46,24 +138,27 @@ def a2a_execute(req: A2AReq, x_api_key: str = Header(None)):
 
             return {"status":"ok","result": result}
 
-        embs = embedder.encode(texts)
-        preds = clf.predict(embs)
-        pos_ratio = float(preds.mean())
-        
-        issues = []
-        for t in texts:
-            if "ship" in t.lower():
-                issues.append("shipping")
+        hashes, labels, n_computed = classify_reviews(product_id, reviews)
+        pos_ratio = float(labels.mean())
+
+        issues = get_issue_tagger().summarize(texts)
 
         result = {
             "n_reviews": len(texts),
             "positive_ratio": pos_ratio,
-            "top_issues": list(set(issues))
+            "top_issues": top_issues(issues["counts"]),
+            "issue_counts": issues["counts"],
+            "issue_frequencies": issues["frequencies"],
+            "model_version": model.model_version,
+            "reviews_computed": n_computed,
+            "reviews_from_store": len(reviews) - n_computed
         }
 
         # SAVE TO VECTOR MEMORY (FAISS)
         sm = SentimentMemory()
-        vector = embed_text("\n".join(texts))
+        # Mean of the per-review vectors: reflects every review, no re-encoding
+        backfill_review_vectors(product_id, hashes, reviews)
+        vector = prediction_store.mean_vector(hashes)
         sm.save(
             key=product_id,
             metadata=result,
@@ -83,6 +178,7 @@ def card():
         "description": "Sentiment Agent",
         "capabilities": ["analyze_reviews"],
         "url": base,
+        "model": model.info(),
         "securitySchemes": {"x-api-key":{"type":"apiKey"}}
     }
 
@@ -0,0 +1,71 @@
+"""
+Issue tagging benchmark: compiled single-pass tagger vs the per-review,
+per-category loop it replaced.
+
+    python -m benchmarks.bench_issue_tagger --n 100000
+"""
+import re
+import time
+import random
+import argparse
+
+from infra.issue_tagger import IssueTagger, ISSUE_CATEGORIES
+
+SAMPLE_REVIEWS = [
+    "Amazing performance. Runs all modern titles at 4K perfectly.",
+    "Very good card but a little expensive compared to competitors.",
+    "Silent fans and low temperature. Perfect for long sessions.",
+    "Good performance, but coil whine is noticeable.",
+    "Unit arrived damaged and the seller was slow to respond.",
+    "Died after 2 weeks, very disappointing.",
+    "Good card but power consumption is too high.",
+    "Shipping slow, packaging damaged",
+    "Driver issues sometimes, black screen on wake.",
+    "Excellent upgrade over my 4080 — VR and rendering are superb.",
+]
+
+
+def naive_tag(texts, categories):
+    """One regex search per (review, category) pair."""
+    compiled = {
+        name: [re.compile(re.escape(p.rstrip("*")), re.I) for p in phrases]
+        for name, phrases in categories.items()
+    }
+    counts = {name: 0 for name in categories}
+    for t in texts:
+        for name, pats in compiled.items():
+            if any(p.search(t) for p in pats):
+                counts[name] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [
+        f"{rng.choice(SAMPLE_REVIEWS)} {rng.choice(SAMPLE_REVIEWS)}" for _ in range(args.n)
+    ]
+
+    tagger = IssueTagger()
+
+    start = time.perf_counter()
+    summary = tagger.summarize(texts)
+    fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive_tag(texts, ISSUE_CATEGORIES)
+    slow = time.perf_counter() - start
+
+    print(f"reviews: {args.n:,}  categories: {len(ISSUE_CATEGORIES)}")
+    print(f"compiled tagger : {fast:.3f}s  ({args.n / fast:,.0f} reviews/s)")
+    print(f"per-review loop : {slow:.3f}s  ({args.n / slow:,.0f} reviews/s)")
+    print(f"speedup         : {slow / fast:.1f}x")
+    print(f"counts          : {summary['counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+HTML parsing benchmark: pages/sec (single core) for each installed parser
+backend, plus a check that every backend extracts exactly what
+html.parser extracts.
+
+Saved pages can be dropped into a fixtures directory; the file name prefix
+picks the parser (product*.html, reviews*.html, search*.html):
+
+    python -m benchmarks.bench_parsers --fixtures path/to/saved_pages
+    python -m benchmarks.bench_parsers            # synthetic ~300 KB pages
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+from scrapers import html_backend
+from scrapers.product_page import _parse_with_bs
+from scrapers.review_page import parse_reviews_from_html
+from scrapers.search_page import parse_search_html
+
+
+def _noise(n_blocks: int) -> str:
+    # Amazon pages are mostly deeply nested layout/markup we never read
+    block = (
+        "<div class='a-section a-spacing-small'><div class='a-row'>"
+        "<span class='a-size-base a-color-secondary'>Lorem ipsum dolor sit amet</span>"
+        "<a class='a-link-normal' href='/gp/help'>Help</a>"
+        "<ul class='a-unordered-list'><li><span>Item</span></li><li><span>Item</span></li></ul>"
+        "<span class='a-icon-alt-not'>decoy</span></div></div>"
+    )
+    return block * n_blocks
+
+
+def synthetic_pages():
+    product = f"""<html><head><title>x</title></head><body>{_noise(600)}
+    <div id="centerCol"><h1><span id="productTitle"> Synthetic RTX 4090 24GB </span></h1>
+    <span class="a-price"><span class="a-offscreen">$1,799.99</span></span>
+    <span data-hook="rating-out-of-text">4.7 out of 5</span>
+    <span id="acrCustomerReviewText">2,311 ratings</span></div>
+    {_noise(600)}<table><tr><th> ASIN </th><td> B0SYNTH001 </td></tr></table></body></html>"""
+
+    reviews = "<html><body>" + _noise(300) + "".join(
+        f"""<div data-hook="review"><i data-hook="review-star-rating"><span>{i % 5 + 1}.0 out of 5 stars</span></i>
+        <span data-hook="review-body"><span>Review {i}: solid card, <b>quiet</b> fans.</span></span></div>{_noise(20)}"""
+        for i in range(10)
+    ) + "</body></html>"
+
+    search = "<html><body>" + "".join(
+        f'<div data-asin="B0SRCH{i:04d}" class="s-result-item">{_noise(12)}</div>' for i in range(60)
+    ) + "</body></html>"
+
+    return [("product", product), ("reviews", reviews), ("search", search)]
+
+
+def load_fixtures(directory: str):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        name = os.path.basename(path)
+        kind = next((k for k in ("product", "reviews", "search") if name.startswith(k)), None)
+        if kind:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((kind, f.read()))
+    return pages
+
+
+def extract(kind: str, html: str):
+    if kind == "product":
+        return _parse_with_bs(html, "https://www.amazon.com/gp/fixture")
+    if kind == "reviews":
+        return parse_reviews_from_html(html)
+    return parse_search_html(html)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=None, help="directory of saved *.html pages")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures) if args.fixtures else synthetic_pages()
+    if not pages:
+        print("No fixtures found")
+        return 1
+
+    total_kb = sum(len(h) for _, h in pages) / 1024
+    print(f"pages: {len(pages)}  avg size: {total_kb / len(pages):.0f} KB  rounds: {args.rounds}")
+
+    html_backend.HTML_PARSER_BACKEND = "html.parser"
+    baseline = [extract(k, h) for k, h in pages]
+
+    mismatched = 0
+    for backend in html_backend.BACKENDS:
+        if not html_backend._installed(backend):
+            print(f"{backend:12s}: not installed")
+            continue
+
+        html_backend.HTML_PARSER_BACKEND = backend
+        outputs = [extract(k, h) for k, h in pages]
+        same = outputs == baseline
+        mismatched += not same
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for kind, html in pages:
+                extract(kind, html)
+        elapsed = time.perf_counter() - start
+
+        n = args.rounds * len(pages)
+        print(f"{backend:12s}: {n / elapsed:8.1f} pages/sec/core  identical output: {same}")
+
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Batch pricing benchmark: compute_recommended_prices over a synthetic
+portfolio vs. compute_recommended_price called once per SKU.
+
+SKUs get 0–12 competitor prices (ragged lists), prices with 0–3 decimals
+(many exact .xx5 ties for the rounding) and ratios across every sentiment
+band. The scalar loop is timed on a sample and extrapolated; every sampled
+SKU must come out identical in both, reasons included.
+
+    python -m benchmarks.bench_pricing --n 1000000 --sample 50000
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from infra.pricing_rules import compute_recommended_price, compute_recommended_prices, batch_results
+
+
+def portfolio(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    decimals = rng.integers(0, 4, n)
+    base = np.round(rng.uniform(5, 2500, n), 3)
+    base = np.array([round(b, int(d)) for b, d in zip(base.tolist(), decimals.tolist())])
+    ratios = np.round(rng.uniform(0.1, 0.9, n), rng.integers(1, 4))
+
+    counts = rng.choice(13, n, p=[0.1] + [0.075] * 12)
+    # competitors priced around the SKU: under-, matched and overpriced
+    spread = rng.choice([0.7, 0.95, 1.0, 1.05, 1.3], counts.sum())
+    flat = np.round(np.repeat(base, counts) * spread * rng.uniform(0.97, 1.03, counts.sum()), 2)
+    competitors = np.split(flat, np.cumsum(counts)[:-1])
+    return base, [c.tolist() for c in competitors], ratios
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=50_000, help="SKUs priced with the scalar function")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    base, competitors, ratios = portfolio(args.n, args.seed)
+
+    start = time.perf_counter()
+    batch = compute_recommended_prices(base, competitors, ratios)
+    batch_wall = time.perf_counter() - start
+
+    # same portfolio with competitors already in a NaN-padded matrix
+    matrix = np.full((args.n, max(map(len, competitors))), np.nan)
+    for i, c in enumerate(competitors):
+        matrix[i, :len(c)] = c
+    start = time.perf_counter()
+    compute_recommended_prices(base, matrix, ratios)
+    matrix_wall = time.perf_counter() - start
+
+    sample = min(args.sample, args.n)
+    base_list, ratio_list = base.tolist(), ratios.tolist()
+    start = time.perf_counter()
+    scalar = [compute_recommended_price(base_list[i], competitors[i], ratio_list[i]) for i in range(sample)]
+    scalar_wall = (time.perf_counter() - start) * args.n / sample
+
+    head = {k: v[:sample] for k, v in batch.items()}
+    mismatches = sum(a != b for a, b in zip(batch_results(head), scalar))
+
+    print(f"SKUs: {args.n:,}  (scalar timed on {sample:,}, extrapolated)")
+    print(f"scalar loop : {scalar_wall:8.2f}s  {args.n / scalar_wall:12,.0f} SKUs/s")
+    print(f"batch       : {batch_wall:8.2f}s  {args.n / batch_wall:12,.0f} SKUs/s  "
+          f"({scalar_wall / batch_wall:.0f}x, competitor lists)")
+    print(f"batch       : {matrix_wall:8.2f}s  {args.n / matrix_wall:12,.0f} SKUs/s  "
+          f"({scalar_wall / matrix_wall:.0f}x, competitor matrix)")
+    print(f"mismatches in sample: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
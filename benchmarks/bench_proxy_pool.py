@@ -0,0 +1,129 @@
+"""
+Proxy pool benchmark against local stand-in proxies.
+
+Each stand-in is an HTTP proxy that answers every request itself after a
+configurable delay. Per pool size N there are N healthy proxies plus one
+that always serves robot-check pages and one address nobody listens on.
+Requests are fired concurrently through async_smart_get; the report shows
+throughput per pool size and how the pool spread (and quarantined) load.
+
+    python -m benchmarks.bench_proxy_pool --requests 120 --sizes 1,2,4,8
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+TARGET = "http://shop.stand-in/dp/B0PROXY001"
+PAGE = "<html><body><span id='productTitle'>Stand-in</span>" + "<p>filler</p>" * 400 + "</body></html>"
+ROBOT = "<html><body>Robot Check: enter the characters you see below</body></html>"
+
+
+def make_proxy(latency: float, blocked: bool) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            data = (ROBOT if blocked else PAGE).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dead_address() -> str:
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return f"http://127.0.0.1:{port}"
+
+
+async def fire(n: int):
+    from infra.util import async_smart_get, close_async_clients
+
+    ok = 0
+
+    async def one():
+        nonlocal ok
+        try:
+            resp = await async_smart_get(TARGET, retries=3)
+            ok += "productTitle" in resp.text
+        except Exception:
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    wall = time.perf_counter() - start
+    await close_async_clients()
+    return wall, ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--sizes", default="1,2,4,8", help="healthy proxies per run")
+    parser.add_argument("--latency", type=float, default=0.1, help="stand-in proxy delay (s)")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests/s per host and proxy")
+    args = parser.parse_args()
+
+    # Per-proxy politeness: throughput can only grow by adding exits
+    os.environ["SCRAPE_HOST_RATE"] = str(args.rate)
+    os.environ["SCRAPE_HOST_MAX_RATE"] = str(args.rate)
+    os.environ["SCRAPE_HOST_BURST"] = "1"
+    os.environ["SCRAPE_HOST_CONCURRENCY"] = "2"
+    os.environ["HTTP_CACHE"] = "0"
+
+    from infra.proxy_pool import ProxyPool, set_proxy_pool
+
+    scores = os.path.join(tempfile.mkdtemp(), "proxy_scores.json")
+    failed = False
+    for size in (int(s) for s in args.sizes.split(",")):
+        healthy = [make_proxy(args.latency, blocked=False) for _ in range(size)]
+        robot = make_proxy(args.latency, blocked=True)
+        urls = [f"http://127.0.0.1:{p.server_port}" for p in healthy + [robot]] + [dead_address()]
+
+        pool = ProxyPool(urls, path=scores)
+        set_proxy_pool(pool)
+        wall, ok = asyncio.run(fire(args.requests))
+        pool.save()
+
+        print(f"\nhealthy proxies: {size}  requests: {args.requests}  ok: {ok}  "
+              f"wall: {wall:.2f}s  → {ok / wall:.1f} pages/s")
+        for label, st in pool.stats().items():
+            kind = "robot" if label.endswith(str(robot.server_port)) else \
+                   "dead" if label == urls[-1] else "healthy"
+            print(f"  {label:24s} {kind:8s} requests={st['requests']:4d} ok={st['successes']:4d} "
+                  f"blocks={st['blocks']:3d} errors={st['failures']:3d} "
+                  f"latency={st['latency']:.3f}s quarantined_for={st['quarantined_for']}s")
+        failed |= ok != args.requests
+
+        for p in healthy + [robot]:
+            p.shutdown()
+
+    # Scores (and quarantines) survive a restart
+    with open(scores, "r", encoding="utf-8") as f:
+        saved = json.load(f)["proxies"]
+    reloaded = ProxyPool(list(saved), path=scores).stats()
+    benched = [label for label, st in reloaded.items() if st["quarantined_for"] > 0]
+    print(f"\nreloaded {len(reloaded)} proxies from {scores}, still quarantined: {len(benched)}")
+
+    set_proxy_pool(None)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
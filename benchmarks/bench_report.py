@@ -0,0 +1,190 @@
+"""
+Report generation benchmark on synthetic merged catalogues: the stages of
+generate_report (read, build_dfs, charts, cards) and the whole run, with
+build_dfs and card rendering compared to the former dict-per-record /
+iterrows path. Both must produce the same frame and the same HTML.
+
+Then a nightly run: `--changed` of the records are edited, removed or
+added, and an incremental build (single page and --pages) is timed
+against a full one; the files written must be identical.
+
+    python -m benchmarks.bench_report --sizes 10000,100000 --changed 0.02
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import random
+import filecmp
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import generate_report_html as report
+
+REASONS = [
+    "Customer sentiment is very strong – pricing can be more confident.",
+    "Product is significantly underpriced relative to competitors – controlled price increase is justified.",
+    "No competitor pricing available – keeping current price.",
+    "Customer sentiment is weak – slight discount recommended.",
+]
+
+
+def catalogue(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.uniform(100, 2500, n), 2)
+    has_comp = rng.random(n) < 0.8
+    comp = np.round(price * rng.uniform(0.8, 1.3, n), 2)
+    for i in range(n):
+        yield {"key": f"B{i:09d}", "metadata": {
+            "product_id": f"B{i:09d}",
+            "title": f"GeForce RTX {rng.choice([3060, 3090, 4070, 4090])} Gaming OC {i}",
+            "price": float(price[i]),
+            "rating": float(np.round(rng.uniform(3, 5), 1)),
+            "marketplace": "amazon",
+            "url": f"https://www.amazon.com/dp/B{i:09d}",
+            "recommended_price": float(np.round(price[i] * rng.uniform(0.85, 1.2), 2)),
+            "base_price": float(price[i]),
+            "positive_ratio": float(np.round(rng.uniform(0, 1), 2)),
+            "competitor_average_price": float(comp[i]) if has_comp[i] else None,
+            "business_reason": [REASONS[j] for j in rng.choice(4, rng.integers(1, 4), replace=False)],
+            "n_reviews": int(rng.integers(0, 500)),
+            "top_issues": [],
+        }}
+
+
+def build_dfs_rowwise(records):
+    """build_dfs before the columnar rewrite: a dict per record, then a frame from the list."""
+    products = []
+    for rec in records:
+        meta = rec.get("metadata", {})
+        comp = meta.get("competitor_average_price")
+        products.append({
+            "key": rec.get("key") or meta.get("product_id"),
+            "title": meta.get("title") or "Unknown title",
+            "marketplace": meta.get("marketplace"),
+            "url": meta.get("url"),
+            "price": float(meta.get("price") or 0.0),
+            "rating": meta.get("rating"),
+            "reviews_count": meta.get("n_reviews") or 0,
+            "positive_ratio": float(meta.get("positive_ratio") or 0.0),
+            "recommended_price": float(meta.get("recommended_price") or 0.0),
+            "competitor_average_price": float(comp) if comp not in (None, "null") else None,
+            "business_reason": meta.get("business_reason", []),
+        })
+    return pd.DataFrame(products)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(n: int, seed: int, tmp: str) -> int:
+    merged = os.path.join(tmp, f"merged-{n}.jsonl")
+    with open(merged, "w", encoding="utf-8") as f:
+        for rec in catalogue(n, seed):
+            f.write(json.dumps(rec) + "\n")
+
+    records, t_read = timed(report.read_jsonl, merged)
+    df, t_build = timed(report.build_dfs, records)
+    ref, t_build_ref = timed(build_dfs_rowwise, records)
+    _, t_charts = timed(report.render_charts, df, cache_dir=None)
+    ordered = df.sort_values("recommended_price", ascending=False)
+    cards, t_cards = timed(report.render_product_cards, ordered)
+    ref_cards, t_cards_ref = timed(lambda: [report.render_product_card(r) for _, r in ordered.iterrows()])
+
+    _, t_total = timed(report.generate_report, merged, os.path.join(tmp, "report.html"), cache_dir=None)
+
+    same_frame = df.equals(ref)
+    same_cards = cards == ref_cards
+    print(f"\n{n:,} products")
+    print(f"  read_jsonl        : {t_read:7.2f}s")
+    print(f"  build_dfs         : {t_build:7.2f}s   (dict per record: {t_build_ref:.2f}s)")
+    print(f"  charts            : {t_charts:7.2f}s")
+    print(f"  cards, all rows   : {t_cards:7.2f}s   (iterrows: {t_cards_ref:.2f}s)")
+    print(f"  generate_report   : {t_total:7.2f}s")
+    print(f"  same frame: {same_frame}  same cards: {same_cards}")
+    return 0 if same_frame and same_cards else 1
+
+
+def change(path: str, fraction: float, seed: int):
+    """Reprice `fraction` of the records; a tenth of that is removed and as many are added."""
+    rng = random.Random(seed)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    out = []
+    for line in lines:
+        r = rng.random()
+        if r < fraction * 0.8:
+            rec = json.loads(line)
+            rec["metadata"]["recommended_price"] = round(rec["metadata"]["recommended_price"] * rng.uniform(0.9, 1.1), 2)
+            out.append(json.dumps(rec))
+        elif r >= fraction * 0.9:
+            out.append(line)
+    for j in range(int(len(lines) * fraction * 0.1)):
+        rec = json.loads(rng.choice(lines))
+        rec["key"] = rec["metadata"]["product_id"] = f"N{seed}-{j}"
+        out.insert(rng.randrange(len(out) + 1), json.dumps(rec))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+
+
+def same_files(a: str, b: str) -> bool:
+    names = sorted(os.listdir(a))
+    return names == sorted(os.listdir(b)) and all(
+        filecmp.cmp(os.path.join(a, n), os.path.join(b, n), shallow=False) for n in names)
+
+
+def run_incremental(n: int, seed: int, tmp: str, fraction: float) -> int:
+    merged = os.path.join(tmp, f"nightly-{n}.jsonl")
+    with open(merged, "w", encoding="utf-8") as f:
+        for rec in catalogue(n, seed):
+            f.write(json.dumps(rec) + "\n")
+
+    failed = 0
+    print(f"\n{n:,} products, {fraction:.0%} changed")
+    for label, page_size in (("single page", None), ("--pages", report.PAGE_SIZE)):
+        full_dir, inc_dir = os.path.join(tmp, f"full-{n}-{label}"), os.path.join(tmp, f"inc-{n}-{label}")
+        os.makedirs(full_dir)
+        os.makedirs(inc_dir)
+        full_out, inc_out = os.path.join(full_dir, "report.html"), os.path.join(inc_dir, "report.html")
+        with open(merged, "r", encoding="utf-8") as f:
+            original = f.read()
+
+        charts = os.path.join(tmp, "charts")
+        report.generate_report(merged, inc_out, page_size=page_size, incremental=True, cache_dir=charts)  # last night's
+        change(merged, fraction, seed)
+        _, t_full = timed(report.generate_report, merged, full_out, page_size=page_size, cache_dir=None)
+        _, t_inc = timed(report.generate_report, merged, inc_out, page_size=page_size, incremental=True, cache_dir=charts)
+        same = same_files(full_dir, inc_dir)
+        failed |= not same
+        print(f"  {label:<12}: full {t_full:6.2f}s  incremental {t_inc:6.2f}s  ({t_inc / t_full:.0%})  same output: {same}")
+
+        with open(merged, "w", encoding="utf-8") as f:
+            f.write(original)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--changed", type=float, default=0.02, help="fraction of records changed for the nightly run")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        # keep incremental build state out of the working tree
+        report.REPORT_STATE_DIR = os.path.join(tmp, "builds")
+        for n in (int(x) for x in args.sizes.split(",")):
+            failed |= run(n, args.seed, tmp)
+            failed |= run_incremental(n, args.seed, tmp, args.changed)
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(main())
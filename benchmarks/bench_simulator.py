@@ -0,0 +1,68 @@
+"""
+What-if simulator benchmark: a synthetic catalogue swept over a grid of
+pricing-rule scenarios, checked against pricing each scenario on its own
+with compute_recommended_prices.
+
+    python -m benchmarks.bench_simulator --skus 20000 --grid "strong_sentiment=0.7:0.9:0.01;good_sentiment=0.55:0.75:0.01;clamp_high=1.05,1.1,1.15,1.2,1.25"
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from infra.pricing_rules import compute_recommended_prices
+from simulate_pricing import simulate, parse_grid
+
+
+def catalogue(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    base = np.round(rng.uniform(10, 2000, n), 2)
+    avg = np.round(base * rng.choice([0.8, 0.97, 1.0, 1.05, 1.3], n), 2)
+    avg[rng.random(n) < 0.1] = np.nan
+    return {
+        "product_id": np.array([f"SKU{i:07d}" for i in range(n)], dtype=object),
+        "base": base,
+        "competitor_avg": avg,
+        "ratio": np.round(rng.uniform(0.1, 0.9, n), 2),
+        "units": rng.uniform(0.5, 5, n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skus", type=int, default=20_000)
+    parser.add_argument("--grid", default="strong_sentiment=0.7:0.9:0.01;good_sentiment=0.55:0.75:0.01;"
+                                          "clamp_high=1.05,1.1,1.15,1.2,1.25")
+    parser.add_argument("--check", type=int, default=20, help="scenarios re-priced one by one for comparison")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cat = catalogue(args.skus, args.seed)
+    scenarios = parse_grid(args.grid)
+
+    start = time.perf_counter()
+    result = simulate(cat, scenarios, per_sku=True)
+    wall = time.perf_counter() - start
+
+    check = scenarios[::max(1, len(scenarios) // args.check)]
+    start = time.perf_counter()
+    mismatches = 0
+    for i, sc in enumerate(scenarios):
+        if sc not in check:
+            continue
+        ref = compute_recommended_prices(cat["base"], cat["competitor_avg"][:, None], cat["ratio"], rules=sc)
+        mismatches += not np.array_equal(ref["recommended_price"] - result["baseline_price"], result["deltas"][i])
+    one_by_one = (time.perf_counter() - start) / len(check) * len(scenarios)
+
+    best = max(result["scenarios"], key=lambda s: s["revenue_delta"])
+    print(f"{len(scenarios):,} scenarios x {args.skus:,} SKUs")
+    print(f"simulator   : {wall:7.2f}s  ({len(scenarios) / wall:,.0f} scenarios/s)")
+    print(f"one by one  : {one_by_one:7.2f}s  (extrapolated from {len(check)})")
+    print(f"best revenue: {best['revenue_delta_pct']:+.2f}%  {best['name']}")
+    print(f"mismatching scenarios: {mismatches}/{len(check)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Streaming fetch benchmark: full download vs. stop-when-found, against a
+local server that trickles large pages out at a fixed bandwidth.
+
+The product page carries its fields near the top followed by ~1.5 MB of
+markup; the search page has its results, the pagination strip, then a
+large footer. Reports wall time and bytes read per mode and checks that
+the extracted fields are the same, and that a streamed page is served from
+the HTTP cache the second time it is fetched.
+
+    python -m benchmarks.bench_streaming --bandwidth 4 --rounds 3
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ASIN = "B0STREAM01"
+BLOCK = "<div class='a-section'><span class='a-size-base'>Lorem ipsum dolor sit amet</span></div>"
+FILLER = BLOCK * 18000
+
+
+def product_html() -> str:
+    return f"""<html><head><title>x</title></head><body>{BLOCK * 2400}
+    <div id="centerCol"><h1><span id="productTitle"> Streamed RTX 4090 24GB </span></h1>
+    <span class="a-price"><span class="a-offscreen">$1,899.99</span></span>
+    <span data-hook="rating-out-of-text">4.8 out of 5</span>
+    <span id="acrCustomerReviewText">3,120 ratings</span></div>
+    {FILLER}<table><tr><th>ASIN</th><td>{ASIN}</td></tr></table></body></html>"""
+
+
+def search_html() -> str:
+    items = "".join(f'<div data-asin="B0STRM{i:04d}" class="s-result-item">{BLOCK * 48}</div>' for i in range(48))
+    return (f"<html><body>{items}<span class='s-pagination-strip'><a>2</a></span>"
+            f"{FILLER}</body></html>")
+
+
+def make_server(bandwidth_mb: float) -> ThreadingHTTPServer:
+    pages = {"/dp/": product_html().encode("utf-8"), "/s": search_html().encode("utf-8")}
+    chunk = 16 * 1024
+    delay = chunk / (bandwidth_mb * 1024 * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = next(v for k, v in pages.items() if self.path.startswith(k))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                for i in range(0, len(body), chunk):
+                    self.wfile.write(body[i:i + chunk])
+                    time.sleep(delay)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client stopped reading – the point of streaming
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def scrape_both(base: str):
+    from scrapers.product_page import scrape_product_page_async
+    from scrapers.search_page import scrape_search_results
+
+    product = await scrape_product_page_async(f"{base}/dp/{ASIN}")
+    asins = await scrape_search_results("gpu")
+    return product, asins
+
+
+async def run(base: str, rounds: int, streaming: bool):
+    from infra import util
+
+    util.STREAMING_ENABLED = streaming
+    before = util.stream_stats()["bytes_read"]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = await scrape_both(base)
+    wall = (time.perf_counter() - start) / rounds
+    await util.close_async_clients()
+    read = (util.stream_stats()["bytes_read"] - before) / rounds
+    return wall, read, result
+
+
+async def cached_refetch(base: str):
+    """Scrape the product and search pages twice with the HTTP cache on; True if both repeats were cache hits."""
+    from infra import util
+
+    util.STREAMING_ENABLED = True
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = util._http_cache = util.HttpCache(cache_dir)
+        first = await scrape_both(base)
+        again = await scrape_both(base)
+        util._http_cache = None
+    await util.close_async_clients()
+    return again == first and cache.stats()["fresh_hits"] == 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bandwidth", type=float, default=4.0, help="server bandwidth in MB/s")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    server = make_server(args.bandwidth)
+    base = f"http://127.0.0.1:{server.server_port}"
+    os.environ["AMAZON_BASE_URL"] = base
+    os.environ["HTTP_CACHE"] = "0"
+    os.environ["SCRAPE_HOST_RATE"] = "1000"
+    os.environ["SCRAPE_HOST_BURST"] = "1000"
+
+    page_bytes = len(product_html().encode()) + len(search_html().encode())
+    full_wall, _, (full_product, full_asins) = asyncio.run(run(base, args.rounds, streaming=False))
+    stream_wall, stream_read, (product, asins) = asyncio.run(run(base, args.rounds, streaming=True))
+
+    print(f"bandwidth: {args.bandwidth} MB/s  product + search page: {page_bytes / 1e6:.2f} MB")
+    print(f"full download : {full_wall:6.2f}s  {page_bytes / 1e6:6.2f} MB read")
+    print(f"streaming     : {stream_wall:6.2f}s  {stream_read / 1e6:6.2f} MB read  "
+          f"({full_wall / stream_wall:.1f}x faster)")
+
+    # raw_html_len is the length of what was read
+    same_product = {k: v for k, v in product.items() if k != "raw_html_len"} == \
+                   {k: v for k, v in full_product.items() if k != "raw_html_len"}
+    print(f"same product fields: {same_product}  same ASINs: {asins == full_asins} ({len(asins)})")
+
+    from infra import util
+    util.HTTP_CACHE_ENABLED = True
+    cache_hit = asyncio.run(cached_refetch(base))
+    print(f"streamed pages served from cache on refetch: {cache_hit}")
+
+    server.shutdown()
+    return 0 if same_product and asins == full_asins and cache_hit else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
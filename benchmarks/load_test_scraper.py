@@ -0,0 +1,135 @@
+"""
+Scraper load test against a local stand-in for Amazon.
+
+Runs product + review + search scrapes for N ASINs twice: one ASIN after
+another, then all at once in a single event loop, and reports throughput.
+
+    python -m benchmarks.load_test_scraper --asins 20 --latency 0.3
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+PADDING = "<div class='filler'>" + ("lorem ipsum " * 400) + "</div>"
+
+
+def product_html(asin: str) -> str:
+    return f"""<html><body>
+    <span id="productTitle">Stand-in GPU {asin}</span>
+    <span class="a-price"><span class="a-offscreen">$1,299.00</span></span>
+    <span data-hook="rating-out-of-text">4.6 out of 5</span>
+    <span id="acrCustomerReviewText">1,024 ratings</span>
+    <table><tr><th>ASIN</th><td>{asin}</td></tr></table>
+    {PADDING}</body></html>"""
+
+
+def reviews_html(page: int, pages_with_reviews: int) -> str:
+    reviews = ""
+    if page <= pages_with_reviews:
+        reviews = "".join(
+            f"""<div data-hook="review">
+              <i data-hook="review-star-rating"><span>{(i % 5) + 1}.0 out of 5 stars</span></i>
+              <span data-hook="review-body">Review {i} on page {page}: runs cool, shipping was fast.</span>
+            </div>"""
+            for i in range(10)
+        )
+    return f"<html><body>{reviews}{PADDING}</body></html>"
+
+
+def search_html(n: int = 20) -> str:
+    items = "".join(f'<div data-asin="B0STAND{i:03d}"></div>' for i in range(n))
+    return f"<html><body>{items}{PADDING}</body></html>"
+
+
+def make_handler(latency: float, pages_with_reviews: int):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            parts = urlsplit(self.path)
+            if parts.path.startswith("/dp/"):
+                body = product_html(parts.path.split("/")[2])
+            elif parts.path.startswith("/product-reviews/"):
+                page = int(parse_qs(parts.query).get("pageNumber", ["1"])[0])
+                body = reviews_html(page, pages_with_reviews)
+            else:
+                body = search_html()
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+async def scrape_one(asin: str):
+    from infra.util import AMAZON_BASE_URL
+    from scrapers.product_page import scrape_product_page_async
+    from scrapers.review_page import scrape_product_reviews_async
+    from scrapers.search_page import scrape_search_results
+
+    product = await scrape_product_page_async(f"{AMAZON_BASE_URL}/dp/{asin}")
+    reviews = await scrape_product_reviews_async(asin, max_pages=3)
+    asins = await scrape_search_results(f"gpu {asin}")
+    return product, reviews, asins
+
+
+async def run(asins, concurrent: bool):
+    from infra.util import close_async_clients
+
+    start = time.perf_counter()
+    if concurrent:
+        results = await asyncio.gather(*(scrape_one(a) for a in asins))
+    else:
+        results = [await scrape_one(a) for a in asins]
+    wall = time.perf_counter() - start
+    await close_async_clients()
+
+    ok = sum(1 for p, r, s in results if p.get("title") and r and s)
+    return wall, ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--asins", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in server delay per request (s)")
+    parser.add_argument("--review-pages", type=int, default=2, help="pages that contain reviews")
+    parser.add_argument("--host-concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency, args.review_pages))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Point the scrapers at the stand-in before they are imported
+    os.environ["AMAZON_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["SCRAPE_HOST_CONCURRENCY"] = str(args.host_concurrency)
+    os.environ["SCRAPE_HOST_RATE"] = "1000"
+    os.environ["SCRAPE_HOST_BURST"] = "1000"
+
+    asins = [f"B0LOAD{i:04d}" for i in range(args.asins)]
+    # requests per ASIN: product + review pages (+1 empty page) + search
+    per_asin = 1 + args.review_pages + 1 + 1
+
+    seq_wall, seq_ok = asyncio.run(run(asins, concurrent=False))
+    con_wall, con_ok = asyncio.run(run(asins, concurrent=True))
+
+    print(f"ASINs: {len(asins)}  server latency: {args.latency}s  requests/ASIN: {per_asin}")
+    print(f"sequential : {seq_wall:6.2f}s  {len(asins) / seq_wall:6.2f} ASIN/s  ok={seq_ok}")
+    print(f"concurrent : {con_wall:6.2f}s  {len(asins) / con_wall:6.2f} ASIN/s  ok={con_ok}")
+    print(f"speedup    : {seq_wall / con_wall:.1f}x")
+
+    server.shutdown()
+    return 0 if seq_ok == con_ok == len(asins) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Columnar export of the memory bank for analytics.
+
+Each memory store (product, pricing, sentiment) is written as a directory
+of Parquet or Arrow IPC part files with typed columns: row_id (the record's
+line in the .jsonl, which is also its FAISS id), key, one column per known
+metadata field, `extra` (JSON of any other metadata) and `embedding`, a
+fixed-size list<float32> taken from the store's FAISS index (null where a
+record has no vector). merged.jsonl, when present, is exported as `merged`.
+
+Stores are append-only, so an export only reads the lines added since the
+last run (byte offsets in _export_state.json) and writes them as a new part
+file; a store that was rewritten is exported again from scratch.
+
+    python export_parquet.py                      # → memory_bank/export/<store>/part-*.parquet
+    python export_parquet.py --format arrow       # Arrow IPC, memory-mappable
+    python export_parquet.py --full               # drop the state and re-export everything
+
+Reading it back:
+
+    import pandas as pd
+    df = pd.read_parquet("memory_bank/export/pricing")
+
+    from export_parquet import load_store, embedding_matrix
+    table = load_store("product")                 # zero-copy from Arrow IPC parts
+    vectors = embedding_matrix(table)             # (rows, dim) float32, zeros where no vector
+"""
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from memory_bank import product_memory, pricing_memory, sentiment_memory
+from memory_bank.faiss_memory import FaissMemoryIndex
+from memory_bank.metadata_utils import ensure_folder
+
+DEFAULT_DIR = os.getenv("MEMORY_EXPORT_DIR", "memory_bank/export")
+MERGED_PATH = "merged.jsonl"
+STATE_FILE = "_export_state.json"
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+# Bytes hashed at the start of each store to notice it was rewritten, not appended to
+FINGERPRINT_BYTES = 4096
+
+PRODUCT_FIELDS = {
+    "product_id": pa.string(),
+    "title": pa.string(),
+    "price": pa.float64(),
+    "rating": pa.float64(),
+    "rating_raw": pa.string(),
+    "marketplace": pa.string(),
+    "url": pa.string(),
+    "category": pa.string(),
+}
+PRICING_FIELDS = {
+    "recommended_price": pa.float64(),
+    "base_price": pa.float64(),
+    "positive_ratio": pa.float64(),
+    "competitor_average_price": pa.float64(),
+    "sentiment_score": pa.float64(),
+    "business_reason": pa.list_(pa.string()),
+}
+SENTIMENT_FIELDS = {
+    "n_reviews": pa.int64(),
+    "positive_ratio": pa.float64(),
+    "top_issues": pa.list_(pa.string()),
+    "model_version": pa.string(),
+    "reviews_computed": pa.int64(),
+    "reviews_from_store": pa.int64(),
+}
+
+# name -> (metadata .jsonl, FAISS index, embedding dim, typed metadata fields)
+STORES = {
+    "product": (product_memory.DEFAULT_METADATA_PATH, product_memory.DEFAULT_INDEX_PATH,
+                product_memory.DEFAULT_DIM, PRODUCT_FIELDS),
+    "pricing": (pricing_memory.DEFAULT_METADATA_PATH, pricing_memory.DEFAULT_INDEX_PATH,
+                pricing_memory.DEFAULT_DIM, PRICING_FIELDS),
+    "sentiment": (sentiment_memory.DEFAULT_METADATA_PATH, sentiment_memory.DEFAULT_INDEX_PATH,
+                  sentiment_memory.DEFAULT_DIM, SENTIMENT_FIELDS),
+}
+MERGED_FIELDS = {**PRODUCT_FIELDS, **PRICING_FIELDS, **SENTIMENT_FIELDS}
+
+
+# -------------------------
+# Schema & conversion
+# -------------------------
+def store_schema(fields: Dict[str, pa.DataType], dim: Optional[int]) -> pa.Schema:
+    cols = [pa.field("key", pa.string())]
+    if dim is not None:
+        cols.insert(0, pa.field("row_id", pa.int64(), nullable=False))
+    cols += [pa.field(name, typ) for name, typ in fields.items()]
+    cols.append(pa.field("extra", pa.string()))
+    if dim is not None:
+        cols.append(pa.field("embedding", pa.list_(pa.float32(), dim)))
+    return pa.schema(cols)
+
+
+_MISFIT = object()
+
+
+def _coerce(value, typ: pa.DataType):
+    """`value` as `typ`, None for null, or _MISFIT if it doesn't fit (it then goes to `extra`)."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return _MISFIT
+    if pa.types.is_floating(typ):
+        return float(value) if isinstance(value, (int, float)) else _MISFIT
+    if pa.types.is_integer(typ):
+        if isinstance(value, int):
+            return value
+        return int(value) if isinstance(value, float) and value.is_integer() else _MISFIT
+    if pa.types.is_string(typ):
+        return value if isinstance(value, str) else _MISFIT
+    if pa.types.is_list(typ):
+        return value if isinstance(value, list) and all(isinstance(x, str) for x in value) else _MISFIT
+    return _MISFIT
+
+
+def records_table(records: List[Dict[str, Any]], fields: Dict[str, pa.DataType], row_ids=None,
+                  vectors: Optional[np.ndarray] = None, has_vector: Optional[np.ndarray] = None,
+                  dim: Optional[int] = None) -> pa.Table:
+    """
+    Typed table for `records` ({"key", "metadata"} dicts), built column by
+    column. Metadata that isn't a known field, or doesn't fit its type,
+    is kept as JSON in `extra`.
+    """
+    metas = [rec.get("metadata") or {} for rec in records]
+    columns = {}
+    if row_ids is not None:
+        columns["row_id"] = pa.array(row_ids, type=pa.int64())
+    columns["key"] = pa.array([rec.get("key") for rec in records], type=pa.string())
+
+    leftovers = [dict() for _ in metas]
+    for name, typ in fields.items():
+        values = []
+        for i, meta in enumerate(metas):
+            v = _coerce(meta.get(name), typ)
+            if v is _MISFIT:
+                leftovers[i][name] = meta[name]
+                v = None
+            values.append(v)
+        columns[name] = pa.array(values, type=typ)
+    for i, meta in enumerate(metas):
+        leftovers[i].update((k, v) for k, v in meta.items() if k not in fields)
+    columns["extra"] = pa.array([json.dumps(x, ensure_ascii=False) if x else None for x in leftovers],
+                                type=pa.string())
+
+    if dim is not None:
+        columns["embedding"] = embedding_array(vectors, has_vector, dim)
+    return pa.table(columns, schema=store_schema(fields, dim))
+
+
+def embedding_array(vectors: np.ndarray, has_vector: np.ndarray, dim: int) -> pa.Array:
+    """fixed_size_list<float32, dim> over `vectors` without copying them, null where not `has_vector`."""
+    flat = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1)
+    validity = pa.py_buffer(np.packbits(has_vector, bitorder="little"))
+    return pa.Array.from_buffers(pa.list_(pa.float32(), dim), len(has_vector), [validity],
+                                 children=[pa.array(flat)])
+
+
+# -------------------------
+# Reading the stores
+# -------------------------
+def _fingerprint(path: str, length: int) -> str:
+    """Hash of the first `length` bytes (at most FINGERPRINT_BYTES): already exported, so unchanged by appends."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(length, FINGERPRINT_BYTES))).hexdigest()
+
+
+def read_new_lines(path: str, offset: int, first_row: int):
+    """(row ids, records, new offset, next row id) for the complete lines after byte `offset`."""
+    rows, records = [], []
+    row = first_row
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break               # being appended right now; next run
+            offset += len(raw)
+            line = raw.strip()
+            if line:
+                rows.append(row)
+                records.append(json.loads(line))
+            row += 1                # ids count every line, as append_jsonl assigns them
+    return rows, records, offset, row
+
+
+def index_vectors(index_path: str, dim: int):
+    """(ids, vectors) of the store's FAISS index, in the order they were added; empty if there is none."""
+    if not os.path.exists(index_path):
+        return np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32)
+    ids, stored = FaissMemoryIndex(dim=dim, index_path=index_path).get_vectors()
+    if len(ids) and stored.shape[1] != dim:
+        raise ValueError(f"{index_path}: vectors have {stored.shape[1]} dims, expected {dim}")
+    return ids, stored
+
+
+def store_vectors(index, dim: int, row_ids: List[int]):
+    """(vectors, has_vector) for `row_ids` from index_vectors()' (ids, vectors); zeros where there's none."""
+    vectors = np.zeros((len(row_ids), dim), dtype=np.float32)
+    has = np.zeros(len(row_ids), dtype=bool)
+    ids, stored = index
+    if not len(row_ids) or not len(ids):
+        return vectors, has
+    want = np.asarray(row_ids, dtype=np.int64)
+    # latest vector per id
+    order = np.argsort(ids, kind="stable")
+    ids_sorted = ids[order]
+    last = np.searchsorted(ids_sorted, want, "right") - 1
+    found = (last >= 0) & (ids_sorted[np.clip(last, 0, None)] == want)
+    vectors[found] = stored[order[last[found]]]
+    has[found] = True
+    return vectors, has
+
+
+# -------------------------
+# Writing
+# -------------------------
+def _write(table: pa.Table, path: str, fmt: str):
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _clear(directory: str):
+    for path in glob.glob(os.path.join(directory, "part-*")):
+        os.remove(path)
+
+
+def _parts(directory: str, fmt: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"part-*{FORMATS[fmt]}")))
+
+
+def _read_part(path: str) -> pa.Table:
+    # read into memory, not mapped: the part is about to be replaced
+    if path.endswith(FORMATS["arrow"]):
+        with pa.OSFile(path, "rb") as f:
+            return pa.ipc.open_file(f).read_all()
+    return pq.read_table(path, memory_map=False)
+
+
+def refresh_vectors(directory: str, fmt: str, index, dim: int, rows: np.ndarray) -> int:
+    """
+    Rewrite the embedding column of the exported parts holding `rows` (ids
+    that got a vector after their part was written, or a newer one). Parts
+    are named after their first row id. Returns the number of parts rewritten.
+    """
+    paths = _parts(directory, fmt)
+    if not paths or not len(rows):
+        return 0
+    starts = np.array([int(os.path.basename(p)[5:17]) for p in paths], dtype=np.int64)
+    hit = np.unique(np.searchsorted(starts, rows, "right") - 1)
+    for i in hit[hit >= 0]:
+        table = _read_part(paths[i])
+        vectors, has = store_vectors(index, dim, table["row_id"].to_pylist())
+        col = table.schema.get_field_index("embedding")
+        table = table.set_column(col, table.schema.field(col), embedding_array(vectors, has, dim))
+        _write(table, paths[i], fmt)
+    return int((hit >= 0).sum())
+
+
+def _load_state(out_dir: str) -> Dict[str, Any]:
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(out_dir: str, state: Dict[str, Any]):
+    path = os.path.join(out_dir, STATE_FILE)
+    ensure_folder(path)
+    with tempfile.NamedTemporaryFile("w", delete=False, dir=out_dir, suffix=".tmp", encoding="utf-8") as tmp:
+        json.dump(state, tmp, indent=2)
+    os.replace(tmp.name, path)
+
+
+def export_store(name: str, out_dir: str, fmt: str, state: Dict[str, Any]) -> int:
+    """Append the store's new records as a part file; returns the rows written. Updates `state`."""
+    meta_path, index_path, dim, fields = STORES[name]
+    directory = os.path.join(out_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    if not os.path.exists(meta_path):
+        return 0
+
+    size = os.path.getsize(meta_path)
+    prev = state.get(name)
+    index = index_vectors(index_path, dim)
+    # the FAISS index only grows; a smaller one was rebuilt, so every vector may differ
+    if (not prev or prev.get("format") != fmt or prev.get("dim") != dim or prev["offset"] > size
+            or prev.get("fingerprint") != _fingerprint(meta_path, prev["offset"])
+            or prev.get("vectors", 0) > len(index[0])):
+        _clear(directory)       # first export, or the store was rewritten
+        prev = {"offset": 0, "next_row": 0, "vectors": 0}
+
+    # vectors added since the last export for rows it already wrote
+    added = index[0][prev.get("vectors", 0):]
+    refresh_vectors(directory, fmt, index, dim, added[added < prev["next_row"]])
+
+    rows, records, offset, next_row = read_new_lines(meta_path, prev["offset"], prev["next_row"])
+    if records:
+        vectors, has = store_vectors(index, dim, rows)
+        table = records_table(records, fields, rows, vectors, has, dim)
+        _write(table, os.path.join(directory, f"part-{rows[0]:012d}{FORMATS[fmt]}"), fmt)
+
+    state[name] = {"format": fmt, "dim": dim, "offset": offset, "next_row": next_row, "vectors": len(index[0]),
+                   "fingerprint": _fingerprint(meta_path, offset), "exported_at": time.time()}
+    return len(records)
+
+
+def export_merged(path: str, out_dir: str, fmt: str, state: Dict[str, Any]) -> Optional[int]:
+    """merged.jsonl is rewritten by every merge, so it's exported whole when its content changed."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    prev = state.get("merged") or {}
+    directory = os.path.join(out_dir, "merged")
+    if prev.get("sha1") == digest and prev.get("format") == fmt and glob.glob(os.path.join(directory, "part-*")):
+        return 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    os.makedirs(directory, exist_ok=True)
+    _clear(directory)
+    _write(records_table(records, MERGED_FIELDS), os.path.join(directory, f"part-{0:012d}{FORMATS[fmt]}"), fmt)
+    state["merged"] = {"format": fmt, "sha1": digest, "exported_at": time.time()}
+    return len(records)
+
+
+def export_all(out_dir: str = DEFAULT_DIR, fmt: str = "parquet", merged_path: Optional[str] = MERGED_PATH,
+               full: bool = False) -> Dict[str, Optional[int]]:
+    """Export every store (and merged.jsonl); returns rows written per table."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r} (known: {sorted(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    state = {} if full else _load_state(out_dir)
+    written = {name: export_store(name, out_dir, fmt, state) for name in STORES}
+    written["merged"] = export_merged(merged_path, out_dir, fmt, state)
+    _save_state(out_dir, state)
+    return written
+
+
+# -------------------------
+# Reading the export
+# -------------------------
+def load_store(name: str, out_dir: str = DEFAULT_DIR, columns: Optional[List[str]] = None) -> pa.Table:
+    """One exported table; Arrow IPC parts are memory-mapped, not copied."""
+    paths = sorted(glob.glob(os.path.join(out_dir, name, "part-*")))
+    paths = [p for p in paths if not p.endswith(".tmp")]
+    tables = []
+    for path in paths:
+        if path.endswith(FORMATS["arrow"]):
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            tables.append(table.select(columns) if columns else table)
+        else:
+            tables.append(pq.read_table(path, columns=columns, memory_map=True))
+    if not tables:
+        _, _, dim, fields = STORES.get(name, (None, None, None, MERGED_FIELDS))
+        table = store_schema(fields, dim).empty_table()
+        return table.select(columns) if columns else table
+    return pa.concat_tables(tables)
+
+
+def embedding_matrix(table: pa.Table) -> np.ndarray:
+    """
+    (rows, dim) float32 of the embedding column, zeros where a record has no
+    vector. Parquet does not keep the values under nulls (they read back as
+    NaN), so those rows are zeroed in a copy; otherwise, for a single
+    memory-mapped Arrow chunk, this is a read-only view.
+    """
+    column = table["embedding"]
+    dim = column.type.list_size
+    parts = [chunk.values.slice(chunk.offset * dim, len(chunk) * dim).to_numpy(zero_copy_only=False)
+             for chunk in column.chunks]
+    if not parts:
+        return np.empty((0, dim), dtype=np.float32)
+    flat = parts[0] if len(parts) == 1 else np.concatenate(parts)
+    matrix = flat.reshape(-1, dim)
+    if column.null_count:
+        valid = column.is_valid().to_numpy(zero_copy_only=False)
+        matrix = matrix.copy() if len(parts) == 1 else matrix
+        matrix[~valid] = 0.0
+    return matrix
+
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export the memory bank to Parquet / Arrow IPC")
+    parser.add_argument("--output", "-o", default=DEFAULT_DIR, help="export directory")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--merged", default=MERGED_PATH, help="merged.jsonl to export as well ('' to skip)")
+    parser.add_argument("--full", action="store_true", help="ignore the previous export and write everything again")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written = export_all(args.output, args.format, args.merged or None, full=args.full)
+    for name, n in written.items():
+        if n is None:
+            continue
+        print(f"{name:<10} +{n} rows" if n else f"{name:<10} up to date")
+    print(f"Exported to {args.output} ({args.format}) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
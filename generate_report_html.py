@@ -3,37 +3,66 @@ import sys
 import json
 import argparse
 import base64
+import pickle
+import shutil
+import hashlib
+from html import escape
 from io import BytesIO
 from statistics import mean
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+CHART_CACHE_DIR = os.getenv("REPORT_CHART_CACHE", ".report_cache/charts")
+CHART_DPI = 150
+# bump when chart code changes so cached renders are not reused
+CHART_VERSION = 1
+# renders kept per chart and format in the cache
+CHART_CACHE_KEEP = 8
+MIME = {"png": "image/png", "svg": "image/svg+xml"}
+
+REPORT_STATE_DIR = os.getenv("REPORT_STATE_DIR", ".report_cache/builds")
+# bump when card or page markup changes so incremental builds start over
+BUILD_VERSION = 2
+# garbage the card store may hold beyond its live cards before it is compacted
+CARD_STORE_SLACK = 16 * 1024 * 1024
+
 # -------------------------
 # Helpers
 # -------------------------
-def read_jsonl(path):
-    items = []
+def iter_jsonl(path):
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                items.append(json.loads(line))
+                yield json.loads(line)
             except Exception:
                 # try fallback: line may be a bare JSON dict without newline
                 continue
-    return items
 
-def embed_png_figure(fig) -> str:
+def read_jsonl(path):
+    return list(iter_jsonl(path))
+
+def figure_bytes(fig, fmt="png", dpi=CHART_DPI) -> bytes:
     buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight", dpi=150)
+    # no timestamp in SVG metadata: same data, same bytes
+    fig.savefig(buf, format=fmt, bbox_inches="tight", dpi=dpi, metadata={"Date": None} if fmt == "svg" else None)
     plt.close(fig)
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode("ascii")
-    return f"data:image/png;base64,{b64}"
+    return buf.getvalue()
+
+def data_uri(data: bytes, fmt="png") -> str:
+    b64 = base64.b64encode(data).decode("ascii")
+    return f"data:{MIME[fmt]};base64,{b64}"
+
+def embed_png_figure(fig) -> str:
+    return data_uri(figure_bytes(fig, "png"), "png")
 
 def safe_get(d, *keys, default=None):
     x = d
@@ -48,58 +77,50 @@ def safe_get(d, *keys, default=None):
 # -------------------------
 # Build dataframes
 # -------------------------
-def build_dfs(records):
-    products = []
+def _float(x):
+    return float(x or 0.0)
 
-    for rec in records:
-        meta = rec.get("metadata", {})
-
-        # PRODUCT FIELDS
-        product = {
-            "key": rec.get("key") or meta.get("product_id"),
-            "product_id": meta.get("product_id"),
-            "title": meta.get("title") or "Unknown title",
-            "marketplace": meta.get("marketplace"),
-            "url": meta.get("url"),
-            "price": float(meta.get("price") or 0.0),
-            "rating": meta.get("rating"),
-        }
+def _optional_float(x):
+    return float(x) if x not in (None, "null") else None
 
-        # SENTIMENT FIELDS
-        sentiment = {
-            "positive_ratio": float(meta.get("positive_ratio") or 0.0),
-            "n_reviews": meta.get("n_reviews") or 0,
-            "top_issues": meta.get("top_issues", []),
-        }
-
-        # PRICING FIELDS
-        pricing = {
-            "recommended_price": float(meta.get("recommended_price") or 0.0),
-            "competitor_average_price": (
-                float(meta.get("competitor_average_price"))
-                if meta.get("competitor_average_price") not in (None, "null")
-                else None
-            ),
-            "base_price": float(meta.get("base_price") or 0.0),
-            "business_reason": meta.get("business_reason", []),
-        }
-
-        products.append({
-            "key": product["key"],
-            "title": product["title"],
-            "marketplace": product["marketplace"],
-            "url": product["url"],
-            "price": product["price"],
-            "rating": product["rating"],
-            "reviews_count": sentiment["n_reviews"],
-            "positive_ratio": sentiment["positive_ratio"],
-            "recommended_price": pricing["recommended_price"],
-            "competitor_average_price": pricing["competitor_average_price"],
-            "business_reason": pricing["business_reason"],
-        })
-
-    df = pd.DataFrame(products)
-    return df
+def build_dfs(records):
+    """
+    One row per product, built column by column: a single pass over the
+    records (any iterable, e.g. iter_jsonl) collects each field into a
+    list and the frame is created from those.
+    """
+    keys, metas = [], []
+    for rec in records:
+        meta = rec.get("metadata") or {}
+        keys.append(rec.get("key") or meta.get("product_id"))
+        metas.append(meta)
+
+    def column(name, convert=None, default=None):
+        if convert is not None:
+            return [convert(m.get(name)) for m in metas]
+        if default is not None:
+            return [m.get(name, default) for m in metas]
+        return [m.get(name) for m in metas]
+
+    return pd.DataFrame({
+        "key": keys,
+        "title": [m.get("title") or "Unknown title" for m in metas],
+        "marketplace": column("marketplace"),
+        "url": column("url"),
+        "price": column("price", _float),
+        "rating": column("rating"),
+        "reviews_count": [m.get("n_reviews") or 0 for m in metas],
+        "positive_ratio": column("positive_ratio", _float),
+        "recommended_price": column("recommended_price", _float),
+        "competitor_average_price": column("competitor_average_price", _optional_float),
+        "business_reason": column("business_reason", default=[]),
+    })
+
+# columns build_dfs leaves None when missing: float64 with NaN, or object if nothing is set
+OPTIONAL_COLUMNS = ("rating", "competitor_average_price")
+
+def load_frame(path):
+    return build_dfs(iter_jsonl(path))
 
 
 # -------------------------
@@ -135,19 +156,154 @@ def chart_price_vs_competitor(df):
     fig.tight_layout()
     return fig
 
+SENTIMENT_BINS = [0,0.2,0.4,0.6,0.75,0.85,1.0]
+
 def chart_sentiment_distribution(df):
     fig, ax = plt.subplots(figsize=(6,3))
     vals = df["positive_ratio"].dropna().clip(0,1)
-    ax.hist(vals, bins=[0,0.2,0.4,0.6,0.75,0.85,1.0])
+    ax.hist(vals, bins=SENTIMENT_BINS)
     ax.set_title("Sentiment distribution (positive_ratio)")
     ax.set_xlabel("Positive ratio")
     ax.set_ylabel("Count")
     fig.tight_layout()
     return fig
 
+# -------------------------
+# Chart rendering (pooled + cached)
+# -------------------------
+def price_chart_data(df):
+    """The rows chart_price_vs_competitor draws: the 12 largest gaps, or every price for the fallback histogram."""
+    df_chart = df.dropna(subset=["competitor_average_price"])
+    if df_chart.empty:
+        return df[["recommended_price", "competitor_average_price"]]
+    gap = (df_chart["recommended_price"] - df_chart["competitor_average_price"]) / df_chart["competitor_average_price"]
+    top = gap.abs().sort_values(ascending=False).index[:12]
+    return df_chart.loc[top, ["title", "recommended_price", "competitor_average_price"]]
+
+def sentiment_chart_data(df):
+    return df[["positive_ratio"]]
+
+def sentiment_chart_counts(data):
+    """All the histogram shows: its bar heights."""
+    counts, _ = np.histogram(data["positive_ratio"].dropna().clip(0, 1), bins=SENTIMENT_BINS)
+    return pd.DataFrame({"count": counts})
+
+# name -> (data slice, plot, what the image depends on if less than the slice);
+# plotting the slice draws the same chart as plotting the full frame
+CHARTS = {
+    "price": (price_chart_data, chart_price_vs_competitor, None),
+    "sentiment": (sentiment_chart_data, chart_sentiment_distribution, sentiment_chart_counts),
+}
+
+def chart_key(name, data, fmt, dpi=CHART_DPI) -> str:
+    """Content hash of a chart's input slice (values, column names and order) and render settings."""
+    h = hashlib.sha1(f"{name}|{fmt}|{dpi}|{CHART_VERSION}|{list(data.columns)}".encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+def _render_chart(name, data, fmt, dpi):
+    return figure_bytes(CHARTS[name][1](data), fmt, dpi)
+
+def _prune_cache(cache_dir, name, fmt, keep=CHART_CACHE_KEEP):
+    old = sorted((e for e in os.scandir(cache_dir) if e.name.startswith(name + "-") and e.name.endswith("." + fmt)),
+                 key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in old[keep:]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
+def render_charts(df, fmt="png", cache_dir=CHART_CACHE_DIR, workers=None, dpi=CHART_DPI):
+    """
+    Render every chart in CHARTS; returns {name: (key, bytes)}.
+
+    Each chart is keyed by a hash of the data it plots, so a chart whose
+    slice is unchanged is read back from `cache_dir` (None disables the
+    cache). Charts that do need drawing are rendered in a process pool.
+    """
+    slices = {name: data_fn(df) for name, (data_fn, _, _) in CHARTS.items()}
+    keys = {name: chart_key(name, CHARTS[name][2](data) if CHARTS[name][2] else data, fmt, dpi)
+            for name, data in slices.items()}
+    out, todo = {}, []
+    for name, key in keys.items():
+        path = cache_dir and os.path.join(cache_dir, f"{name}-{key}.{fmt}")
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                out[name] = (key, f.read())
+        else:
+            todo.append(name)
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if len(todo) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = {name: pool.submit(_render_chart, name, slices[name], fmt, dpi) for name in todo}
+            rendered = {name: fut.result() for name, fut in futures.items()}
+    else:
+        rendered = {name: _render_chart(name, slices[name], fmt, dpi) for name in todo}
+
+    for name, data in rendered.items():
+        out[name] = (keys[name], data)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, f"{name}-{keys[name]}.{fmt}")
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            _prune_cache(cache_dir, name, fmt)
+    return out
+
+def chart_sources(charts, fmt, output_path, assets_dir=None):
+    """img src per chart: inline data URIs, or files written to `assets_dir` (named by content, relative to the report)."""
+    if not assets_dir:
+        return {name: data_uri(data, fmt) for name, (_, data) in charts.items()}
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    target = assets_dir if os.path.isabs(assets_dir) else os.path.join(out_dir, assets_dir)
+    os.makedirs(target, exist_ok=True)
+    srcs = {}
+    for name, (key, data) in charts.items():
+        filename = f"{name}-{key}.{fmt}"
+        path = os.path.join(target, filename)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        srcs[name] = os.path.relpath(path, out_dir).replace(os.sep, "/")
+    return srcs
+
 # -------------------------
 # HTML Renderer
 # -------------------------
+STYLE = """<style>
+:root {
+  --bg: #0f1115;
+  --card: #0b0d10;
+  --muted: #99a1ad;
+  --accent: #6ee7b7;
+  --danger: #ff6b6b;
+  --glass: rgba(255,255,255,0.03);
+}
+body { background: linear-gradient(180deg,#07080a 0%, #0f1115 100%); color:#e6eef6; font-family: Inter, system-ui, -apple-system, "Segoe UI", Roboto, "Helvetica Neue", Arial; margin:0; padding:24px; }
+.container { max-width:1200px; margin:0 auto; }
+.header { display:flex; justify-content:space-between; align-items:center; gap:12px; margin-bottom:18px; }
+.brand { font-weight:700; font-size:20px; color:var(--accent); }
+.subtitle { color:var(--muted); font-size:13px; }
+.grid { display:grid; grid-template-columns: 1fr 360px; gap:18px; align-items:start; }
+.card { background: linear-gradient(180deg, rgba(255,255,255,0.02), rgba(255,255,255,0.01)); border:1px solid rgba(255,255,255,0.04); padding:16px; border-radius:12px; box-shadow: 0 6px 22px rgba(2,6,23,0.6); }
+.small { font-size:13px; color:var(--muted); }
+.h1 { font-size:18px; margin:0 0 8px 0; }
+.product-list { display:flex; flex-direction:column; gap:10px; max-height: 720px; overflow:auto; padding-right:6px; }
+.product-card { display:flex; gap:12px; align-items:flex-start; border-radius:10px; padding:12px; background:var(--glass); border:1px solid rgba(255,255,255,0.02); }
+.product-meta { flex:1; }
+.title { font-weight:700; color:#fff; margin:0 0 6px 0; font-size:14px; }
+.meta-row { color:var(--muted); font-size:12px; display:flex; gap:10px; flex-wrap:wrap; }
+.reason { color:var(--muted); font-size:12px; margin-top:8px; }
+.kpi { display:flex; gap:12px; align-items:center; }
+.kpi .num { font-weight:700; color:var(--accent); }
+.badge { background: rgba(255,255,255,0.03); padding:6px 8px; border-radius:8px; font-size:12px; color:var(--muted); }
+.footer { margin-top:18px; font-size:12px; color:var(--muted); }
+.chart { width:100%; border-radius:8px; overflow:hidden; }
+.top-insight { font-size:13px; color:var(--accent); font-weight:700; }
+</style>"""
+
 HTML_TEMPLATE = """
 <!doctype html>
 <html lang="en">
@@ -155,37 +311,7 @@ HTML_TEMPLATE = """
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width,initial-scale=1"/>
 <title>Dark Tech — Competitor Pricing Report</title>
-<style>
-:root {{
-  --bg: #0f1115;
-  --card: #0b0d10;
-  --muted: #99a1ad;
-  --accent: #6ee7b7;
-  --danger: #ff6b6b;
-  --glass: rgba(255,255,255,0.03);
-}}
-body {{ background: linear-gradient(180deg,#07080a 0%, #0f1115 100%); color:#e6eef6; font-family: Inter, system-ui, -apple-system, "Segoe UI", Roboto, "Helvetica Neue", Arial; margin:0; padding:24px; }}
-.container {{ max-width:1200px; margin:0 auto; }}
-.header {{ display:flex; justify-content:space-between; align-items:center; gap:12px; margin-bottom:18px; }}
-.brand {{ font-weight:700; font-size:20px; color:var(--accent); }}
-.subtitle {{ color:var(--muted); font-size:13px; }}
-.grid {{ display:grid; grid-template-columns: 1fr 360px; gap:18px; align-items:start; }}
-.card {{ background: linear-gradient(180deg, rgba(255,255,255,0.02), rgba(255,255,255,0.01)); border:1px solid rgba(255,255,255,0.04); padding:16px; border-radius:12px; box-shadow: 0 6px 22px rgba(2,6,23,0.6); }}
-.small {{ font-size:13px; color:var(--muted); }}
-.h1 {{ font-size:18px; margin:0 0 8px 0; }}
-.product-list {{ display:flex; flex-direction:column; gap:10px; max-height: 720px; overflow:auto; padding-right:6px; }}
-.product-card {{ display:flex; gap:12px; align-items:flex-start; border-radius:10px; padding:12px; background:var(--glass); border:1px solid rgba(255,255,255,0.02); }}
-.product-meta {{ flex:1; }}
-.title {{ font-weight:700; color:#fff; margin:0 0 6px 0; font-size:14px; }}
-.meta-row {{ color:var(--muted); font-size:12px; display:flex; gap:10px; flex-wrap:wrap; }}
-.reason {{ color:var(--muted); font-size:12px; margin-top:8px; }}
-.kpi {{ display:flex; gap:12px; align-items:center; }}
-.kpi .num {{ font-weight:700; color:var(--accent); }}
-.badge {{ background: rgba(255,255,255,0.03); padding:6px 8px; border-radius:8px; font-size:12px; color:var(--muted); }}
-.footer {{ margin-top:18px; font-size:12px; color:var(--muted); }}
-.chart {{ width:100%; border-radius:8px; overflow:hidden; }}
-.top-insight {{ font-size:13px; color:var(--accent); font-weight:700; }}
-</style>
+{style}
 </head>
 <body>
 <div class="container">
@@ -260,21 +386,89 @@ body {{ background: linear-gradient(180deg,#07080a 0%, #0f1115 100%); color:#e6e
 </html>
 """
 
+PAGE_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width,initial-scale=1"/>
+<title>Dark Tech — Products {first}–{last} of {total}</title>
+{style}
+</head>
+<body>
+<div class="container">
+  <div class="header">
+    <div>
+      <div class="brand">Dark Tech — Competitor Pricing Report</div>
+      <div class="subtitle">Products {first}–{last} of {total} • page {page} of {pages} • by recommended price</div>
+    </div>
+    <div class="kpi">
+      {nav}
+    </div>
+  </div>
+
+  <div class="card">
+    <div class="h1">Products</div>
+    <div class="product-list" style="max-height:none;">
+      {product_cards}
+    </div>
+  </div>
+
+  <div class="footer">Generated by Dark Tech — Multi-agent pricing pipeline</div>
+</div>
+</body>
+</html>
+"""
+
+# Products section of the index page in paged mode; the search index loads on first use
+PAGED_PRODUCTS_TEMPLATE = """
+          <style>
+          .search {{ width:100%; box-sizing:border-box; padding:8px 10px; border-radius:8px; border:1px solid rgba(255,255,255,0.08); background:var(--glass); color:#e6eef6; }}
+          .results a, .pages a {{ display:inline-block; margin:2px; color:var(--muted); text-decoration:none; }}
+          </style>
+          <input id="search" class="search" placeholder="Search {total} products by title or key…" autocomplete="off"/>
+          <div id="results" class="results"></div>
+          <div class="small">All products, {page_size} per page, by recommended price</div>
+          <div class="pages">{page_links}</div>
+          <script>
+          (function() {{
+            var box = document.getElementById("search"), out = document.getElementById("results"), loading = false;
+            function load() {{
+              if (window.REPORT_SEARCH || loading) return;
+              loading = true;
+              var s = document.createElement("script");
+              s.src = "{search_src}";
+              s.onload = run;
+              document.head.appendChild(s);
+            }}
+            function run() {{
+              var idx = window.REPORT_SEARCH, q = box.value.trim().toLowerCase();
+              out.innerHTML = "";
+              if (!idx || q.length < 2) return;
+              for (var i = 0, shown = 0; i < idx.items.length && shown < {max_results}; i++) {{
+                var it = idx.items[i];
+                if (it[1].toLowerCase().indexOf(q) < 0 && it[0].toLowerCase().indexOf(q) < 0) continue;
+                var a = document.createElement("a");
+                a.className = "badge";
+                a.href = idx.pages[it[2]] + "#" + encodeURIComponent(it[0]);
+                a.textContent = it[1] + " — $" + it[3].toFixed(2) + " (page " + (it[2] + 1) + ")";
+                out.appendChild(a);
+                shown++;
+              }}
+            }}
+            box.addEventListener("focus", load);
+            box.addEventListener("input", function() {{ load(); run(); }});
+          }})();
+          </script>
+"""
+
+# Cards per page in paged mode
+PAGE_SIZE = 250
+SEARCH_MAX_RESULTS = 50
+
 # -------------------------
 # Template pieces
 # -------------------------
-def render_product_card(row):
-    title = row["title"]
-    url = row.get("url") or "#"
-    price = row.get("price") or 0.0
-    rec = row.get("recommended_price") or 0.0
-    comp = row.get("competitor_average_price")
-    pr = row.get("positive_ratio") or 0.0
-    reasons = row.get("business_reason") or []
-    reasons_html = "<br/>".join(f"- {r}" for r in reasons[:3]) if reasons else "—"
-    comp_text = f"${comp:.2f}" if comp is not None else "N/A"
-
-    html = f"""
+PRODUCT_CARD_TEMPLATE = """
     <div class="product-card">
       <div style="width:8px;height:8px;border-radius:50%;background:var(--accent);margin-top:6px;"></div>
       <div class="product-meta">
@@ -289,30 +483,336 @@ def render_product_card(row):
       </div>
     </div>
     """
-    return html
+
+def _card(title, url, price, rec, comp, pr, reasons):
+    return PRODUCT_CARD_TEMPLATE.format(
+        title=title,
+        url=url or "#",
+        price=price or 0.0,
+        rec=rec or 0.0,
+        comp_text=f"${comp:.2f}" if comp is not None else "N/A",
+        pr=pr or 0.0,
+        reasons_html="<br/>".join(f"- {r}" for r in reasons[:3]) if reasons else "—",
+    )
+
+def render_product_card(row):
+    return _card(row["title"], row.get("url"), row.get("price"), row.get("recommended_price"),
+                 row.get("competitor_average_price"), row.get("positive_ratio"), row.get("business_reason"))
+
+CARD_COLUMNS = ["title", "url", "price", "recommended_price", "competitor_average_price", "positive_ratio", "business_reason"]
+
+def render_product_cards(df):
+    """HTML for every row of `df`, in order; same output as render_product_card per row, without iterrows."""
+    return [_card(*values) for values in zip(*(df[c].tolist() for c in CARD_COLUMNS))]
+
+# -------------------------
+# Paged output
+# -------------------------
+def page_name(output_path, page):
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    return f"{stem}-p{page:04d}.html"
+
+def _nav(output_path, page, pages):
+    links = []
+    if page > 1:
+        links.append(f'<a class="badge" href="{page_name(output_path, page - 1)}">← Prev</a>')
+    links.append(f'<a class="badge" href="{os.path.basename(output_path)}">Overview</a>')
+    if page < pages:
+        links.append(f'<a class="badge" href="{page_name(output_path, page + 1)}">Next →</a>')
+    return "\n      ".join(links)
+
+def _has_key(key):
+    # missing keys come back as None or NaN, depending on how the frame was built
+    return key is not None and not pd.isna(key) and key != ""
+
+def write_page(output_path, page, pages, first, total, rows):
+    """One product shard from the page's rows: key plus CARD_COLUMNS, or key plus pre-rendered "card"."""
+    html_cards = rows["card"].tolist() if "card" in rows else render_product_cards(rows)
+    # a record with neither key nor product_id gets its card but no anchor
+    cards = (f'<a id="{escape(str(key))}"></a>{card}' if _has_key(key) else card
+             for key, card in zip(rows["key"].tolist(), html_cards))
+    html = PAGE_TEMPLATE.format(
+        style=STYLE,
+        first=first,
+        last=first + len(rows) - 1,
+        total=total,
+        page=page,
+        pages=pages,
+        nav=_nav(output_path, page, pages),
+        product_cards="\n".join(cards),
+    )
+    path = os.path.join(os.path.dirname(os.path.abspath(output_path)), page_name(output_path, page))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+def _write_page_args(args):
+    return write_page(*args)
+
+def _signature(*parts, hashes=()):
+    return hashlib.sha1(("|".join(map(str, parts)) + "|" + "".join(hashes)).encode("utf-8")).hexdigest()
+
+def _stamp(path):
+    """(size, mtime) of a written file, None if it is gone: anything else writing it changes the stamp."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def write_pages(df, output_path, page_size=PAGE_SIZE, workers=None, signatures=None):
+    """
+    Write `df` (in its order) as product pages of `page_size` cards next to
+    `output_path`, rendered in a process pool, plus a search index script.
+    Returns the products section for the index page and the number of
+    files written. Pages left over from a previous, larger report are
+    removed.
+
+    With `signatures` (incremental builds, `df` carries record_hash) a page
+    or search index built from the same records in the same place as last
+    time, and not written since by anything else, is left alone; the dict is
+    updated in place.
+    """
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    total = len(df)
+    pages = max(1, -(-total // page_size))
+    names = [page_name(output_path, i + 1) for i in range(pages)]
+    cols = df[["key", "card"] if "card" in df else ["key"] + CARD_COLUMNS]
+    record_hashes = df["record_hash"].tolist() if signatures is not None else None
+
+    jobs, pending = [], {}
+    for i, name in enumerate(names):
+        lo, hi = i * page_size, (i + 1) * page_size
+        if signatures is not None:
+            sig = _signature(name, i + 1, pages, lo + 1, total, hashes=record_hashes[lo:hi])
+            if signatures.get(name) == (sig, _stamp(os.path.join(out_dir, name))):
+                continue
+            pending[name] = sig
+        jobs.append((output_path, i + 1, pages, lo + 1, total, cols.iloc[lo:hi]))
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if len(jobs) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            list(pool.map(_write_page_args, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    else:
+        for job in jobs:
+            write_page(*job)
+    written = len(jobs)
+    for name, sig in pending.items():
+        signatures[name] = (sig, _stamp(os.path.join(out_dir, name)))
+
+    for entry in os.scandir(out_dir):
+        if entry.name.startswith(stem + "-p") and entry.name.endswith(".html") and entry.name not in names:
+            if entry.name[len(stem) + 2:-5].isdigit():
+                os.remove(entry.path)
+                if signatures is not None:
+                    signatures.pop(entry.name, None)
+
+    # [key, title, page index, recommended price]; a script rather than .json so it also loads from file://
+    search_name = f"{stem}-search.js"
+    search_path = os.path.join(out_dir, search_name)
+    sig = signatures is not None and _signature(search_name, page_size, hashes=record_hashes)
+    if not sig or signatures.get(search_name) != (sig, _stamp(search_path)):
+        index = {
+            "fields": ["key", "title", "page", "recommended_price"],
+            "pages": names,
+            # keyless records have no anchor to link to
+            "items": [[k, t, i // page_size, r] for i, (k, t, r) in
+                      enumerate(zip(df["key"].tolist(), df["title"].tolist(), df["recommended_price"].tolist())) if _has_key(k)],
+        }
+        with open(search_path, "w", encoding="utf-8") as f:
+            f.write("window.REPORT_SEARCH = " + json.dumps(index, ensure_ascii=False, separators=(",", ":")) + ";\n")
+        if sig:
+            signatures[search_name] = (sig, _stamp(search_path))
+        written += 1
+
+    rec = df["recommended_price"].tolist()
+    page_links = " ".join(
+        f'<a class="badge" href="{names[i]}" '
+        f'title="${rec[i * page_size]:.2f} – ${rec[min((i + 1) * page_size, total) - 1]:.2f}">{i + 1}</a>'
+        for i in range(pages)
+    )
+    section = PAGED_PRODUCTS_TEMPLATE.format(total=total, page_size=page_size, page_links=page_links,
+                                             search_src=search_name, max_results=SEARCH_MAX_RESULTS)
+    return section, written
+
+# -------------------------
+# Incremental builds
+# -------------------------
+def _state_dir(output_path):
+    return os.path.join(REPORT_STATE_DIR, hashlib.sha1(os.path.abspath(output_path).encode("utf-8")).hexdigest()[:16])
+
+def load_build_state(output_path):
+    """
+    The previous incremental build of `output_path`, or None (none yet, or
+    from another BUILD_VERSION). A full build of the same output deletes it.
+    """
+    path = os.path.join(_state_dir(output_path), "state.pkl")
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return state if state.get("version") == BUILD_VERSION else None
+
+def _outputs_intact(output_path, state):
+    """True if the report and every page/search file are as the build in `state` left them."""
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    return state.get("output_stamp") == _stamp(output_path) and all(
+        stamp == _stamp(os.path.join(out_dir, name)) for name, (_, stamp) in state["signatures"].items())
+
+def save_build_state(output_path, frame, signatures, options=None):
+    state_dir = _state_dir(output_path)
+    os.makedirs(state_dir, exist_ok=True)
+    state = {
+        "version": BUILD_VERSION,
+        "output": os.path.abspath(output_path),
+        "frame": frame.drop(columns=["card"], errors="ignore"),
+        "signatures": signatures,
+        "options": options,
+        "output_stamp": _stamp(output_path),
+    }
+    path = os.path.join(state_dir, "state.pkl")
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+def load_frame_incremental(path, previous=None):
+    """
+    load_frame that reuses `previous` (the frame of the last build, with its
+    record_hash column): records are identified by a hash of their line, and
+    only lines not seen last time are parsed. Returns (frame, changed keys,
+    removed keys); the frame equals load_frame's plus record_hash and
+    whatever other columns `previous` carried.
+    """
+    known = set() if previous is None else set(previous["record_hash"].tolist())
+    hashes, fresh, fresh_hashes = [], [], []
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+            h = hashlib.sha1(line).hexdigest()
+            if h not in known:
+                try:
+                    fresh.append(json.loads(line))
+                except Exception:
+                    continue
+                fresh_hashes.append(h)
+            hashes.append(h)
+
+    new_rows = build_dfs(fresh)
+    new_rows["record_hash"] = fresh_hashes
+    if previous is None:
+        frame = new_rows
+    else:
+        # row of each current line in [previous rows..., new rows...]
+        where = {h: i for i, h in enumerate(previous["record_hash"].tolist())}
+        where.update((h, len(previous) + i) for i, h in enumerate(fresh_hashes))
+        # an empty part would turn float columns into object ones
+        combined = pd.concat([previous, new_rows], ignore_index=True) if len(new_rows) else previous
+        frame = combined.take([where[h] for h in hashes]).reset_index(drop=True)
+        for c in OPTIONAL_COLUMNS:
+            # back to the dtype build_dfs would infer for the whole catalogue
+            values = [None if v is None or v != v else v for v in frame[c].tolist()]
+            frame[c] = pd.Series(values, dtype=object).infer_objects()
+        frame = frame[list(new_rows.columns) + [c for c in frame.columns if c not in new_rows.columns]]
+
+    old_keys = set() if previous is None else set(previous["key"].tolist())
+    changed = set(new_rows["key"].tolist())
+    removed = old_keys - set(frame["key"].tolist())
+    return frame, changed, removed
+
+def load_cards(frame, state_dir):
+    """
+    Card HTML for every row of `frame`, from an append-only store in
+    `state_dir`: rows without a stored card (new or changed records) are
+    rendered and appended, and card_offset/card_length on the frame say
+    where each card lives. The store is rewritten with only live cards once
+    it is mostly garbage.
+    """
+    path = os.path.join(state_dir, "cards.bin")
+    os.makedirs(state_dir, exist_ok=True)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if "card_offset" not in frame:
+        frame["card_offset"] = -1
+        frame["card_length"] = 0
+    frame["card_offset"] = frame["card_offset"].fillna(-1).astype(np.int64)
+    frame["card_length"] = frame["card_length"].fillna(0).astype(np.int64)
+    if len(frame) and (frame["card_offset"] + frame["card_length"]).max() > size:
+        # store lost or truncated: start over
+        frame["card_offset"] = -1
+        size = 0
+        open(path, "wb").close()
+
+    missing = (frame["card_offset"] < 0).to_numpy()
+    if missing.any():
+        blobs = [c.encode("utf-8") for c in render_product_cards(frame[missing])]
+        lengths = np.array([len(b) for b in blobs], dtype=np.int64)
+        frame.loc[missing, "card_offset"] = size + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        frame.loc[missing, "card_length"] = lengths
+        with open(path, "ab") as f:
+            f.write(b"".join(blobs))
+        size += int(lengths.sum())
+
+    with open(path, "rb") as f:
+        data = f.read()
+    blobs = [data[o:o + n] for o, n in zip(frame["card_offset"].tolist(), frame["card_length"].tolist())]
+
+    live = int(frame["card_length"].sum())
+    if size > 2 * live + CARD_STORE_SLACK:
+        with open(path + ".tmp", "wb") as f:
+            f.write(b"".join(blobs))
+        os.replace(path + ".tmp", path)
+        lengths = frame["card_length"].to_numpy()
+        frame["card_offset"] = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    return [b.decode("utf-8") for b in blobs]
 
 # -------------------------
 # Main
 # -------------------------
-def generate_report(input_path, output_path):
-    records = read_jsonl("merged.jsonl")
-    if not records:
-        print("No records found in", "merged.jsonl")
+def generate_report(input_path, output_path, chart_format="png", assets_dir=None, workers=None,
+                    cache_dir=CHART_CACHE_DIR, page_size=None, incremental=False):
+    """
+    Single page by default, with the top 60 products. With `page_size` the
+    report is an index page (summaries, charts, search, page links) plus
+    every product in pages of `page_size` cards next to it.
+
+    `incremental` builds on the previous incremental build of the same
+    output (state under REPORT_STATE_DIR): only records whose line changed
+    are parsed and only their cards rendered, and pages, charts and the
+    search index are rewritten only if what they show changed. Aggregates
+    are recomputed over the frame, which is cheap. The output is the same
+    as a full build.
+    """
+    if incremental:
+        state = load_build_state(output_path)
+        df, changed, removed = load_frame_incremental(input_path, state and state["frame"])
+        signatures = state["signatures"] if state else {}
+        options = [chart_format, assets_dir, page_size]
+        if (state and not changed and not removed and state.get("options") == options
+                and _outputs_intact(output_path, state)
+                and df["record_hash"].tolist() == state["frame"]["record_hash"].tolist()):
+            print(f"Report {output_path} is up to date")
+            return
+    else:
+        # the files are about to differ from what the incremental state describes
+        shutil.rmtree(_state_dir(output_path), ignore_errors=True)
+        df = load_frame(input_path)
+    if df.empty:
+        print("No records found in", input_path)
         return
 
-    df = build_dfs(records)
-
     # market stats
     n_products = len(df)
     avg_price = float(df["price"].replace(0, pd.NA).dropna().mean() or 0.0)
     avg_sentiment = float(df["positive_ratio"].mean() or 0.0)
 
     # charts
-    fig_price = chart_price_vs_competitor(df)
-    img_price = embed_png_figure(fig_price)
-
-    fig_sent = chart_sentiment_distribution(df)
-    img_sent = embed_png_figure(fig_sent)
+    charts = render_charts(df, chart_format, cache_dir=cache_dir, workers=workers)
+    srcs = chart_sources(charts, chart_format, output_path, assets_dir)
 
     # top insights
     insights = []
@@ -333,7 +833,14 @@ def generate_report(input_path, output_path):
     top_insights_html = "".join(f"<li>{i}</li>" for i in insights)
 
     # product cards
-    product_cards = "\n".join(render_product_card(r) for _, r in df.sort_values("recommended_price", ascending=False).head(60).iterrows())
+    if incremental and page_size:
+        df["card"] = load_cards(df, _state_dir(output_path))
+    by_rec = df.sort_values("recommended_price", ascending=False)
+    if page_size:
+        product_cards, written = write_pages(by_rec, output_path, page_size, workers,
+                                             signatures if incremental else None)
+    else:
+        product_cards = "\n".join(render_product_cards(by_rec.head(60)))
 
     # highlights
     most_underpriced = "—"
@@ -356,12 +863,13 @@ def generate_report(input_path, output_path):
     rec_summary_html = "".join(f"<li>{s}</li>" for s in rec_summary)
 
     html = HTML_TEMPLATE.format(
+        style=STYLE,
         n_products=n_products,
         avg_price=avg_price,
         avg_sentiment=avg_sentiment,
         top_insights=top_insights_html,
-        chart_price=img_price,
-        chart_sentiment=img_sent,
+        chart_price=srcs["price"],
+        chart_sentiment=srcs["sentiment"],
         product_cards=product_cards,
         most_underpriced=most_underpriced,
         most_overpriced=most_overpriced,
@@ -371,22 +879,48 @@ def generate_report(input_path, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
 
-    print(f"Report written to {output_path}")
+    if incremental:
+        save_build_state(output_path, df, signatures, options)
+        note = f"{len(changed)} changed, {len(removed)} removed of {n_products} products"
+        if page_size:
+            note += f"; {written} page/search files rewritten"
+        print(f"Report written to {output_path} ({note})")
+    else:
+        print(f"Report written to {output_path}")
 
 # -------------------------
 # CLI
 # -------------------------
+def _page_size(value):
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {size}")
+    return size
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", "-i", required=True, help="merged.jsonl input (one JSON per line)")
     parser.add_argument("--output", "-o", default="report.html", help="output HTML path")
+    parser.add_argument("--chart-format", choices=sorted(MIME), default="png", help="chart image format")
+    parser.add_argument("--assets-dir", help="write charts as files here (relative to the report) instead of inlining base64")
+    parser.add_argument("--workers", type=int, default=None, help="processes for charts and pages (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render charts")
+    parser.add_argument("--pages", action="store_true", help="index page plus every product in paged shards")
+    parser.add_argument("--page-size", type=_page_size, default=PAGE_SIZE, help="products per page with --pages")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-render only what changed since the last --incremental build of this output "
+                             "(a full build of it starts over). Pays off with --pages; a single-page report still "
+                             "hashes every record and recomputes aggregates, so it takes ~80-90%% of a full build")
     args = parser.parse_args()
 
     if not os.path.exists(args.input):
         print("Input file not found:", args.input)
         sys.exit(1)
 
-    generate_report(args.input, args.output)
+    generate_report(args.input, args.output, chart_format=args.chart_format, assets_dir=args.assets_dir,
+                    workers=args.workers, cache_dir=None if args.no_cache else CHART_CACHE_DIR,
+                    page_size=args.page_size if args.pages else None, incremental=args.incremental)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
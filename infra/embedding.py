@@ -1,11 +1,13 @@
 import threading
 import numpy as np
-from typing import List
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
 from sentence_transformers import SentenceTransformer
 
 _MODEL_LOCK = threading.Lock()
 _MODEL = None
 _MODEL_NAME = "all-MiniLM-L6-v2"  # change if you want different dim
+DEFAULT_CHUNK_SIZE = 64
 
 def get_embedder():
     global _MODEL
@@ -15,10 +17,57 @@ def get_embedder():
                 _MODEL = SentenceTransformer(_MODEL_NAME)
     return _MODEL
 
+def get_model_name() -> str:
+    return _MODEL_NAME
+
 def embed_text(text: str) -> np.ndarray:
     model = get_embedder()
     return np.asarray(model.encode(text), dtype="float32")
 
 def embed_texts(texts: List[str]) -> np.ndarray:
     model = get_embedder()
-    return np.asarray(model.encode(texts), dtype="float32")
\ No newline at end of file
+    return np.asarray(model.encode(texts), dtype="float32")
+
+def iter_chunks(items: Iterable, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_embeddings(texts: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Encode texts `chunk_size` at a time; only one chunk of vectors is alive at once."""
+    model = get_embedder()
+    for chunk in iter_chunks(texts, chunk_size):
+        yield np.asarray(model.encode(chunk), dtype="float32")
+
+def mean_embedding(
+    texts: Iterable[str],
+    weights: Optional[Iterable[float]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Optional[np.ndarray]:
+    """
+    Streaming (weighted) mean of per-text embeddings. Unlike embedding the
+    joined text, every text contributes – nothing is cut off by the model's
+    max sequence length – and memory stays at one chunk.
+    Returns None when there is nothing to embed.
+    """
+    if weights is None:
+        pairs = ((t, 1.0) for t in texts)
+    else:
+        pairs = zip(texts, weights)
+
+    total = None
+    weight_sum = 0.0
+    model = get_embedder()
+    for chunk in iter_chunks(pairs, chunk_size):
+        vecs = np.asarray(model.encode([t for t, _ in chunk]), dtype="float64")
+        w = np.asarray([w for _, w in chunk], dtype="float64")
+        part = w @ vecs
+        total = part if total is None else total + part
+        weight_sum += float(w.sum())
+
+    if total is None or weight_sum <= 0:
+        return None
+    return (total / weight_sum).astype("float32")
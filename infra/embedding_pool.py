@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import argparse
+from collections import deque, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from infra.embedding import get_embedder, iter_chunks
+
+# ------------------------------------------------------------
+# WORKER SIDE
+# ------------------------------------------------------------
+
+def _init_worker(threads_per_worker: int):
+    # One model per process, loaded before the first shard arrives
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except Exception:
+        pass
+    get_embedder()
+
+
+def _encode_shard(seq: int, texts):
+    start = time.perf_counter()
+    vecs = np.asarray(get_embedder().encode(texts), dtype="float32")
+    return seq, os.getpid(), time.perf_counter() - start, vecs
+
+
+# ------------------------------------------------------------
+# POOL
+# ------------------------------------------------------------
+
+class EmbeddingPool:
+    """
+    Shards texts across worker processes and yields the embeddings back in
+    input order. At most `max_in_flight` shards are queued at a time, so an
+    arbitrarily long input is processed in bounded memory.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256,
+                 max_in_flight: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or self.workers * 2
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(threads,)
+        )
+        self.busy: Dict[int, float] = defaultdict(float)
+        self.texts_done: Dict[int, int] = defaultdict(int)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def imap(self, texts: Iterable[str]) -> Iterator[np.ndarray]:
+        """Yield one [chunk, dim] array per `chunk_size` texts, in order."""
+        pending = deque()
+        for seq, chunk in enumerate(iter_chunks(texts, self.chunk_size)):
+            pending.append(self.executor.submit(_encode_shard, seq, chunk))
+            if len(pending) >= self.max_in_flight:
+                yield self._collect(pending.popleft())
+        while pending:
+            yield self._collect(pending.popleft())
+
+    def _collect(self, fut) -> np.ndarray:
+        _, pid, busy, vecs = fut.result()
+        self.busy[pid] += busy
+        self.texts_done[pid] += len(vecs)
+        return vecs
+
+    def utilization(self, wall_seconds: float) -> Dict[int, Dict[str, float]]:
+        return {
+            pid: {
+                "texts": self.texts_done[pid],
+                "busy_s": round(self.busy[pid], 2),
+                "utilization": round(self.busy[pid] / wall_seconds, 3) if wall_seconds else 0.0,
+            }
+            for pid in sorted(self.busy)
+        }
+
+
+# ------------------------------------------------------------
+# BACKFILL CLI
+# ------------------------------------------------------------
+
+def _memory_class(name: str):
+    from memory_bank.product_memory import ProductMemory
+    from memory_bank.pricing_memory import PricingMemory
+    from memory_bank.sentiment_memory import SentimentMemory
+    return {"product": ProductMemory, "pricing": PricingMemory, "sentiment": SentimentMemory}[name]
+
+
+def _iter_records(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Text each memory's writer embeds, so backfilled vectors share the agents' space.
+# Sentiment vectors are means over review embeddings (or a summary only the
+# coordinator builds), which a metadata record can't reproduce.
+RECORD_TEXT = {
+    # scraper agent: the whole product record
+    "product": lambda meta: json.dumps(meta, ensure_ascii=False),
+    # pricing agent: the recommendation and the ratio it came from
+    "pricing": lambda meta: f"{meta.get('recommended_price')} ratio={meta.get('positive_ratio')}",
+}
+
+
+def record_text(record, memory: str = "product", text_field: Optional[str] = None) -> str:
+    meta = record.get("metadata", {})
+    if text_field:
+        return str(meta.get(text_field) or "")
+    if memory not in RECORD_TEXT:
+        raise ValueError(f"No default text for {memory} memory – pass a text field")
+    return RECORD_TEXT[memory](meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed a memory JSONL dump with a process pool")
+    parser.add_argument("--input", "-i", required=True, help="memory JSONL ({key, metadata} per line)")
+    parser.add_argument("--memory", choices=["product", "pricing", "sentiment"], default="product")
+    parser.add_argument("--index-out", required=True, help="output FAISS index path")
+    parser.add_argument("--metadata-out", required=True, help="output metadata JSONL path")
+    parser.add_argument("--text-field", default=None,
+                        help="embed this metadata field instead of the text the memory's agent embeds "
+                             "(required for --memory sentiment)")
+    parser.add_argument("--workers", "-w", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--flush-every", type=int, default=10_000, help="rows per bulk memory write")
+    args = parser.parse_args()
+
+    if args.memory not in RECORD_TEXT and not args.text_field:
+        parser.error(f"--memory {args.memory} has no default text (its agent doesn't embed a record field); "
+                     f"pass --text-field")
+    for p in (args.index_out, args.metadata_out):
+        if os.path.exists(p):
+            parser.error(f"{p} already exists – refusing to append a backfill to it")
+
+    mem = None
+    buf_keys, buf_meta, buf_vecs = [], [], []
+    total = 0
+
+    def flush():
+        nonlocal mem
+        if not buf_keys:
+            return
+        vecs = np.vstack(buf_vecs)
+        if mem is None:
+            mem = _memory_class(args.memory)(
+                dim=vecs.shape[1], index_path=args.index_out, metadata_path=args.metadata_out
+            )
+        mem.save_batch(buf_keys, buf_meta, embeddings=vecs)
+        buf_keys.clear(); buf_meta.clear(); buf_vecs.clear()
+
+    # Records are read twice (texts for the pool, metadata for the write)
+    # so neither side has to hold the whole dump.
+    records = _iter_records(args.input)
+    start = time.perf_counter()
+
+    with EmbeddingPool(workers=args.workers, chunk_size=args.chunk_size) as pool:
+        texts = (record_text(r, args.memory, args.text_field) for r in _iter_records(args.input))
+        for vecs in pool.imap(texts):
+            for vec in vecs:
+                rec = next(records)
+                buf_keys.append(rec.get("key"))
+                buf_meta.append(rec.get("metadata", {}))
+                buf_vecs.append(vec)
+            total += len(vecs)
+            if len(buf_keys) >= args.flush_every:
+                flush()
+        flush()
+
+        wall = time.perf_counter() - start
+        print(f"Embedded {total} texts in {wall:.1f}s → {total / wall if wall else 0:.1f} texts/sec")
+        for pid, stats in pool.utilization(wall).items():
+            print(f"  worker {pid}: {stats['texts']} texts, busy {stats['busy_s']}s, "
+                  f"utilization {stats['utilization'] * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
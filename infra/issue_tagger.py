@@ -0,0 +1,99 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Category → trigger phrases (matched case-insensitively on word boundaries).
+# A trailing "*" means "any word continuation", e.g. "ship*" hits shipped/shipping.
+ISSUE_CATEGORIES: Dict[str, List[str]] = {
+    "shipping": ["ship*", "delivery", "delivered late", "arrived late", "courier"],
+    "coil_whine": ["coil whine", "coil-whine", "buzzing", "whining noise"],
+    "doa": ["doa", "dead on arrival", "arrived dead", "died after*", "stopped working", "won't boot"],
+    "power": ["power consumption", "power draw", "power supply", "psu", "wattage", "power hungry"],
+    "driver": ["driver*", "black screen", "crash*"],
+    "packaging": ["packaging", "arrived damaged", "box damaged", "damaged box", "poorly packed"],
+}
+
+# Separator between reviews in the joined corpus; never appears in a pattern
+_SEP = "\x00"
+
+
+def _phrase_regex(phrase: str) -> str:
+    phrase = phrase.lower()
+    if phrase.endswith("*"):
+        return re.escape(phrase[:-1]) + r"\w*"
+    return re.escape(phrase) + r"\b"
+
+
+class IssueTagger:
+    """
+    Tags reviews with issue categories in a single pass.
+
+    All phrases are compiled into one alternation regex (one group per
+    category), run once over the whole batch joined and lowercased into a
+    single string.
+    Match offsets are mapped back to reviews with a vectorized searchsorted,
+    so the cost is one scan of the text regardless of how many categories
+    exist.
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        self.categories = dict(categories or ISSUE_CATEGORIES)
+        self.names = list(self.categories)
+
+        groups = [
+            "(" + "|".join(_phrase_regex(p) for p in phrases) + ")"
+            for phrases in self.categories.values()
+        ]
+        # Leading \b is shared by every branch, so it is checked once per position
+        self.pattern = re.compile(r"\b(?:" + "|".join(groups) + ")")
+
+    def tag_matrix(self, texts: List[str]) -> np.ndarray:
+        """Boolean matrix [n_reviews, n_categories]: does review i mention issue j."""
+        hits = np.zeros((len(texts), len(self.names)), dtype=bool)
+        if not texts:
+            return hits
+
+        # lower() per review: a few characters change length when lowercased
+        lowered = [t.lower() for t in texts]
+        corpus = _SEP.join(lowered)
+        lengths = np.fromiter((len(t) + 1 for t in lowered), dtype="int64", count=len(lowered))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        positions, cats = [], []
+        for m in self.pattern.finditer(corpus):
+            positions.append(m.start())
+            cats.append(m.lastindex - 1)
+
+        if positions:
+            rows = np.searchsorted(starts, np.asarray(positions, dtype="int64"), side="right") - 1
+            hits[rows, np.asarray(cats, dtype="int64")] = True
+
+        return hits
+
+    def summarize(self, texts: List[str]) -> Dict[str, Dict[str, float]]:
+        """Per-issue review counts and frequencies (share of reviews mentioning it)."""
+        hits = self.tag_matrix(texts)
+        counts = hits.sum(axis=0)
+        n = max(len(texts), 1)
+
+        issue_counts = {name: int(c) for name, c in zip(self.names, counts) if c}
+        issue_frequencies = {
+            name: round(int(c) / n, 4) for name, c in zip(self.names, counts) if c
+        }
+        return {"counts": issue_counts, "frequencies": issue_frequencies}
+
+
+_default_tagger = None
+
+
+def get_issue_tagger() -> IssueTagger:
+    global _default_tagger
+    if _default_tagger is None:
+        _default_tagger = IssueTagger()
+    return _default_tagger
+
+
+def top_issues(counts: Dict[str, int]) -> List[str]:
+    """Issue names ordered by how many reviews mention them."""
+    return [k for k, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))]
@@ -0,0 +1,293 @@
+import numpy as np
+from itertools import chain
+from typing import Dict, Any, List, Optional, Tuple
+
+# ------------------------------------------------------------
+# BUSINESS REASONS
+# ------------------------------------------------------------
+# Shared by the scalar and batch pricers; the batch pricer returns the
+# index into SENTIMENT_REASONS / MARKET_REASONS instead of the text.
+
+REASON_NO_COMPETITORS = "No competitor pricing available – keeping current price."
+REASON_WEAK_SENTIMENT = "Customer sentiment is neutral or weak – avoid aggressive pricing changes."
+REASON_STRONG_SENTIMENT = "Customer sentiment is very strong – pricing can be more confident."
+REASON_UNDERPRICED_STRONG = "Product is significantly underpriced relative to competitors – controlled price increase is justified."
+REASON_UNDERPRICED_WEAK = "Market price is significantly higher – but sentiment is weak, so keep adjustments conservative."
+REASON_BELOW_STRONG = "Slightly below competitor pricing with good sentiment – mild uplift acceptable."
+REASON_BELOW_WEAK = "Pricing slightly below competitors – better to maintain position until sentiment improves."
+REASON_MATCH_STRONG = "Pricing matches market and sentiment is strong – small upward correction reasonable."
+REASON_MATCH_WEAK = "Pricing aligns with competitors – focus on strengthening sentiment."
+REASON_ABOVE_WEAK = "Product priced above competitors with weak sentiment – consider slight reduction."
+REASON_ABOVE_STRONG = "Product priced above competitors but sentiment strong – premium pricing acceptable."
+REASON_DEFAULT = "Pricing adjustment generated based on market and sentiment factors."
+
+SENTIMENT_REASONS = (None, REASON_WEAK_SENTIMENT, REASON_STRONG_SENTIMENT)
+MARKET_REASONS = (
+    REASON_NO_COMPETITORS,
+    REASON_UNDERPRICED_STRONG,
+    REASON_UNDERPRICED_WEAK,
+    REASON_BELOW_STRONG,
+    REASON_BELOW_WEAK,
+    REASON_MATCH_STRONG,
+    REASON_MATCH_WEAK,
+    REASON_ABOVE_WEAK,
+    REASON_ABOVE_STRONG,
+)
+
+
+# ------------------------------------------------------------
+# RULES
+# ------------------------------------------------------------
+# The one copy of the pricing constants: the scalar and batch pricers and
+# the what-if simulator all read them from here.
+
+PRICING_RULES = {
+    "strong_sentiment": 0.85,   # positive ratio from which strong_factor applies
+    "good_sentiment": 0.70,     # ... good_factor; below it weak_factor
+    "strong_factor": 0.12,
+    "good_factor": 0.05,
+    "weak_factor": -0.03,
+    "gap_weight": 0.40,         # share of the competitor gap added to the price
+    "clamp_high": 1.20,         # price limits as multiples of the base price
+    "clamp_low": 0.85,
+}
+
+# Thresholds that pick the business reasons; they don't move the price
+REASON_RULES = {
+    "weak_sentiment": 0.60,         # positive ratio below which sentiment is called weak
+    "strong_sentiment": 0.80,       # ... above which it is called very strong
+    "good_sentiment": 0.70,         # under/below market: strong vs weak wording
+    "match_strong_sentiment": 0.75, # matching the market: strong vs weak wording
+    "above_weak_sentiment": 0.65,   # above the market: weak vs strong wording
+    "underpriced_gap": 0.10,        # competitor gap (share of their average) for "significantly underpriced"
+    "match_band": 0.02,             # |gap| within which the price matches the market
+}
+
+
+# ------------------------------------------------------------
+# BUSINESS LOGIC
+# ------------------------------------------------------------
+
+def compute_recommended_price(
+    base_price: float,
+    competitor_prices: List[float],
+    positive_ratio: float
+) -> Dict[str, Any]:
+    if not competitor_prices:
+        return {
+            "recommended_price": round(base_price, 2),
+            "competitor_average_price": None,
+            "sentiment_score": positive_ratio,
+            "business_reason": [REASON_NO_COMPETITORS]
+        }
+
+    competitor_avg = float(np.mean(competitor_prices))
+
+    # MARKET GAP
+    gap = (competitor_avg - base_price) / competitor_avg
+
+    # PROPOSED PRICE (sentiment factor, share of the gap, limits)
+    new_price = float(apply_pricing_rules(base_price, gap, positive_ratio, PRICING_RULES))
+
+    # REASONS
+    r = REASON_RULES
+    reasons = []
+
+    if positive_ratio < r["weak_sentiment"]:
+        reasons.append(REASON_WEAK_SENTIMENT)
+    elif positive_ratio > r["strong_sentiment"]:
+        reasons.append(REASON_STRONG_SENTIMENT)
+
+    if gap > r["underpriced_gap"]:
+        if positive_ratio > r["good_sentiment"]:
+            reasons.append(REASON_UNDERPRICED_STRONG)
+        else:
+            reasons.append(REASON_UNDERPRICED_WEAK)
+    elif gap > r["match_band"]:
+        if positive_ratio > r["good_sentiment"]:
+            reasons.append(REASON_BELOW_STRONG)
+        else:
+            reasons.append(REASON_BELOW_WEAK)
+    elif abs(gap) <= r["match_band"]:
+        if positive_ratio > r["match_strong_sentiment"]:
+            reasons.append(REASON_MATCH_STRONG)
+        else:
+            reasons.append(REASON_MATCH_WEAK)
+    else:
+        if positive_ratio < r["above_weak_sentiment"]:
+            reasons.append(REASON_ABOVE_WEAK)
+        else:
+            reasons.append(REASON_ABOVE_STRONG)
+
+    if not reasons:
+        reasons.append(REASON_DEFAULT)
+
+    return {
+        "recommended_price": round(new_price, 2),
+        "competitor_average_price": round(competitor_avg, 2),
+        "sentiment_score": round(positive_ratio, 2),
+        "business_reason": reasons
+    }
+
+
+# ------------------------------------------------------------
+# BATCH PRICING
+# ------------------------------------------------------------
+
+def apply_pricing_rules(base, gap, ratio, rules: Dict[str, Any]) -> np.ndarray:
+    """
+    Unrounded recommended price for products with competitors. Rule values
+    may be arrays (e.g. one row per scenario) that broadcast against the
+    product arrays; with PRICING_RULES the arithmetic is the scalar one.
+    """
+    sentiment_factor = np.where(
+        ratio >= rules["strong_sentiment"], rules["strong_factor"],
+        np.where(ratio >= rules["good_sentiment"], rules["good_factor"], rules["weak_factor"]),
+    )
+    competitor_adjust = gap * rules["gap_weight"]
+    new_price = base + competitor_adjust + (base * sentiment_factor)
+    return np.maximum(np.minimum(new_price, base * rules["clamp_high"]), base * rules["clamp_low"])
+
+
+def round_prices(values: np.ndarray) -> np.ndarray:
+    """
+    Elementwise round(x, 2) with Python's semantics: the exact binary value
+    of x is rounded half-to-even. rint(x * 100) / 100 agrees except where
+    x * 100 lands within rounding error of a .5 tie. Those are settled
+    exactly: x is split in two halves whose products with 25 are exact, so
+    the sign of x * 25 - (2k + 1) / 8, i.e. x against the midpoint
+    (k + 0.5) / 100, comes out right.
+    """
+    scaled = values * 100.0
+    out = np.rint(scaled) / 100.0
+    with np.errstate(invalid="ignore"):
+        frac = scaled - np.floor(scaled)
+        near_tie = np.abs(frac - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+        exotic = ~(np.abs(scaled) < 2.0 ** 52)  # NaN, inf, no fraction digits left
+
+    ties = np.flatnonzero(near_tie & ~exotic)
+    if ties.size:
+        x = values[ties]
+        k = np.floor(scaled[ties])
+        split = x * 134217729.0  # 2**27 + 1
+        hi = split - (split - x)
+        lo = x - hi
+        diff = (hi * 25.0 - (2.0 * k + 1.0) / 8.0) + lo * 25.0
+        up = (diff > 0) | ((diff == 0) & (k % 2 == 1))
+        out[ties] = np.copysign((k + up) / 100.0, x)
+
+    for i in np.flatnonzero(exotic):
+        out[i] = round(float(values[i]), 2)
+    return out
+
+
+def _competitor_rows(competitor_matrix, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (n, width) float matrix with each row's prices first, in their original
+    order, then NaN padding; plus the price count per row. Accepts a 2-D
+    array with NaN for missing prices, or one price list per product.
+    """
+    if isinstance(competitor_matrix, np.ndarray) and competitor_matrix.ndim == 2:
+        matrix = competitor_matrix.astype(np.float64, copy=False)
+        present = ~np.isnan(matrix)
+        if (present[:, 1:] > present[:, :-1]).any():
+            # a gap before a price: move every row's prices to the front
+            order = np.argsort(~present, axis=1, kind="stable")
+            matrix = np.take_along_axis(matrix, order, axis=1)
+        counts = present.sum(axis=1)
+    else:
+        rows = list(competitor_matrix)
+        counts = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=int(counts.sum()))
+        matrix = np.full((len(rows), int(counts.max(initial=0))), np.nan)
+        matrix[np.arange(matrix.shape[1]) < counts[:, None]] = flat
+
+    if matrix.shape[0] != n:
+        raise ValueError(f"competitor_matrix has {matrix.shape[0]} rows for {n} products")
+    return matrix, counts
+
+
+def compute_recommended_prices(
+    base_prices,
+    competitor_matrix,
+    positive_ratios,
+    rules: Optional[Dict[str, Any]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    compute_recommended_price over arrays, with identical results.
+    `rules` overrides PRICING_RULES entries (reasons follow REASON_RULES).
+
+    `competitor_matrix` is a 2-D array (NaN where a product has fewer
+    competitors) or one price list per product. Returns arrays of
+    recommended_price, competitor_average_price (NaN without competitors),
+    sentiment_score, and reason indices: sentiment_reason into
+    SENTIMENT_REASONS (0 = none) and market_reason into MARKET_REASONS.
+
+    Averages are taken per group of rows with the same competitor count,
+    so each is the same reduction np.mean does on that product's list.
+    """
+    base = np.asarray(base_prices, dtype=np.float64)
+    ratio = np.asarray(positive_ratios, dtype=np.float64)
+    matrix, counts = _competitor_rows(competitor_matrix, len(base))
+
+    avg = np.full(len(base), np.nan)
+    order = np.argsort(counts, kind="stable")
+    sorted_counts = counts[order]
+    for k in np.unique(sorted_counts[sorted_counts > 0]):
+        rows = order[np.searchsorted(sorted_counts, k, "left"):np.searchsorted(sorted_counts, k, "right")]
+        avg[rows] = matrix[rows, :k].mean(axis=1)
+
+    has = counts > 0
+    if (avg[has] == 0).any():
+        row = int(np.flatnonzero(has & (avg == 0))[0])
+        raise ZeroDivisionError(f"competitor average price is zero (row {row})")
+
+    with np.errstate(invalid="ignore"):
+        gap = (avg - base) / avg
+    new_price = apply_pricing_rules(base, gap, ratio, {**PRICING_RULES, **(rules or {})})
+
+    r = REASON_RULES
+    sentiment_reason = np.select([ratio < r["weak_sentiment"], ratio > r["strong_sentiment"]], [1, 2], 0).astype(np.int8)
+    with np.errstate(invalid="ignore"):
+        market_reason = np.select(
+            [~has, gap > r["underpriced_gap"], gap > r["match_band"], np.abs(gap) <= r["match_band"]],
+            [0,
+             np.where(ratio > r["good_sentiment"], 1, 2),
+             np.where(ratio > r["good_sentiment"], 3, 4),
+             np.where(ratio > r["match_strong_sentiment"], 5, 6)],
+            np.where(ratio < r["above_weak_sentiment"], 7, 8),
+        ).astype(np.int8)
+    sentiment_reason[~has] = 0
+
+    avg_out = np.full(len(base), np.nan)
+    avg_out[has] = round_prices(avg[has])
+    score = ratio.copy()
+    score[has] = round_prices(ratio[has])
+
+    return {
+        "recommended_price": round_prices(np.where(has, new_price, base)),
+        "competitor_average_price": avg_out,
+        "sentiment_score": score,
+        "sentiment_reason": sentiment_reason,
+        "market_reason": market_reason,
+    }
+
+
+def batch_results(batch: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """compute_recommended_prices output as compute_recommended_price dicts."""
+    rows = zip(
+        batch["recommended_price"].tolist(),
+        batch["competitor_average_price"].tolist(),
+        batch["sentiment_score"].tolist(),
+        batch["sentiment_reason"].tolist(),
+        batch["market_reason"].tolist(),
+    )
+    return [
+        {
+            "recommended_price": price,
+            "competitor_average_price": None if avg != avg else avg,
+            "sentiment_score": score,
+            "business_reason": [SENTIMENT_REASONS[s], MARKET_REASONS[m]] if s else [MARKET_REASONS[m]],
+        }
+        for price, avg, score, s, m in rows
+    ]
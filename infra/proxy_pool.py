@@ -0,0 +1,283 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# Plain stdlib logger: infra does not depend on scrapers. The agents attach
+# their JSON handlers to it (scrapers.logger.get_logger("proxy_pool")).
+logger = logging.getLogger("proxy_pool")
+
+# Comma-separated proxy URLs, or a file with one per line; neither → direct connections
+PROXY_URLS = os.getenv("SCRAPE_PROXIES", "")
+PROXY_FILE = os.getenv("SCRAPE_PROXY_FILE", "")
+PROXY_SCORES_PATH = os.getenv("PROXY_SCORES_PATH", ".proxy_scores.json")
+
+# Concurrent requests per proxy; further requests wait for the best free proxy
+PROXY_MAX_IN_FLIGHT = int(os.getenv("PROXY_MAX_IN_FLIGHT", os.getenv("SCRAPE_HOST_CONCURRENCY", "4")))
+# Consecutive failures/blocks before a proxy is benched, and for how long
+PROXY_QUARANTINE_AFTER = int(os.getenv("PROXY_QUARANTINE_AFTER", "3"))
+PROXY_QUARANTINE_SECONDS = float(os.getenv("PROXY_QUARANTINE_SECONDS", "300"))
+
+SAVE_INTERVAL = 30.0
+ACQUIRE_POLL = 0.02       # seconds between tries while every proxy is busy
+LATENCY_ALPHA = 0.2       # EWMA weight of the newest latency sample
+PRIOR_LATENCY = 1.0       # seconds assumed for a proxy never measured
+
+
+def proxy_label(url: str) -> str:
+    """scheme://host:port – proxy credentials never reach logs, metrics or disk."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.hostname}:{parts.port}" if parts.port else f"{parts.scheme}://{parts.hostname}"
+
+
+class ProxyStats:
+    def __init__(self, url: str):
+        self.url = url
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.blocks = 0
+        self.latency = PRIOR_LATENCY
+        self.consecutive_bad = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+        self.in_flight = 0
+
+    def score(self) -> float:
+        """
+        Expected clean responses per second of latency. Success and block
+        rates are Laplace-smoothed so a new proxy starts at 1/2 and is still
+        tried; concurrent leases divide the score so load spreads across
+        comparable proxies instead of piling onto the single best one.
+        """
+        ok_rate = (self.successes + 1) / (self.requests + 2)
+        unblocked = 1 - (self.blocks + 1) / (self.requests + 2) / 2
+        return ok_rate * unblocked / max(self.latency, 0.01) / (1 + self.in_flight)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "blocks": self.blocks,
+            "latency": round(self.latency, 4),
+            "consecutive_bad": self.consecutive_bad,
+            "quarantines": self.quarantines,
+            # wall clock on disk, monotonic in memory
+            "quarantined_until": time.time() + max(0.0, self.quarantined_until - time.monotonic())
+            if self.quarantined_until else 0.0,
+        }
+
+    def load_json(self, d: Dict[str, Any]):
+        for k in ("requests", "successes", "failures", "blocks", "consecutive_bad", "quarantines"):
+            setattr(self, k, int(d.get(k, 0)))
+        self.latency = float(d.get("latency", PRIOR_LATENCY))
+        remaining = float(d.get("quarantined_until", 0.0)) - time.time()
+        self.quarantined_until = time.monotonic() + remaining if remaining > 0 else 0.0
+
+
+class ProxyLease:
+    """One request's claim on a proxy; hand it back with ProxyPool.report()."""
+
+    __slots__ = ("stats", "done")
+
+    def __init__(self, stats: ProxyStats):
+        self.stats = stats
+        self.done = False
+
+    @property
+    def proxies(self) -> Dict[str, str]:
+        return {"http": self.stats.url, "https": self.stats.url}
+
+
+class ProxyPool:
+    """
+    Scored proxy rotation shared by every scrape in the process.
+
+    Each request leases the best-scoring proxy that is not quarantined and
+    reports how it went: latency, clean / blocked / failed. A proxy carries
+    at most `max_in_flight` leases; when all are busy, callers wait for a
+    free slot rather than queueing behind one proxy, so a burst of requests
+    is not committed to proxies before their first results are in.
+
+    A proxy that fails or gets blocked `quarantine_after` times in a row is
+    benched for `quarantine_seconds`, doubling on each repeat offence. If
+    every proxy is benched, the one due back soonest is used rather than none.
+
+    Scores persist to `path` (JSON) so a restart does not re-learn which
+    proxies are bad.
+    """
+
+    def __init__(self, urls: List[str], path: Optional[str] = PROXY_SCORES_PATH,
+                 max_in_flight: int = PROXY_MAX_IN_FLIGHT,
+                 quarantine_after: int = PROXY_QUARANTINE_AFTER,
+                 quarantine_seconds: float = PROXY_QUARANTINE_SECONDS):
+        self.path = path
+        self.max_in_flight = max_in_flight
+        self.quarantine_after = quarantine_after
+        self.quarantine_seconds = quarantine_seconds
+        self.proxies = {url: ProxyStats(url) for url in dict.fromkeys(urls)}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._load()
+
+    # -----------------------------
+    # Leasing
+    # -----------------------------
+    def try_acquire(self) -> Optional[ProxyLease]:
+        """Lease the best free proxy, or None if every usable proxy is at capacity."""
+        with self._lock:
+            now = time.monotonic()
+            free = [p for p in self.proxies.values() if p.in_flight < self.max_in_flight]
+            healthy = [p for p in free if p.quarantined_until <= now]
+            if healthy:
+                best = max(healthy, key=lambda p: (p.score(), random.random()))
+            elif free and all(p.quarantined_until > now for p in self.proxies.values()):
+                best = min(free, key=lambda p: p.quarantined_until)
+            else:
+                return None
+            best.in_flight += 1
+            return ProxyLease(best)
+
+    def acquire(self) -> ProxyLease:
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            time.sleep(ACQUIRE_POLL)
+
+    async def acquire_async(self) -> ProxyLease:
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            await asyncio.sleep(ACQUIRE_POLL)
+
+    def report(self, lease: ProxyLease, outcome: Optional[str], latency: Optional[float] = None):
+        """`outcome`: "ok", "blocked", "error", or None to release without a verdict."""
+        if lease.done:
+            return
+        lease.done = True
+        p = lease.stats
+
+        with self._lock:
+            p.in_flight -= 1
+            if outcome is None:
+                return
+
+            p.requests += 1
+            if latency is not None:
+                p.latency += LATENCY_ALPHA * (latency - p.latency)
+
+            if outcome == "ok":
+                p.successes += 1
+                p.consecutive_bad = 0
+            else:
+                if outcome == "blocked":
+                    p.blocks += 1
+                else:
+                    p.failures += 1
+                p.consecutive_bad += 1
+                # results of requests leased before the quarantine don't extend it
+                if p.consecutive_bad >= self.quarantine_after and p.quarantined_until <= time.monotonic():
+                    p.quarantines += 1
+                    p.consecutive_bad = 0
+                    hold = self.quarantine_seconds * 2 ** min(p.quarantines - 1, 4)
+                    p.quarantined_until = time.monotonic() + hold
+                    logger.warning(f"[PROXY] Quarantined {proxy_label(p.url)} for {hold:.0f}s ({outcome})")
+
+            save_due = time.monotonic() - self._last_save >= SAVE_INTERVAL
+
+        if save_due:
+            self.save()
+
+    def release(self, lease: ProxyLease):
+        self.report(lease, None)
+
+    def bench(self, lease: ProxyLease, seconds: float):
+        """Release without a verdict and keep the proxy out of rotation for `seconds`."""
+        self.report(lease, None)
+        with self._lock:
+            p = lease.stats
+            p.quarantined_until = max(p.quarantined_until, time.monotonic() + seconds)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[PROXY] Ignoring unreadable scores file {self.path}: {e}")
+            return
+        by_label = {proxy_label(url): p for url, p in self.proxies.items()}
+        for label, d in saved.get("proxies", {}).items():
+            if label in by_label:
+                by_label[label].load_json(d)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            data = {"saved_at": time.time(),
+                    "proxies": {proxy_label(url): p.to_json() for url, p in self.proxies.items()}}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=directory, suffix=".tmp", encoding="utf-8") as tmp:
+            json.dump(data, tmp, indent=2)
+        os.replace(tmp.name, self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                proxy_label(url): {
+                    **{k: v for k, v in p.to_json().items() if k != "quarantined_until"},
+                    "score": round(p.score(), 4),
+                    "in_flight": p.in_flight,
+                    "quarantined_for": round(max(0.0, p.quarantined_until - now), 1),
+                }
+                for url, p in self.proxies.items()
+            }
+
+
+def _configured_proxies() -> List[str]:
+    urls = [u.strip() for u in PROXY_URLS.split(",") if u.strip()]
+    if PROXY_FILE:
+        with open(PROXY_FILE, "r", encoding="utf-8") as f:
+            urls += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return urls
+
+
+_pool: Optional[ProxyPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool() -> Optional[ProxyPool]:
+    """Process-wide pool from SCRAPE_PROXIES / SCRAPE_PROXY_FILE; None when no proxies are configured."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            urls = _configured_proxies()
+            if not urls:
+                return None
+            _pool = ProxyPool(urls)
+            logger.info(f"[PROXY] Pool of {len(urls)} proxies")
+        return _pool
+
+
+def set_proxy_pool(pool: Optional[ProxyPool]):
+    """Install a pool explicitly (e.g. built from a list instead of the environment)."""
+    global _pool
+    with _pool_lock:
+        _pool = pool
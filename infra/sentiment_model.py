@@ -0,0 +1,227 @@
+import os
+import io
+import time
+import queue
+import pickle
+import argparse
+import tempfile
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from infra.embedding import get_embedder, get_model_name
+
+DEFAULT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH", "memory_bank/metadata/sentiment_clf.pkl")
+
+# Review-level training data (one embedding per rated review)
+REVIEW_INDEX_PATH = "memory_bank/metadata/sentiment_reviews.faiss"
+REVIEW_METADATA_PATH = "memory_bank/metadata/sentiment_reviews.jsonl"
+
+ARTIFACT_FORMAT = 1
+
+# Used only when no trained artifact exists yet
+SEED_TEXTS = ["good", "excellent", "bad", "terrible"]
+SEED_LABELS = [1, 1, 0, 0]
+
+
+class SentimentModel:
+    """A fitted classifier plus the metadata needed to know when it is stale."""
+
+    def __init__(self, classifier, model_version: str, embedding_model: str,
+                 trained_at: str, n_samples: int):
+        self.classifier = classifier
+        self.model_version = model_version
+        self.embedding_model = embedding_model
+        self.trained_at = trained_at
+        self.n_samples = n_samples
+
+    def predict(self, embeddings: np.ndarray) -> np.ndarray:
+        return self.classifier.predict(np.asarray(embeddings, dtype="float32"))
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.model_version,
+            "embedding_model": self.embedding_model,
+            "trained_at": self.trained_at,
+            "n_samples": self.n_samples,
+        }
+
+    # -----------------------------
+    # Serialization
+    # -----------------------------
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        """Write the artifact atomically so a running agent never reads half a file."""
+        payload = {"format": ARTIFACT_FORMAT, "classifier": self.classifier, **self.info()}
+
+        d = os.path.dirname(path) or "."
+        os.makedirs(d, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(delete=False, dir=d)
+        try:
+            pickle.dump(payload, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            tmp.close()
+        os.replace(tmp.name, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "SentimentModel":
+        with open(path, "rb") as f:
+            blob = f.read()
+        payload = pickle.load(io.BytesIO(blob))
+
+        if payload.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported sentiment model format: {payload.get('format')}")
+
+        if payload["embedding_model"] != get_model_name():
+            raise ValueError(
+                f"Sentiment model {payload['model_version']} was trained on "
+                f"`{payload['embedding_model']}` but the embedder is `{get_model_name()}`"
+            )
+
+        return cls(
+            classifier=payload["classifier"],
+            model_version=payload["model_version"],
+            embedding_model=payload["embedding_model"],
+            trained_at=payload["trained_at"],
+            n_samples=payload["n_samples"],
+        )
+
+
+# ------------------------------------------------------------
+# TRAINING
+# ------------------------------------------------------------
+
+def train(X: np.ndarray, y: np.ndarray, model_version: Optional[str] = None) -> SentimentModel:
+    from sklearn.linear_model import LogisticRegression
+
+    if len(set(int(v) for v in y)) < 2:
+        raise ValueError("Need both positive and negative examples to train")
+
+    clf = LogisticRegression(max_iter=1000)
+    clf.fit(X, y)
+
+    now = datetime.now(timezone.utc)
+    return SentimentModel(
+        classifier=clf,
+        model_version=model_version or now.strftime("%Y%m%d%H%M%S"),
+        embedding_model=get_model_name(),
+        trained_at=now.isoformat().replace("+00:00", "Z"),
+        n_samples=len(y),
+    )
+
+
+def train_seed_model() -> SentimentModel:
+    """The old toy model (four seed words) – only a bootstrap until real data exists."""
+    X = np.asarray(get_embedder().encode(SEED_TEXTS), dtype="float32")
+    return train(X, np.asarray(SEED_LABELS), model_version="seed")
+
+
+def load_or_bootstrap(path: str = DEFAULT_MODEL_PATH, logger=None) -> SentimentModel:
+    """
+    The trained artifact, else the seed model. An artifact that can't be
+    used (other format, trained on another embedder, unreadable) is logged
+    and left on disk for retraining; the agent runs on an in-memory seed
+    model until then instead of failing to start.
+    """
+    if os.path.exists(path):
+        try:
+            return SentimentModel.load(path)
+        except (ValueError, KeyError, EOFError, pickle.UnpicklingError) as e:
+            if logger:
+                logger.error(f"[MODEL] Unusable sentiment model at {path} ({e}) – serving the seed model; "
+                             f"retrain with `python -m infra.sentiment_model`")
+            return train_seed_model()
+
+    if logger:
+        logger.warning(f"[MODEL] No sentiment model at {path} – bootstrapping seed model")
+    model = train_seed_model()
+    model.save(path)
+    return model
+
+
+# ------------------------------------------------------------
+# CROSS-REQUEST BATCHING
+# ------------------------------------------------------------
+
+class BatchPredictor:
+    """
+    Collects predict() calls from concurrent requests and runs them as one
+    classifier call. Requests wait at most `max_wait_ms` for company.
+    """
+
+    def __init__(self, model: SentimentModel, max_batch: int = 512, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+        self._worker.start()
+
+    def predict(self, embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype="float32")
+        if len(embeddings) == 0:
+            return np.empty(0, dtype="int64")
+        fut = Future()
+        self._queue.put((embeddings, fut))
+        return fut.result()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            rows = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+
+            while rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            try:
+                preds = self.model.predict(np.vstack([emb for emb, _ in batch]))
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            offset = 0
+            for emb, fut in batch:
+                fut.set_result(preds[offset:offset + len(emb)])
+                offset += len(emb)
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+
+def main():
+    from memory_bank.sentiment_memory import SentimentMemory
+
+    parser = argparse.ArgumentParser(description="Train the sentiment classifier artifact")
+    parser.add_argument("--index", default=REVIEW_INDEX_PATH, help="FAISS index with review embeddings")
+    parser.add_argument("--metadata", default=REVIEW_METADATA_PATH, help="JSONL metadata with labels")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--version", default=None, help="model version (default: UTC timestamp)")
+    parser.add_argument("--out", "-o", default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+
+    mem = SentimentMemory(index_path=args.index, metadata_path=args.metadata)
+    X, y = mem.load_labeled(args.label_field)
+    print(f"Loaded {len(y)} labeled embeddings ({int(y.sum())} positive)")
+
+    model = train(X, y, model_version=args.version)
+    model.save(args.out)
+
+    print(f"Saved sentiment model {model.model_version} → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
+import os
+import gzip
+import codecs
+import json
 import random
 import time
+import asyncio
+import hashlib
+import functools
+import tempfile
+import threading
 import requests
-from typing import Optional, Dict
+import httpx
+from infra.proxy_pool import get_proxy_pool, proxy_label
+from collections import deque
+from typing import Any, Optional, Dict, Pattern, Sequence, Tuple
+from urllib.parse import urlsplit
 import re
 
 # Simple UA rotation (extend this list in production)
@@ -12,9 +25,37 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/117.0"
 ]
 
+# Overridable so scrapers can be pointed at a local stand-in server
+AMAZON_BASE_URL = os.getenv("AMAZON_BASE_URL", "https://www.amazon.com").rstrip("/")
+
 DEFAULT_TIMEOUT = 12
 DEFAULT_RETRIES = 3
 
+# Per-host politeness for the async client
+HOST_CONCURRENCY = int(os.getenv("SCRAPE_HOST_CONCURRENCY", "4"))
+HOST_RATE = float(os.getenv("SCRAPE_HOST_RATE", "2.0"))     # requests / second
+HOST_BURST = int(os.getenv("SCRAPE_HOST_BURST", "4"))
+
+# Adaptive rate bounds per domain (the rate starts at HOST_RATE)
+HOST_MIN_RATE = float(os.getenv("SCRAPE_HOST_MIN_RATE", "0.2"))
+HOST_MAX_RATE = max(HOST_RATE, float(os.getenv("SCRAPE_HOST_MAX_RATE", str(HOST_RATE * 4))))
+# Consecutive blocks that open a domain's circuit, and how long it stays open
+CIRCUIT_BLOCK_THRESHOLD = int(os.getenv("SCRAPE_CIRCUIT_THRESHOLD", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("SCRAPE_CIRCUIT_OPEN_SECONDS", "60"))
+
+# Streaming reads: callers that only need the top of a page stop downloading
+# once every one of their `stop_patterns` has matched or the byte cap is hit
+STREAMING_ENABLED = os.getenv("SCRAPE_STREAMING", "1") != "0"
+STREAM_MAX_BYTES = int(os.getenv("SCRAPE_STREAM_MAX_BYTES", str(3 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_OVERLAP = 4096     # re-scanned so a match straddling two chunks is not missed
+
+# Status codes that mean "slow down", as opposed to a broken URL
+BLOCK_STATUS_CODES = {429, 503}
+# Extra block markers per page_type, on top of is_blocked_html's. Review
+# pages carry no legitimate "captcha" text; product pages may (scripts).
+PAGE_BLOCK_MARKERS = {"reviews": ("captcha",)}
+
 def make_headers() -> Dict[str, str]:
     return {
         "User-Agent": random.choice(USER_AGENTS),
@@ -22,32 +63,737 @@ def make_headers() -> Dict[str, str]:
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
     }
 
-def smart_get(url: str, proxies: Optional[dict] = None, timeout: int = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES):
+# ------------------------------------------------------------
+# HTTP RESPONSE CACHE
+# ------------------------------------------------------------
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+
+# Seconds a cached page is served without asking the server again
+HTTP_CACHE_TTLS = {
+    "search": int(os.getenv("HTTP_CACHE_TTL_SEARCH", str(15 * 60))),
+    "product": int(os.getenv("HTTP_CACHE_TTL_PRODUCT", str(6 * 3600))),
+    "reviews": int(os.getenv("HTTP_CACHE_TTL_REVIEWS", str(3600))),
+}
+
+
+class CachedResponse:
+    """The bits of a requests/httpx response the scrapers use, served from cache."""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.text = entry["body"]
+        self.url = entry.get("final_url") or entry["url"]
+        self.status_code = 200
+        self.headers = {k: v for k, v in (("ETag", entry.get("etag")),
+                                          ("Last-Modified", entry.get("last_modified"))) if v}
+        self.truncated = entry.get("truncated", False)
+        self.from_cache = True
+
+    def raise_for_status(self):
+        return None
+
+
+class HttpCache:
+    """
+    On-disk, gzip-compressed page cache keyed by URL (see _cache_key: a
+    streamed prefix is stored apart from the full body, per stop condition).
+
+    Fresh entries (younger than the page type's TTL) are returned without a
+    request. Stale entries are revalidated with If-None-Match /
+    If-Modified-Since; a 304 refreshes the entry and serves the stored body.
+
+    A fresh 200 is only stored once the scraper has checked it is the real
+    page (store_page / async_store_page), so sign-in redirects and pages
+    that need a browser are not served from cache for a whole TTL. Disk I/O
+    is blocking; the async client runs it in a thread.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, ttls: Optional[Dict[str, int]] = None):
+        self.directory = directory
+        self.ttls = dict(ttls or HTTP_CACHE_TTLS)
+        self._lock = threading.Lock()
+        self._stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "stale_served": 0}
+
+    def _path(self, key: str) -> str:
+        h = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, h[:2], h + ".json.gz")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("key", entry.get("url")) == key else None
+
+    def _write(self, entry: Dict[str, Any]):
+        path = self._path(entry["key"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(delete=False, dir=os.path.dirname(path))
+        tmp.close()
+        with gzip.open(tmp.name, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(entry, f)
+        os.replace(tmp.name, path)
+
+    # -----------------------------
+    # Request lifecycle
+    # -----------------------------
+    def before_request(self, url: str, page_type: str, key: Optional[str] = None):
+        """
+        Returns (entry, cached_response, extra_headers). `cached_response` is
+        set when the entry is fresh and no request is needed.
+        """
+        entry = self._read(key or url)
+        if entry is None:
+            self._count("misses")
+            return None, None, {}
+
+        age = time.time() - entry.get("stored_at", 0)
+        if age < self.ttls.get(page_type, 0):
+            self._count("fresh_hits")
+            return entry, CachedResponse(entry), {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            self._count("misses")
+        return entry, None, headers
+
+    def stale(self, url: str, key: Optional[str] = None) -> Optional[CachedResponse]:
+        """Cached body regardless of age (used while a domain's circuit is open)."""
+        entry = self._read(key or url)
+        if entry is None:
+            return None
+        self._count("stale_served")
+        return CachedResponse(entry)
+
+    def after_response(self, url: str, page_type: str, entry: Optional[Dict[str, Any]],
+                       status_code: int, text: Optional[str], final_url: str, headers,
+                       key: Optional[str] = None, truncated: bool = False) -> Optional[CachedResponse]:
+        """Handle a 304 (returns the cached body); for a 200, count the miss – store() keeps the page."""
+        if status_code == 304:
+            if entry is None:
+                raise ValueError(f"304 Not Modified for {url} without a cached entry")
+            self._count("revalidated")
+            entry["stored_at"] = time.time()
+            entry["etag"] = headers.get("ETag") or entry.get("etag")
+            entry["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+            self._write(entry)
+            return CachedResponse(entry)
+
+        if entry is not None and (entry.get("etag") or entry.get("last_modified")):
+            self._count("misses")  # revalidation answered with a full body
+        return None
+
+    def store(self, url: str, page_type: str, status_code: int, text: Optional[str], final_url: str, headers,
+              key: Optional[str] = None, truncated: bool = False):
+        """
+        Store a 200 the caller accepted. A `truncated` body is a streamed
+        prefix; `key` must then say which (_cache_key).
+        """
+        # Never cache block pages – they would mask recovery for a whole TTL
+        if status_code == 200 and text is not None and not is_blocked_html(text):
+            self._write({
+                "key": key or url,
+                "url": url,
+                "final_url": final_url,
+                "page_type": page_type,
+                "stored_at": time.time(),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "body": text,
+                "truncated": truncated,
+            })
+            self._count("stores")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        lookups = s["fresh_hits"] + s["revalidated"] + s["misses"]
+        s["hit_ratio"] = round((s["fresh_hits"] + s["revalidated"]) / lookups, 4) if lookups else 0.0
+        return s
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    global _http_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    if _http_cache is None:
+        _http_cache = HttpCache()
+    return _http_cache
+
+
+# ------------------------------------------------------------
+# ADAPTIVE RATE + CIRCUIT BREAKER
+# ------------------------------------------------------------
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of requesting a domain whose circuit is open."""
+
+
+class DomainController:
+    """
+    Shared request-rate controller for one domain (all loops and threads).
+
+    AIMD: every clean response adds `increase` req/s up to `max_rate`; a block
+    (429/503 or a robot-check page) halves the rate down to `min_rate`, at
+    most once per `decrease_cooldown` so one burst of blocked in-flight
+    requests counts as a single congestion signal.
+
+    Pacing (reserve) allows `burst` requests back to back, then one per
+    1/rate seconds. Sync and async requests draw on the same schedule, so
+    mixed traffic to a host shares one budget.
+
+    After `threshold` consecutive blocks the circuit opens: requests are
+    refused for `open_seconds` (doubling on every re-open, capped at 16x).
+    Then one probe is let through (half-open); a clean response closes the
+    circuit, another block re-opens it. A probe that ends without a response
+    lets the next one through after another `open_for`.
+    """
+
+    def __init__(self, rate: float = HOST_RATE, min_rate: float = HOST_MIN_RATE, max_rate: float = HOST_MAX_RATE,
+                 increase: float = 0.1, decrease: float = 0.5, decrease_cooldown: float = 2.0,
+                 threshold: int = CIRCUIT_BLOCK_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 window: int = 100, burst: int = HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_cooldown = decrease_cooldown
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.open_for = open_seconds
+        self.consecutive_blocks = 0
+        self._last_decrease = 0.0
+        self._probe_started = 0.0
+        self._next_slot = 0.0
+        self._recent = deque(maxlen=window)  # 1 = blocked, 0 = clean
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "blocks": 0, "rejected": 0, "circuit_opens": 0}
+
+    # -----------------------------
+    # Admission
+    # -----------------------------
+    def allow(self) -> bool:
+        """False while the circuit is open; in half-open only one probe passes."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.open_for:
+                    self._stats["rejected"] += 1
+                    return False
+                self.state = "half_open"
+                self._probe_started = 0.0
+            if self.state == "half_open":
+                now = time.monotonic()
+                # a probe that never reported back (error, cancellation) expires
+                if self._probe_started and now - self._probe_started < self.open_for:
+                    self._stats["rejected"] += 1
+                    return False
+                self._probe_started = now
+            return True
+
+    def reserve(self) -> float:
+        """Seconds a caller (sync or async) should wait to stay at the current rate."""
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            # up to `burst` slots may be taken back to back after an idle spell
+            slot = max(now - (self.burst - 1) * interval, self._next_slot)
+            self._next_slot = slot + interval
+            return max(0.0, slot - now)
+
+    # -----------------------------
+    # Feedback
+    # -----------------------------
+    def record(self, blocked: bool):
+        with self._lock:
+            now = time.monotonic()
+            self._stats["requests"] += 1
+            self._recent.append(int(blocked))
+
+            if not blocked:
+                self.consecutive_blocks = 0
+                if self.state == "half_open":
+                    self.state = "closed"
+                    self.open_for = self.open_seconds
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                return
+
+            self._stats["blocks"] += 1
+            self.consecutive_blocks += 1
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+
+            if self.state == "half_open":
+                self.open_for = min(self.open_for * 2, self.open_seconds * 16)
+                self._open(now)
+            elif self.state == "closed" and self.consecutive_blocks >= self.threshold:
+                self._open(now)
+
+    def open_remaining(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 if not open)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.open_for - (time.monotonic() - self.opened_at))
+
+    def _open(self, now: float):
+        self.state = "open"
+        self.opened_at = now
+        self._probe_started = 0.0
+        self._stats["circuit_opens"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = len(self._recent)
+            return {
+                **self._stats,
+                "state": self.state,
+                "rate": round(self.rate, 3),
+                "block_rate": round(sum(self._recent) / recent, 4) if recent else 0.0,
+                "consecutive_blocks": self.consecutive_blocks,
+            }
+
+
+_domain_controllers: Dict[str, DomainController] = {}
+_domain_lock = threading.Lock()
+
+
+def controller_key(host: str, proxies: Optional[dict]) -> str:
+    # Blocks and rate limits apply per exit IP, so each proxy gets its own controller
+    proxy = (proxies or {}).get("https") or (proxies or {}).get("http")
+    return f"{host} via {proxy_label(proxy)}" if proxy else host
+
+
+def get_domain_controller(host: str) -> DomainController:
+    with _domain_lock:
+        ctl = _domain_controllers.get(host)
+        if ctl is None:
+            ctl = _domain_controllers[host] = DomainController()
+        return ctl
+
+
+def domain_stats() -> Dict[str, Dict[str, Any]]:
+    with _domain_lock:
+        controllers = dict(_domain_controllers)
+    return {host: ctl.stats() for host, ctl in controllers.items()}
+
+
+def is_blocked_response(status_code: int, text: Optional[str], final_url: Optional[str] = None,
+                        page_type: Optional[str] = None) -> bool:
+    if status_code in BLOCK_STATUS_CODES:
+        return True
+    if final_url is not None and is_signin_redirect(final_url):
+        return True
+    if status_code != 200 or text is None:
+        return False
+    if is_blocked_html(text):
+        return True
+    markers = PAGE_BLOCK_MARKERS.get(page_type, ())
+    return bool(markers) and any(m in text.lower() for m in markers)
+
+
+def _circuit_open(url: str, cache: Optional[HttpCache], key: Optional[str] = None):
+    """Serve a stale cached copy if there is one, else fail fast."""
+    stale = cache.stale(url, key) if cache else None
+    if stale is not None:
+        return stale
+    raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}, not requesting {url}")
+
+
+# ------------------------------------------------------------
+# STREAMING (PREFIX) READS
+# ------------------------------------------------------------
+
+class PrefixResponse:
+    """A 200 response read only as far as the caller needed; `truncated` if the rest was skipped."""
+
+    def __init__(self, url: str, headers, text: str, bytes_read: int, truncated: bool):
+        self.text = text
+        self.url = url
+        self.status_code = 200
+        self.headers = headers
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+        self.from_cache = False
+
+    def raise_for_status(self):
+        return None
+
+
+class _PrefixReader:
+    """
+    Decodes a streamed body until every stop pattern is satisfied.
+
+    A pattern is judged by its *first* match in the body: if it has a
+    `value` group, that group must take part in the first match (which is
+    re-tried in place as more text arrives); later matches don't count.
+    Only text not scanned yet (plus an overlap) is searched for first matches.
+    """
+
+    def __init__(self, encoding: Optional[str], stop_patterns: Optional[Sequence[Pattern]], max_bytes: Optional[int]):
+        self.decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        self.pending: Dict[Pattern, Optional[int]] = {p: None for p in stop_patterns or ()}
+        self.max_bytes = max_bytes
+        self.text = ""
+        self.scanned = 0
+        self.bytes_read = 0
+
+    def _satisfied(self, pattern: Pattern, start: int) -> bool:
+        pos = self.pending[pattern]
+        if pos is None:
+            m = pattern.search(self.text, start)
+            if m is None:
+                return False
+            self.pending[pattern] = m.start()
+        else:
+            m = pattern.match(self.text, pos)
+        return m is not None and ("value" not in pattern.groupindex or m.group("value") is not None)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk; True once the caller has enough."""
+        self.bytes_read += len(chunk)
+        self.text += self.decoder.decode(chunk)
+        if self.pending:
+            start = max(0, self.scanned - STREAM_OVERLAP)
+            for p in [p for p in self.pending if self._satisfied(p, start)]:
+                del self.pending[p]
+            self.scanned = len(self.text)
+            if not self.pending:
+                _count_stream("stopped_early")
+                return True
+        if self.max_bytes and self.bytes_read >= self.max_bytes:
+            _count_stream("capped")
+            return True
+        return False
+
+    def response(self, url: str, headers, truncated: bool) -> PrefixResponse:
+        if not truncated:
+            self.text += self.decoder.decode(b"", final=True)
+            _count_stream("read_fully")
+        _count_stream("bytes_read", self.bytes_read)
+        return PrefixResponse(url, headers, self.text, self.bytes_read, truncated)
+
+
+_stream_stats = {"read_fully": 0, "stopped_early": 0, "capped": 0, "bytes_read": 0}
+_stream_lock = threading.Lock()
+
+
+def _count_stream(name: str, n: int = 1):
+    with _stream_lock:
+        _stream_stats[name] += n
+
+
+def stream_stats() -> Dict[str, int]:
+    with _stream_lock:
+        return dict(_stream_stats)
+
+
+def _streaming(stop_patterns, max_bytes) -> bool:
+    return STREAMING_ENABLED and (bool(stop_patterns) or bool(max_bytes))
+
+
+def _cache_key(url: str, stop_patterns, max_bytes) -> str:
     """
-    Do GET with UA rotation and simple retry/backoff. Raises requests.RequestException on final failure.
+    HTTP cache key for a fetch. A streamed read keeps only the prefix its
+    stop condition needed, so it is cached under the URL plus a hash of the
+    patterns and byte cap: another condition (or a full read) gets its own entry.
     """
+    if not _streaming(stop_patterns, max_bytes):
+        return url
+    spec = "\n".join(p.pattern for p in stop_patterns or ()) + f"\n{max_bytes or 0}"
+    return f"{url}#prefix={hashlib.sha1(spec.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _get(url: str, headers: Dict[str, str], timeout: int, proxies: Optional[dict], stop_patterns, max_bytes):
+    if not _streaming(stop_patterns, max_bytes):
+        return requests.get(url, headers=headers, timeout=timeout, proxies=proxies)
+
+    with requests.get(url, headers=headers, timeout=timeout, proxies=proxies, stream=True) as resp:
+        if resp.status_code != 200:
+            resp.content  # read it all; non-200 bodies are small and needed as-is
+            return resp
+        reader = _PrefixReader(resp.encoding, stop_patterns, max_bytes)
+        for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+            if reader.feed(chunk):
+                return reader.response(resp.url, resp.headers, truncated=True)
+        return reader.response(resp.url, resp.headers, truncated=False)
+
+
+async def _async_get(client: httpx.AsyncClient, url: str, headers: Dict[str, str], timeout: int,
+                     stop_patterns, max_bytes):
+    if not _streaming(stop_patterns, max_bytes):
+        return await client.get(url, headers=headers, timeout=timeout)
+
+    # leaving the block early closes the connection instead of draining the body
+    async with client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+        if resp.status_code != 200:
+            await resp.aread()
+            return resp
+        reader = _PrefixReader(resp.encoding, stop_patterns, max_bytes)
+        async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+            if reader.feed(chunk):
+                return reader.response(str(resp.url), resp.headers, truncated=True)
+        return reader.response(str(resp.url), resp.headers, truncated=False)
+
+
+def smart_get(url: str, proxies: Optional[dict] = None, timeout: int = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+              page_type: Optional[str] = None, stop_patterns: Optional[Sequence[Pattern]] = None,
+              max_bytes: Optional[int] = None):
+    """
+    Do GET with UA rotation and simple retry/backoff, paced by the domain controller.
+    Without explicit `proxies`, each attempt leases a proxy from the proxy pool (if configured).
+    Raises requests.RequestException on final failure, CircuitOpenError while the
+    domain's circuit is open and no cached copy exists.
+    With `page_type` ("search" / "product" / "reviews") the response goes through the HTTP cache;
+    a fresh page is stored only when the caller passes it to store_page after checking it.
+    With `stop_patterns` / `max_bytes` the body is streamed and the download stops as soon
+    as every pattern has matched or `max_bytes` are read (a PrefixResponse; the prefix
+    is cached under a key that includes the patterns and the cap).
+    """
+    cache = get_http_cache() if page_type else None
+    key = _cache_key(url, stop_patterns, max_bytes)
+    entry, extra_headers = None, {}
+    if cache:
+        entry, cached, extra_headers = cache.before_request(url, page_type, key)
+        if cached:
+            return cached
+
+    host = urlsplit(url).netloc
+    pool = get_proxy_pool() if proxies is None else None
     backoff = 1.0
     for i in range(retries):
+        # every attempt may go out through a different proxy
+        lease = pool.acquire() if pool else None
+        attempt_proxies = lease.proxies if lease else proxies
+        ctl = get_domain_controller(controller_key(host, attempt_proxies))
         try:
-            resp = requests.get(url, headers=make_headers(), timeout=timeout, proxies=proxies)
+            if not ctl.allow():
+                if lease and i < retries - 1:
+                    # this exit is shut out, another proxy may not be
+                    pool.bench(lease, ctl.open_remaining())
+                    continue
+                return _circuit_open(url, cache, key)
+            time.sleep(ctl.reserve())
+            start = time.perf_counter()
+            resp = _get(url, {**make_headers(), **extra_headers}, timeout, attempt_proxies, stop_patterns, max_bytes)
+            blocked = is_blocked_response(resp.status_code, resp.text if resp.status_code == 200 else None,
+                                          resp.url, page_type)
+            ctl.record(blocked)
+            if lease:
+                pool.report(lease, "blocked" if blocked else "ok", time.perf_counter() - start)
+                if blocked and i < retries - 1:
+                    continue  # a different exit may get through
+            if cache and resp.status_code == 304:
+                return cache.after_response(url, page_type, entry, 304, None, resp.url, resp.headers, key)
             resp.raise_for_status()
+            if cache:
+                cache.after_response(url, page_type, entry, resp.status_code, resp.text, resp.url, resp.headers, key)
+                resp.cache_store = functools.partial(cache.store, url, page_type, resp.status_code, resp.text,
+                                                     resp.url, resp.headers, key, getattr(resp, "truncated", False))
             return resp
         except requests.RequestException as e:
+            if lease:
+                pool.report(lease, "error")  # no-op if the response was already reported
             if i == retries - 1:
                 raise
             time.sleep(backoff + random.random() * 0.5)
             backoff *= 2
+        finally:
+            if lease:
+                pool.release(lease)
+    raise RuntimeError("unreachable")
+
+
+def store_page(resp):
+    """
+    Put a page fetched with `page_type` into the HTTP cache, once the caller
+    has checked it is the page it asked for (not a block page, a sign-in
+    redirect or one that needs a browser). No-op for cached responses.
+    """
+    store = getattr(resp, "cache_store", None)
+    if store is not None:
+        resp.cache_store = None
+        store()
+
+
+async def async_store_page(resp):
+    """store_page without blocking the event loop on the disk write."""
+    store = getattr(resp, "cache_store", None)
+    if store is not None:
+        resp.cache_store = None
+        await asyncio.to_thread(store)
+
+# ------------------------------------------------------------
+# ASYNC HTTP
+# ------------------------------------------------------------
+
+class HostLimiter:
+    """
+    Concurrency cap for one host; pacing comes from the domain's controller,
+    whose schedule sync smart_get calls to the same host also draw on.
+    """
+
+    def __init__(self, concurrency: int = HOST_CONCURRENCY, controller: Optional[DomainController] = None):
+        self.controller = controller or DomainController()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await asyncio.sleep(self.controller.reserve())
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+# Clients and limiters belong to the event loop that created them
+_async_clients: Dict[Tuple[int, Tuple], httpx.AsyncClient] = {}
+_host_limiters: Dict[Tuple[int, str], HostLimiter] = {}
+
+
+def _proxy_key(proxies: Optional[dict]) -> Tuple:
+    return tuple(sorted((proxies or {}).items()))
+
+
+def get_async_client(proxies: Optional[dict] = None) -> httpx.AsyncClient:
+    """Shared, connection-pooled client (one per event loop and proxy config)."""
+    key = (id(asyncio.get_running_loop()), _proxy_key(proxies))
+    client = _async_clients.get(key)
+    if client is None or client.is_closed:
+        mounts = None
+        if proxies:
+            # requests-style {"http": url, "https": url} → httpx transports
+            mounts = {f"{scheme}://": httpx.AsyncHTTPTransport(proxy=url) for scheme, url in proxies.items()}
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            mounts=mounts,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _async_clients[key] = client
+    return client
+
+
+def get_host_limiter(host: str, proxies: Optional[dict] = None) -> HostLimiter:
+    """Per host and exit proxy: each proxy is a separate client as far as the host can tell."""
+    ctl_key = controller_key(host, proxies)
+    key = (id(asyncio.get_running_loop()), ctl_key)
+    limiter = _host_limiters.get(key)
+    if limiter is None:
+        limiter = _host_limiters[key] = HostLimiter(controller=get_domain_controller(ctl_key))
+    return limiter
+
+
+async def close_async_clients():
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _async_clients if k[0] == loop_id]:
+        await _async_clients.pop(key).aclose()
+    for key in [k for k in _host_limiters if k[0] == loop_id]:
+        _host_limiters.pop(key)
+
+
+async def async_smart_get(url: str, proxies: Optional[dict] = None, timeout: int = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                          page_type: Optional[str] = None, stop_patterns: Optional[Sequence[Pattern]] = None,
+                          max_bytes: Optional[int] = None):
+    """
+    Async counterpart of smart_get on the shared client, throttled per host
+    (and proxy, leased from the pool unless `proxies` is given) at the
+    domain controller's current rate. Raises httpx.HTTPError on final
+    failure, CircuitOpenError while the domain's circuit is open (unless a
+    cached copy of the page can be served). `stop_patterns` / `max_bytes` as
+    in smart_get; cache reads and writes run in a thread. Store an accepted
+    page with async_store_page.
+    """
+    cache = get_http_cache() if page_type else None
+    key = _cache_key(url, stop_patterns, max_bytes)
+    entry, extra_headers = None, {}
+    if cache:
+        entry, cached, extra_headers = await asyncio.to_thread(cache.before_request, url, page_type, key)
+        if cached:
+            return cached
+
+    host = urlsplit(url).netloc
+    pool = get_proxy_pool() if proxies is None else None
+    backoff = 1.0
+    for i in range(retries):
+        # every attempt may go out through a different proxy
+        lease = await pool.acquire_async() if pool else None
+        attempt_proxies = lease.proxies if lease else proxies
+        client = get_async_client(attempt_proxies)
+        limiter = get_host_limiter(host, attempt_proxies)
+        ctl = limiter.controller
+        try:
+            if not ctl.allow():
+                if lease and i < retries - 1:
+                    # this exit is shut out, another proxy may not be
+                    pool.bench(lease, ctl.open_remaining())
+                    continue
+                return await asyncio.to_thread(_circuit_open, url, cache, key)
+            async with limiter:
+                start = time.perf_counter()
+                resp = await _async_get(client, url, {**make_headers(), **extra_headers}, timeout, stop_patterns, max_bytes)
+            blocked = is_blocked_response(resp.status_code, resp.text if resp.status_code == 200 else None,
+                                          str(resp.url), page_type)
+            ctl.record(blocked)
+            if lease:
+                pool.report(lease, "blocked" if blocked else "ok", time.perf_counter() - start)
+                if blocked and i < retries - 1:
+                    continue  # a different exit may get through
+            if cache and resp.status_code == 304:
+                return await asyncio.to_thread(cache.after_response, url, page_type, entry, 304, None,
+                                               str(resp.url), resp.headers, key)
+            resp.raise_for_status()
+            if cache:
+                cache.after_response(url, page_type, entry, resp.status_code, resp.text, str(resp.url), resp.headers, key)
+                resp.cache_store = functools.partial(cache.store, url, page_type, resp.status_code, resp.text,
+                                                     str(resp.url), resp.headers, key, getattr(resp, "truncated", False))
+            return resp
+        except httpx.HTTPError:
+            if lease:
+                pool.report(lease, "error")  # no-op if the response was already reported
+            if i == retries - 1:
+                raise
+            await asyncio.sleep(backoff + random.random() * 0.5)
+            backoff *= 2
+        finally:
+            if lease:
+                pool.release(lease)
     raise RuntimeError("unreachable")
 
 def is_blocked_html(html: str) -> bool:
     """
-    Heuristics to detect bot-block pages (very small HTML or 'robot' checks, captcha).
+    Heuristics to detect bot-block pages (empty body, 'robot' checks, captcha).
+    Short pages are not blocks by themselves: streamed prefixes and small
+    result pages are legitimately short.
     """
-    if not html or len(html) < 2000:
+    if not html or not html.strip():
         return True
     lower = html.lower()
     checks = [
         "enter the characters you see below",
+        "type the characters you see in this image",
+        "/errors/validatecaptcha",
         "are you a human",
         "robot check",
         "detected unusual traffic",
@@ -56,6 +802,11 @@ def is_blocked_html(html: str) -> bool:
     ]
     return any(ch in lower for ch in checks)
 
+
+def is_signin_redirect(final_url: str) -> bool:
+    """A request that ended on a sign-in page (Amazon's answer to suspected bots on review pages)."""
+    return "signin" in urlsplit(final_url).path.lower()
+
 def parse_price(text: Optional[str]) -> Optional[float]:
     """
     Convert price-like string to float safely.
@@ -38,6 +38,16 @@ class FaissMemoryIndex:
             D, I = self.index.search(q, top_k)
         return D[0].tolist(), I[0].tolist()
 
+    def get_vectors(self):
+        """Return (ids, vectors) for every vector stored in the index."""
+        with _index_lock:
+            n = self.index.ntotal
+            if n == 0:
+                return np.empty(0, dtype="int64"), np.empty((0, self.dim), dtype="float32")
+            ids = faiss.vector_to_array(self.index.id_map).astype("int64")
+            vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, n)
+        return ids, np.asarray(vectors, dtype="float32")
+
     def _save_atomic(self):
         tmp = tempfile.NamedTemporaryFile(delete=False, dir=os.path.dirname(self.index_path))
         tmp_name = tmp.name
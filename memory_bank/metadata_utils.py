@@ -35,4 +35,17 @@ def get_by_indices(path: str, indices: List[int]):
     out = []
     for i in indices:
         out.append(items[i] if 0 <= i < len(items) else None)
-    return out
\ No newline at end of file
+    return out
+
+def append_jsonl_batch(path: str, records: List[Dict[str, Any]]) -> List[int]:
+    """Append many records in one write. Return the assigned ids (0-based)."""
+    ensure_folder(path)
+    with _lock:
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("")
+        with open(path, "r+", encoding="utf-8") as f:
+            start = sum(1 for _ in f)
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            f.flush()
+        return list(range(start, start + len(records)))
@@ -0,0 +1,221 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_DIR = os.getenv("PRICE_HISTORY_DIR", "memory_bank/metadata/price_history")
+
+DAY = 86400.0
+COLUMNS = ("ts", "price", "recommended", "sentiment")
+# One fixed-size row per observation; a single append is one small write
+RECORD = np.dtype([("ts", "<f8"), ("price", "<f8"), ("recommended", "<f8"), ("sentiment", "<f8")])
+
+_SAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _filename(product_id: str) -> str:
+    safe = _SAFE.sub("_", product_id)
+    if safe != product_id:
+        safe += "-" + hashlib.sha1(product_id.encode("utf-8")).hexdigest()[:8]
+    return safe + ".bin"
+
+
+def _value(x) -> float:
+    return np.nan if x is None else float(x)
+
+
+class _Series:
+    """One product's columns, sorted by timestamp, with spare capacity to append into."""
+
+    __slots__ = ("cols", "n", "file_bytes")
+
+    def __init__(self, capacity: int = 16):
+        self.cols = {c: np.empty(capacity) for c in COLUMNS}
+        self.n = 0
+        self.file_bytes = 0
+
+    def extend(self, rows: np.ndarray):
+        if not len(rows):
+            return
+        need = self.n + len(rows)
+        if need > len(self.cols["ts"]):
+            capacity = max(need, 2 * len(self.cols["ts"]))
+            for c in COLUMNS:
+                grown = np.empty(capacity)
+                grown[:self.n] = self.cols[c][:self.n]
+                self.cols[c] = grown
+
+        in_order = self.n == 0 or rows["ts"][0] >= self.cols["ts"][self.n - 1]
+        for c in COLUMNS:
+            self.cols[c][self.n:need] = rows[c]
+        self.n = need
+
+        if not in_order or not (np.diff(rows["ts"]) >= 0).all():
+            # clock went backwards (or another writer raced); keep ts sorted.
+            # Into new buffers: views handed out earlier must not change.
+            order = np.argsort(self.cols["ts"][:self.n], kind="stable")
+            for c in COLUMNS:
+                resorted = np.empty(len(self.cols[c]))
+                resorted[:self.n] = self.cols[c][:self.n][order]
+                self.cols[c] = resorted
+
+    def view(self, lo: int, hi: int) -> Dict[str, np.ndarray]:
+        """Read-only slices: callers must not write into the store's buffers."""
+        out = {}
+        for c in COLUMNS:
+            v = self.cols[c][lo:hi]
+            v.setflags(write=False)
+            out[c] = v
+        return out
+
+
+class PriceHistoryStore:
+    """
+    Append-only price time series per product: timestamp, observed price,
+    recommended price and sentiment.
+
+    Each product has its own file of fixed-size binary rows, so recording
+    is one append and a query never reads another product's data. Loaded
+    series are kept as numpy columns sorted by time; range and window
+    queries are binary searches on the timestamp column, and rolling
+    statistics are computed on the slices. Rows appended by another
+    process are picked up by reading only the new tail of the file.
+
+    Missing values are stored as NaN.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR):
+        self.directory = directory
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, product_id: str) -> str:
+        return os.path.join(self.directory, _filename(product_id))
+
+    def _load(self, product_id: str) -> _Series:
+        """The product's series, caught up with whatever is on disk. Call with the lock held."""
+        series = self._series.get(product_id)
+        if series is None:
+            series = self._series[product_id] = _Series()
+
+        path = self._path(product_id)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        count = (size - series.file_bytes) // RECORD.itemsize  # whole rows only
+        if count > 0:
+            rows = np.fromfile(path, dtype=RECORD, count=count, offset=series.file_bytes)
+            series.extend(rows)
+            series.file_bytes += count * RECORD.itemsize
+        return series
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def record(self, product_id: str, price: Optional[float], recommended_price: Optional[float] = None,
+               sentiment: Optional[float] = None, ts: Optional[float] = None):
+        row = np.array([(time.time() if ts is None else ts, _value(price),
+                         _value(recommended_price), _value(sentiment))], dtype=RECORD)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            with open(self._path(product_id), "ab") as f:
+                f.write(row.tobytes())
+            self._load(product_id)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def range(self, product_id: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Columns for start <= ts < end (either bound optional). Read-only views."""
+        with self._lock:
+            series = self._load(product_id)
+            ts = series.cols["ts"][:series.n]
+            lo = 0 if start is None else int(np.searchsorted(ts, start, "left"))
+            hi = series.n if end is None else int(np.searchsorted(ts, end, "left"))
+            return series.view(lo, hi)
+
+    def last(self, product_id: str, days: float, now: Optional[float] = None) -> Dict[str, np.ndarray]:
+        now = time.time() if now is None else now
+        return self.range(product_id, now - days * DAY, None)
+
+    def tail(self, product_id: str, n: int) -> Dict[str, np.ndarray]:
+        """The last `n` observations."""
+        with self._lock:
+            series = self._load(product_id)
+            return series.view(max(0, series.n - n), series.n)
+
+    def rolling_mean(self, product_id: str, window_days: float, column: str = "price",
+                     start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (ts, mean) with the mean of `column` over the trailing window
+        (t - window, t] at every observation in [start, end). Windows reach
+        back before `start`; NaNs are skipped.
+        """
+        back = None if start is None else start - window_days * DAY
+        cols = self.range(product_id, back, end)
+        ts, values = cols["ts"], cols[column]
+
+        present = ~np.isnan(values)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(present)))
+        left = np.searchsorted(ts, ts - window_days * DAY, "right")
+        idx = np.arange(1, len(ts) + 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums[idx] - sums[left]) / (counts[idx] - counts[left])
+
+        keep = slice(0, None) if start is None else slice(int(np.searchsorted(ts, start, "left")), None)
+        return ts[keep], means[keep]
+
+    def volatility(self, product_id: str, days: Optional[float] = None, column: str = "price",
+                   now: Optional[float] = None) -> Optional[float]:
+        """Std. dev. of log changes between consecutive observations (per observation, not annualized)."""
+        cols = self.range(product_id) if days is None else self.last(product_id, days, now)
+        values = cols[column]
+        values = values[~np.isnan(values) & (values > 0)]
+        if len(values) < 3:
+            return None
+        return float(np.std(np.diff(np.log(values)), ddof=1))
+
+    def summary(self, product_id: str, days: float = 90, now: Optional[float] = None) -> Dict[str, Any]:
+        """JSON-ready overview of the last `days`: level, range, trend and volatility."""
+        now = time.time() if now is None else now
+        cols = self.last(product_id, days, now)
+        prices = cols["price"][~np.isnan(cols["price"])]
+        if not len(cols["ts"]):
+            return {"points": 0, "days": days}
+
+        _, week_means = self.rolling_mean(product_id, 7, start=cols["ts"][-1])
+
+        def last_valid(c):
+            valid = cols[c][~np.isnan(cols[c])]
+            return float(valid[-1]) if len(valid) else None
+
+        return {
+            "points": int(len(cols["ts"])),
+            "days": days,
+            "first_ts": float(cols["ts"][0]),
+            "last_ts": float(cols["ts"][-1]),
+            "last_price": last_valid("price"),
+            "last_recommended": last_valid("recommended"),
+            "last_sentiment": last_valid("sentiment"),
+            "mean_price": float(prices.mean()) if len(prices) else None,
+            "min_price": float(prices.min()) if len(prices) else None,
+            "max_price": float(prices.max()) if len(prices) else None,
+            "change_pct": float((prices[-1] - prices[0]) / prices[0] * 100) if len(prices) > 1 and prices[0] else None,
+            "rolling_mean_7d": float(week_means[-1]) if len(week_means) and not np.isnan(week_means[-1]) else None,
+            "volatility": self.volatility(product_id, days, now=now),
+        }
+
+
+_store: Optional[PriceHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_history() -> PriceHistoryStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceHistoryStore()
+        return _store
@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import time
+import bisect
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from memory_bank.metadata_utils import ensure_folder, load_all
+
+DEFAULT_PATH = os.getenv("PRICE_INDEX_PATH", "memory_bank/metadata/price_index.json")
+DEFAULT_PRICING_PATH = "memory_bank/metadata/pricing.jsonl"
+DEFAULT_PRODUCT_PATH = "memory_bank/metadata/product.jsonl"
+
+# Most recently priced products kept per category
+PRICE_INDEX_WINDOW = int(os.getenv("PRICE_INDEX_WINDOW", "200"))
+# Other products a category needs before its average stands in for a vector search
+PRICE_INDEX_MIN_COMPETITORS = int(os.getenv("PRICE_INDEX_MIN_COMPETITORS", "3"))
+
+SAVE_INTERVAL = 30.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# 4090, 7900xtx, 4070ti – not part numbers (11323) or codes that start with letters (merc310)
+_MODEL = re.compile(r"^(\d{3,4})[a-z]*$")
+# capacities, clocks, widths: numbers that don't name a model
+_UNIT = re.compile(r"^(?:gb|tb|mb|mhz|ghz|hz|w|bit|mm)$")
+_UNIT_SUFFIX = re.compile(r"^\d+(?:gb|g|tb|mb|mhz|ghz|hz|w|bit|mm)$")
+
+
+def category_key(title: str) -> str:
+    """
+    Model family from a product title: the first model number with the word
+    before it ("MSI GeForce RTX 4090 Gaming X Trio 24G" → "rtx 4090",
+    "Radeon RX 7900XTX" → "rx 7900"), else the first three words.
+    """
+    tokens = _TOKEN.findall((title or "").lower())
+    for i, tok in enumerate(tokens):
+        m = _MODEL.match(tok)
+        if not m or _UNIT_SUFFIX.match(tok) or (i + 1 < len(tokens) and _UNIT.match(tokens[i + 1])):
+            continue
+        prev = tokens[i - 1] if i else ""
+        return f"{prev} {m.group(1)}" if prev.isalpha() else m.group(1)
+    return " ".join(tokens[:3])
+
+
+class _Category:
+    __slots__ = ("prices", "ordered", "_sum", "_comp", "updated_at")
+
+    def __init__(self):
+        self.prices: "OrderedDict[str, float]" = OrderedDict()  # product → latest price, oldest first
+        self.ordered: List[float] = []
+        self._sum = 0.0   # running sum of `ordered` ...
+        self._comp = 0.0  # ... and the low-order bits it lost (Neumaier)
+        self.updated_at = 0.0
+
+    @property
+    def total(self) -> float:
+        return self._sum + self._comp
+
+    def _add(self, x: float):
+        t = self._sum + x
+        if abs(self._sum) >= abs(x):
+            self._comp += (self._sum - t) + x
+        else:
+            self._comp += (x - t) + self._sum
+        self._sum = t
+
+    def put(self, product_id: str, price: float, window: int):
+        old = self.prices.pop(product_id, None)
+        if old is not None:
+            del self.ordered[bisect.bisect_left(self.ordered, old)]
+            self._add(-old)
+        self.prices[product_id] = price
+        bisect.insort(self.ordered, price)
+        self._add(price)
+
+        while len(self.prices) > window:
+            _, evicted = self.prices.popitem(last=False)
+            del self.ordered[bisect.bisect_left(self.ordered, evicted)]
+            self._add(-evicted)
+
+        self.updated_at = time.time()
+
+    def percentile(self, q: float) -> float:
+        # linear interpolation, as np.percentile's default
+        pos = (len(self.ordered) - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, len(self.ordered) - 1)
+        return self.ordered[lo] + (self.ordered[hi] - self.ordered[lo]) * (pos - lo)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": len(self.ordered),
+            "mean": self.total / len(self.ordered),
+            "median": self.percentile(0.5),
+            "p10": self.percentile(0.1),
+            "p25": self.percentile(0.25),
+            "p75": self.percentile(0.75),
+            "p90": self.percentile(0.9),
+            "min": self.ordered[0],
+            "max": self.ordered[-1],
+            "updated_at": self.updated_at,
+        }
+
+
+class CompetitorPriceIndex:
+    """
+    Category → rolling price statistics over the latest price of the most
+    recent `window` products priced in that category.
+
+    Only listed prices go in: parser placeholders and the pricing agent's
+    fallback (saved with `price_placeholder`) are not market prices.
+
+    Every pricing save updates its category in place (sorted prices plus a
+    running compensated sum), so the mean and percentiles are ready to read; a competitor
+    average is an O(1) lookup that leaves the product's own price out.
+
+    The index persists to a JSON snapshot. Without one it is rebuilt from
+    pricing memory, with categories taken from the product titles in
+    product memory.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_PATH, window: int = PRICE_INDEX_WINDOW,
+                 pricing_path: str = DEFAULT_PRICING_PATH, product_path: str = DEFAULT_PRODUCT_PATH):
+        self.path = path
+        self.window = window
+        self._categories: Dict[str, _Category] = {}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+
+        if path and os.path.exists(path):
+            self._load()
+        else:
+            self.rebuild(pricing_path, product_path)
+
+    def __len__(self):
+        return len(self._categories)
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def update(self, category: str, product_id: str, price: Optional[float]):
+        if not category or not product_id or price is None or not price > 0:
+            return
+        with self._lock:
+            self._categories.setdefault(category, _Category()).put(product_id, float(price), self.window)
+            save_due = time.monotonic() - self._last_save >= SAVE_INTERVAL
+        if save_due:
+            self.save()
+
+    def rebuild(self, pricing_path: str, product_path: str):
+        """Replay pricing memory in order; titles (→ categories) come from product memory."""
+        titles = {}
+        for rec in load_all(product_path):
+            meta = rec.get("metadata") or {}
+            if meta.get("title"):
+                titles[rec.get("key")] = meta.get("category") or category_key(meta["title"])
+
+        with self._lock:
+            self._categories = {}
+            for rec in load_all(pricing_path):
+                key = rec.get("key")
+                meta = rec.get("metadata") or {}
+                # the price a product is listed at; recommendations aren't market prices
+                price = meta.get("base_price")
+                if key in titles and price and not meta.get("price_placeholder"):
+                    self._categories.setdefault(titles[key], _Category()).put(key, float(price), self.window)
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def stats(self, category: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cat = self._categories.get(category)
+            return cat.stats() if cat else None
+
+    def competitor_average(self, category: str, exclude: Optional[str] = None,
+                           min_competitors: int = PRICE_INDEX_MIN_COMPETITORS) -> Optional[float]:
+        """Mean price of the category without `exclude`; None if too few others are known."""
+        with self._lock:
+            cat = self._categories.get(category)
+            if cat is None:
+                return None
+            total, count = cat.total, len(cat.ordered)
+            own = cat.prices.get(exclude) if exclude is not None else None
+            if own is not None:
+                total, count = total - own, count - 1
+            if count < max(min_competitors, 1):
+                return None
+            return total / count
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: cat.stats() for name, cat in self._categories.items()}
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        for name, d in saved.get("categories", {}).items():
+            cat = _Category()
+            for pid, price in d.get("prices", []):
+                cat.put(pid, float(price), self.window)
+            cat.updated_at = d.get("updated_at", 0.0)
+            self._categories[name] = cat
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            data = {
+                "saved_at": time.time(),
+                "categories": {
+                    name: {"prices": list(cat.prices.items()), "updated_at": cat.updated_at}
+                    for name, cat in self._categories.items()
+                },
+            }
+        ensure_folder(self.path)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", delete=False, dir=directory, suffix=".tmp", encoding="utf-8") as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp.name, self.path)
+
+
+_index: Optional[CompetitorPriceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_price_index() -> CompetitorPriceIndex:
+    """Process-wide index, loaded (or rebuilt from memory) on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CompetitorPriceIndex()
+        return _index
@@ -2,7 +2,7 @@ import numpy as np
 from typing import Dict, Any, List
 from memory_bank.base_memory import BaseMemory
 from memory_bank.faiss_memory import FaissMemoryIndex
-from memory_bank.metadata_utils import append_jsonl, get_by_indices
+from memory_bank.metadata_utils import append_jsonl, append_jsonl_batch, get_by_indices
 
 DEFAULT_DIM = 384
 DEFAULT_INDEX_PATH = "memory_bank/metadata/pricing.faiss"
@@ -23,6 +23,18 @@ class PricingMemory(BaseMemory):
 
         return assigned
 
+    def save_batch(self, keys: List[str], metadatas: List[Dict[str, Any]], embeddings=None) -> List[int]:
+        """Bulk version of `save`: one JSONL write and one index flush for all records."""
+        assigned = append_jsonl_batch(
+            self.meta_path,
+            [{"key": k, "metadata": m} for k, m in zip(keys, metadatas)]
+        )
+
+        if embeddings is not None and len(assigned):
+            self.index.add_batch(np.asarray(embeddings, dtype="float32"), np.asarray(assigned, dtype="int64"))
+
+        return assigned
+
     def search(self, query_embedding, top_k=5) -> List[Dict[str, Any]]:
         distances, ids = self.index.search(query_embedding, top_k)
         metas = get_by_indices(self.meta_path, ids)
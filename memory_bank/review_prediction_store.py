@@ -0,0 +1,134 @@
+import os, json, hashlib, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from memory_bank.metadata_utils import ensure_folder
+
+DEFAULT_DIM = 384
+DEFAULT_PATH = "memory_bank/metadata/review_predictions.jsonl"
+
+
+def review_hash(review: Dict[str, Any]) -> str:
+    """Stable id for a review: hash of its whitespace-normalized text."""
+    text = " ".join((review.get("text") or "").split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ReviewPredictionStore:
+    """
+    Append-only JSONL of per-review sentiment predictions, indexed in memory
+    by review hash. A prediction only counts as cached for the model version
+    that produced it, so retraining the classifier invalidates old rows.
+
+    Review embeddings go to a raw float32 sidecar file (one row per review),
+    so product-level aggregates can be rebuilt without re-encoding.
+    Predictions stored without one can get it later (put_vectors).
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, dim: int = DEFAULT_DIM):
+        self.path = path
+        self.vectors_path = os.path.splitext(path)[0] + ".f32"
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._preds: Dict[str, Tuple[str, int, Optional[int]]] = {}
+        self._n_rows = 0
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.vectors_path):
+            size = os.path.getsize(self.vectors_path)
+            self._n_rows = size // (4 * self.dim)
+            if size != self._n_rows * 4 * self.dim:
+                # torn write: drop the partial row so appends stay row-aligned
+                with open(self.vectors_path, "r+b") as f:
+                    f.truncate(self._n_rows * 4 * self.dim)
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                vec_row = row.get("row")
+                if vec_row is not None and vec_row >= self._n_rows:
+                    vec_row = None  # sidecar write never completed
+                self._preds[row["hash"]] = (row["model_version"], int(row["label"]), vec_row)
+
+    def __len__(self):
+        return len(self._preds)
+
+    def get_many(self, hashes: Iterable[str], model_version: str) -> Dict[str, int]:
+        """Return {hash: label} for the hashes already predicted by `model_version`."""
+        out = {}
+        with self._lock:
+            for h in hashes:
+                hit = self._preds.get(h)
+                if hit and hit[0] == model_version:
+                    out[h] = hit[1]
+        return out
+
+    def put_many(self, product_id: str, hashes: List[str], labels: List[int],
+                 model_version: str, embeddings=None):
+        if not hashes:
+            return
+        ensure_folder(self.path)
+        with self._lock:
+            rows = [None] * len(hashes)
+            if embeddings is not None:
+                vecs = np.ascontiguousarray(embeddings, dtype="float32").reshape(len(hashes), self.dim)
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vecs.tobytes())
+                rows = list(range(self._n_rows, self._n_rows + len(hashes)))
+                self._n_rows += len(hashes)
+
+            records = [
+                {"hash": h, "key": product_id, "label": int(l),
+                 "model_version": model_version, "row": row}
+                for h, l, row in zip(hashes, labels, rows)
+            ]
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in records))
+            for r in records:
+                self._preds[r["hash"]] = (model_version, r["label"], r["row"])
+
+    def missing_vectors(self, hashes: Iterable[str]) -> List[str]:
+        """Hashes with a stored prediction but no embedding row (e.g. stored before embeddings were kept)."""
+        with self._lock:
+            return [h for h in dict.fromkeys(hashes) if h in self._preds and self._preds[h][2] is None]
+
+    def put_vectors(self, product_id: str, hashes: List[str], embeddings):
+        """Attach embeddings to predictions stored without one; the prediction itself is kept."""
+        if not hashes:
+            return
+        vecs = np.ascontiguousarray(embeddings, dtype="float32").reshape(len(hashes), self.dim)
+        with self._lock:
+            keep = [i for i, h in enumerate(hashes) if h in self._preds]
+            if not keep:
+                return
+            with open(self.vectors_path, "ab") as f:
+                f.write(vecs[keep].tobytes())
+            records = []
+            for row, i in enumerate(keep, start=self._n_rows):
+                version, label, _ = self._preds[hashes[i]]
+                records.append({"hash": hashes[i], "key": product_id, "label": label,
+                                "model_version": version, "row": row})
+            self._n_rows += len(keep)
+            # appended after the original row, so it wins on load
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in records))
+            for r in records:
+                self._preds[r["hash"]] = (r["model_version"], r["label"], r["row"])
+
+    def mean_vector(self, hashes: Iterable[str], chunk_size: int = 1024) -> Optional[np.ndarray]:
+        """Mean of the stored review embeddings, read from a memmap `chunk_size` rows at a time."""
+        with self._lock:
+            rows = [self._preds[h][2] for h in hashes if h in self._preds]
+            n_rows = self._n_rows
+        rows = np.asarray([r for r in rows if r is not None], dtype="int64")
+        if len(rows) == 0:
+            return None
+
+        vecs = np.memmap(self.vectors_path, dtype="float32", mode="r", shape=(n_rows, self.dim))
+        total = np.zeros(self.dim, dtype="float64")
+        for i in range(0, len(rows), chunk_size):
+            total += vecs[rows[i:i + chunk_size]].sum(axis=0, dtype="float64")
+        return (total / len(rows)).astype("float32")
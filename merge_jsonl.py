@@ -1,22 +1,91 @@
+import os
+import sys
 import json
-from collections import defaultdict
+import heapq
+import hashlib
+import argparse
+import tempfile
+from itertools import groupby
+from operator import itemgetter
 
 INPUT_PRODUCT = "product.jsonl"
 INPUT_PRICING = "pricing.jsonl"
 INPUT_SENTIMENT = "sentiment.jsonl"
 OUTPUT_MERGED = "merged.jsonl"
 
-def read_jsonl(path):
-    data = defaultdict(list)
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
+# Entries held in memory per sorted run before spilling it to disk
+CHUNK_BYTES = 64 * 1024 * 1024
+# Bytes hashed at the start of each input to notice it was rewritten, not appended to
+FINGERPRINT_BYTES = 4096
+
+_decoder = json.JSONDecoder()
+
+
+# -------------------------
+# Reading & external sort
+# -------------------------
+def read_lines(path, end=None, keys=None, start=0):
+    """
+    Yield (key, line) for each record in `path` between bytes `start` and
+    `end`, only for `keys` if given. Also returns (via StopIteration) the
+    offset just past the last complete line read: the next watermark.
+    """
+    pos = watermark = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if end is not None and pos + len(raw) > end:
+                break
+            pos += len(raw)
+            if raw.endswith(b"\n"):
+                watermark = pos
+            line = raw.decode("utf-8").strip()
             if not line:
                 continue
-            obj = json.loads(line)
-            key = obj["key"]
-            data[key].append(obj["metadata"])
-    return data
+            key = json.loads(line)["key"]
+            if keys is None or key in keys:
+                yield key, line
+    return watermark
+
+
+def _spill(chunk, tmp_dir):
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for key, line in chunk:
+            # json-encoded keys never contain a raw tab
+            f.write(json.dumps(key) + "\t" + line + "\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for row in f:
+            key, line = row.rstrip("\n").split("\t", 1)
+            yield json.loads(key), line
+
+
+def sorted_by_key(records, tmp_dir, chunk_bytes=CHUNK_BYTES):
+    """
+    Yield (key, line) sorted by key; records with the same key keep their
+    input order. Chunks of `chunk_bytes` are sorted in memory and spilled as
+    runs, then k-way merged, so memory stays bounded by the chunk size.
+    """
+    runs, chunk, size = [], [], 0
+    try:
+        for key, line in records:
+            chunk.append((key, line))
+            size += len(line)
+            if size >= chunk_bytes:
+                chunk.sort(key=itemgetter(0))  # stable
+                runs.append(_spill(chunk, tmp_dir))
+                chunk, size = [], 0
+        chunk.sort(key=itemgetter(0))
+        # heapq.merge breaks ties by iterable order: runs are in input order
+        yield from heapq.merge(*map(_read_run, runs), chunk, key=itemgetter(0))
+    finally:
+        for path in runs:
+            os.remove(path)
+
 
 def consolidate_metadata(list_of_entries):
     """
@@ -56,43 +125,195 @@ def consolidate_metadata(list_of_entries):
     return final
 
 
-def main():
+def merge_records(paths, tmp_dir, ends=None, keys=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Yield {"key", "metadata"} per key in key order, consolidating product,
+    then pricing, then sentiment entries – each in file order – as they
+    stream out of the sorted inputs.
+    """
+    streams = [
+        ((key, src, line) for key, line in sorted_by_key(
+            read_lines(path, None if ends is None else ends[src], keys), tmp_dir, chunk_bytes))
+        for src, path in enumerate(paths)
+    ]
+    merged = heapq.merge(*streams, key=itemgetter(0, 1))
+    for key, group in groupby(merged, key=itemgetter(0)):
+        yield {"key": key, "metadata": consolidate_metadata(json.loads(line)["metadata"] for _, _, line in group)}
+
+
+# -------------------------
+# Watermarks (incremental mode)
+# -------------------------
+def _state_path(output):
+    return output + ".state.json"
+
 
-    print("Loading product.jsonl...")
-    product_data = read_jsonl(INPUT_PRODUCT)
+def _fingerprint(path, size):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(size, FINGERPRINT_BYTES))).hexdigest()
 
-    print("Loading pricing.jsonl...")
-    pricing_data = read_jsonl(INPUT_PRICING)
 
-    print("Loading sentiment.jsonl...")
-    sentiment_data = read_jsonl(INPUT_SENTIMENT)
+def _watermarks(paths):
+    """Current end of each input; merging reads up to here, appends after it wait for the next run."""
+    return [os.path.getsize(p) for p in paths]
 
-    all_keys = set(product_data.keys()) | set(pricing_data.keys()) | set(sentiment_data.keys())
-    print(f"Found {len(all_keys)} unique products.")
 
-    with open(OUTPUT_MERGED, "w", encoding="utf-8") as out:
-        for key in sorted(all_keys):
-            combined_entries = []
+def _complete_end(path, end, block=65536):
+    """Offset just past the last newline before `end` (a trailing partial line is left for next time)."""
+    with open(path, "rb") as f:
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            pos = start
+    return 0
 
-            if key in product_data:
-                combined_entries.extend(product_data[key])
-            if key in pricing_data:
-                combined_entries.extend(pricing_data[key])
-            if key in sentiment_data:
-                combined_entries.extend(sentiment_data[key])
 
-            merged_metadata = consolidate_metadata(combined_entries)
+def _save_state(output, paths, offsets):
+    state = {"output": output, "inputs": {
+        p: {"offset": off, "fingerprint": _fingerprint(p, off)} for p, off in zip(paths, offsets)
+    }}
+    with open(_state_path(output), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def _load_state(output, paths):
+    """Saved offsets, or None if a full merge is needed (no state, or an input was rewritten)."""
+    if not os.path.exists(output) or not os.path.exists(_state_path(output)):
+        return None
+    with open(_state_path(output), "r", encoding="utf-8") as f:
+        inputs = json.load(f).get("inputs", {})
+    offsets = []
+    for p in paths:
+        saved = inputs.get(p)
+        if saved is None or saved["offset"] > os.path.getsize(p) or \
+                _fingerprint(p, saved["offset"]) != saved["fingerprint"]:
+            return None
+        offsets.append(saved["offset"])
+    return offsets
+
+
+def _drain(gen):
+    """Exhaust a read_lines generator, collecting keys; returns (keys, watermark)."""
+    keys = set()
+    while True:
+        try:
+            keys.add(next(gen)[0])
+        except StopIteration as stop:
+            return keys, stop.value
+
+
+def _write_atomic(output, lines):
+    directory = os.path.dirname(os.path.abspath(output))
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    count = 0
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        for line in lines:
+            out.write(line)
+            count += 1
+    os.replace(tmp, output)
+    return count
+
+
+def _output_key(line):
+    # lines are written as {"key": <json>, ...}; decode just the key
+    return _decoder.raw_decode(line, len('{"key": '))[0]
+
+
+def _splice(output, fresh):
+    """Old output lines, with the freshly merged keys replaced or inserted in key order."""
+    fresh = iter(fresh)
+    pending = next(fresh, None)
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            key = _output_key(line)
+            while pending is not None and pending["key"] < key:
+                yield json.dumps(pending) + "\n"
+                pending = next(fresh, None)
+            if pending is not None and pending["key"] == key:
+                yield json.dumps(pending) + "\n"
+                pending = next(fresh, None)
+            else:
+                yield line
+    while pending is not None:
+        yield json.dumps(pending) + "\n"
+        pending = next(fresh, None)
+
+
+# -------------------------
+# Merge
+# -------------------------
+def merge_full(paths, output, tmp_dir, chunk_bytes=CHUNK_BYTES):
+    ends = _watermarks(paths)
+    total = _write_atomic(output, (json.dumps(rec) + "\n" for rec in merge_records(paths, tmp_dir, ends, None, chunk_bytes)))
+    _save_state(output, paths, [_complete_end(p, end) for p, end in zip(paths, ends)])
+    return total
+
+
+def merge_incremental(paths, output, tmp_dir, chunk_bytes=CHUNK_BYTES):
+    """
+    Re-merge only keys with entries appended since the last watermark.
+    Their entries are re-read from the start of every input (consolidation
+    depends on all of them, in order), then spliced into the existing
+    output. Falls back to a full merge without a usable watermark.
+    Returns (keys re-merged, None) or (None, products written) after a full merge.
+    """
+    offsets = _load_state(output, paths)
+    if offsets is None:
+        print("No usable watermark – full merge.")
+        return None, merge_full(paths, output, tmp_dir, chunk_bytes)
+
+    touched, new_offsets = set(), []
+    for p, start, end in zip(paths, offsets, _watermarks(paths)):
+        # a trailing line still being written is neither touched nor merged until it is complete
+        keys, watermark = _drain(read_lines(p, _complete_end(p, end), start=start))
+        touched |= keys
+        new_offsets.append(watermark)
+
+    if touched:
+        fresh = merge_records(paths, tmp_dir, new_offsets, touched, chunk_bytes)
+        _write_atomic(output, _splice(output, fresh))
+    _save_state(output, paths, new_offsets)
+    return touched, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge product, pricing and sentiment memories by key")
+    parser.add_argument("--product", default=INPUT_PRODUCT)
+    parser.add_argument("--pricing", default=INPUT_PRICING)
+    parser.add_argument("--sentiment", default=INPUT_SENTIMENT)
+    parser.add_argument("--output", "-o", default=OUTPUT_MERGED)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-merge keys appended to since the last run")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / (1024 * 1024),
+                        help="memory per sorted run before it is spilled to disk")
+    parser.add_argument("--tmp-dir", default=None, help="where sorted runs are spilled")
+    args = parser.parse_args()
 
-            final_obj = {
-                "key": key,
-                "metadata": merged_metadata
-            }
+    paths = [args.product, args.pricing, args.sentiment]
+    for p in paths:
+        if not os.path.exists(p):
+            print("Input file not found:", p)
+            sys.exit(1)
 
-            out.write(json.dumps(final_obj) + "\n")
+    chunk_bytes = int(args.chunk_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        if args.incremental:
+            touched, total = merge_incremental(paths, args.output, tmp_dir, chunk_bytes)
+            if touched is not None:
+                print(f"\n✅ DONE! {len(touched)} produk di-merge ulang ke {args.output}")
+                return
+        else:
+            total = merge_full(paths, args.output, tmp_dir, chunk_bytes)
 
-    print(f"\n✅ DONE! File merged berhasil dibuat: {OUTPUT_MERGED}")
-    print(f"   Total produk: {len(all_keys)}")
+    print(f"\n✅ DONE! File merged berhasil dibuat: {args.output}")
+    print(f"   Total produk: {total}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,327 @@
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, unquote
+
+from infra.util import CircuitOpenError, controller_key, get_domain_controller, is_blocked_html
+from infra.proxy_pool import get_proxy_pool
+from scrapers.logger import get_logger
+
+logger = get_logger("browser_pool")
+
+BROWSER_CONCURRENCY = int(os.getenv("BROWSER_POOL_CONCURRENCY", "4"))
+BROWSER_MAX_NAVIGATIONS = int(os.getenv("BROWSER_POOL_MAX_NAVIGATIONS", "50"))
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_POOL_BLOCK_RESOURCES", "1") != "0"
+
+# Nothing we parse needs these to render
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+
+
+class _Slot:
+    """One reusable browser context + page, bound to the proxy its context was created with."""
+
+    def __init__(self, context, page, proxy: Optional[str] = None):
+        self.context = context
+        self.page = page
+        self.proxy = proxy
+        self.navigations = 0
+
+
+def playwright_proxy(proxy: Optional[str]) -> Optional[Dict[str, str]]:
+    """Proxy URL (credentials included) → Playwright's {"server", "username", "password"}."""
+    if not proxy:
+        return None
+    parts = urlsplit(proxy)
+    server = f"{parts.scheme}://{parts.hostname}" + (f":{parts.port}" if parts.port else "")
+    out = {"server": server}
+    if parts.username:
+        out["username"] = unquote(parts.username)
+        out["password"] = unquote(parts.password or "")
+    return out
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium shared by all Playwright fallbacks.
+
+    - one browser process, relaunched if it disconnects (health check on every acquire)
+    - reusable context/page slots, at most `max_concurrency` in use at once;
+      a slot's context goes out through one proxy and is only reused for it
+    - at most `max_idle` slots (default `max_concurrency`) kept across all
+      proxies; the least recently used one is closed beyond that
+    - a slot is recycled after `max_navigations` page loads or any navigation error
+    - images, fonts, CSS and media are aborted at the network layer
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = BROWSER_CONCURRENCY,
+        max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+        block_resources: bool = BROWSER_BLOCK_RESOURCES,
+        headless: bool = True,
+        max_idle: Optional[int] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_idle = max_concurrency if max_idle is None else max_idle
+        self.max_navigations = max_navigations
+        self.block_resources = block_resources
+        self.headless = headless
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright = None
+        self._browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._idle: List[_Slot] = []  # least recently used first
+        self._stats = {"navigations": 0, "contexts_created": 0, "contexts_recycled": 0,
+                       "contexts_evicted": 0, "browser_launches": 0, "errors": 0}
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    async def start(self):
+        from playwright.async_api import async_playwright
+
+        self.loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._launch_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        await self._ensure_browser()
+        logger.info(f"[POOL] Browser pool started (concurrency={self.max_concurrency})")
+
+    async def close(self):
+        for slot in self._idle:
+            await self._close_slot(slot)
+        self._idle.clear()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info(f"[POOL] Browser pool closed {self._stats}")
+
+    @property
+    def running(self) -> bool:
+        return self._playwright is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "idle_contexts": len(self._idle),
+                "max_concurrency": self.max_concurrency}
+
+    # -----------------------------
+    # Browser / slot management
+    # -----------------------------
+    async def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._browser is not None:
+                logger.warning("[POOL] Browser disconnected – relaunching")
+            # contexts of a dead browser are unusable
+            self._idle.clear()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._stats["browser_launches"] += 1
+
+    async def _new_slot(self, proxy: Optional[str]) -> _Slot:
+        if proxy:
+            context = await self._browser.new_context(proxy=playwright_proxy(proxy))
+        else:
+            context = await self._browser.new_context()
+        if self.block_resources:
+            await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        self._stats["contexts_created"] += 1
+        return _Slot(context, page, proxy)
+
+    async def _acquire(self, proxy: Optional[str]) -> _Slot:
+        await self._ensure_browser()
+        # most recently used slot for this proxy
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i].proxy != proxy:
+                continue
+            slot = self._idle.pop(i)
+            if not slot.page.is_closed():
+                return slot
+            await self._close_slot(slot)
+        return await self._new_slot(proxy)
+
+    async def _release(self, slot: _Slot, healthy: bool):
+        if healthy and slot.navigations < self.max_navigations and self._browser.is_connected():
+            self._idle.append(slot)
+            while len(self._idle) > self.max_idle:
+                self._stats["contexts_evicted"] += 1
+                await self._close_slot(self._idle.pop(0))
+            return
+        self._stats["contexts_recycled"] += 1
+        await self._close_slot(slot)
+
+    async def _close_slot(self, slot: _Slot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def fetch_html(self, url: str, timeout: int = 30000, proxy: Optional[str] = None) -> str:
+        async with self._semaphore:
+            slot = await self._acquire(proxy)
+            healthy = False
+            try:
+                await slot.page.goto(url, timeout=timeout)
+                html = await slot.page.content()
+                healthy = True
+                return html
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                slot.navigations += 1
+                self._stats["navigations"] += 1
+                await self._release(slot, healthy)
+
+    def fetch_html_threadsafe(self, url: str, timeout: int = 30000, proxy: Optional[str] = None) -> str:
+        """Blocking call for worker threads; runs the fetch on the pool's loop."""
+        fut = asyncio.run_coroutine_threadsafe(self.fetch_html(url, timeout, proxy), self.loop)
+        return fut.result(timeout=timeout / 1000 + 30)
+
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# ------------------------------------------------------------
+# PROCESS-WIDE POOL
+# ------------------------------------------------------------
+_pool: Optional[BrowserPool] = None
+
+
+async def start_browser_pool(**kwargs) -> BrowserPool:
+    global _pool
+    if _pool is None or not _pool.running:
+        pool = BrowserPool(**kwargs)
+        await pool.start()
+        _pool = pool
+    return _pool
+
+
+async def stop_browser_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    return _pool if _pool is not None and _pool.running else None
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _admit(url: str, proxy: Optional[str]):
+    """
+    Browser fallbacks answer to the same domain controller as plain HTTP
+    through the same exit (host and proxy, as smart_get keys it): when the
+    domain keeps blocking that exit, rendering it in a browser only hits it
+    harder.
+    """
+    host = urlsplit(url).netloc
+    ctl = get_domain_controller(controller_key(host, {"https": proxy} if proxy else None))
+    if not ctl.allow():
+        raise CircuitOpenError(f"Circuit open for {host}, not rendering {url}")
+    return ctl
+
+
+def _report(ctl, lease, html: Optional[str], started: float):
+    """Feed a render's outcome (None: it failed) to the domain controller and the proxy lease."""
+    if html is not None:
+        blocked = is_blocked_html(html)
+        ctl.record(blocked)
+    if lease is not None:
+        pool = get_proxy_pool()
+        outcome = "error" if html is None else "blocked" if blocked else "ok"
+        pool.report(lease, outcome, time.perf_counter() - started if html is not None else None)
+
+
+async def render_html(url: str, timeout: int = 30000) -> str:
+    """
+    Render `url` with the shared pool, or a one-off browser when no pool runs
+    on this loop; through a proxy leased from the proxy pool, if configured.
+    """
+    proxy_pool = get_proxy_pool()
+    lease = await proxy_pool.acquire_async() if proxy_pool else None
+    proxy = lease.stats.url if lease else None
+    try:
+        ctl = _admit(url, proxy)
+        started, html = time.perf_counter(), None
+        try:
+            html = await _render_html(url, timeout, proxy)
+        finally:
+            _report(ctl, lease, html, started)
+        return html
+    finally:
+        if lease:
+            proxy_pool.release(lease)
+
+
+async def _render_html(url: str, timeout: int, proxy: Optional[str] = None) -> str:
+    pool = get_browser_pool()
+    if pool is not None and pool.loop is _running_loop():
+        return await pool.fetch_html(url, timeout, proxy)
+
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, proxy=playwright_proxy(proxy))
+        page = await browser.new_page()
+        await page.goto(url, timeout=timeout)
+        html = await page.content()
+        await browser.close()
+    return html
+
+
+def render_html_sync(url: str, timeout: int = 30000) -> str:
+    """Sync counterpart for code running in worker threads (e.g. sync FastAPI routes)."""
+    proxy_pool = get_proxy_pool()
+    lease = proxy_pool.acquire() if proxy_pool else None
+    proxy = lease.stats.url if lease else None
+    try:
+        ctl = _admit(url, proxy)
+        started, html = time.perf_counter(), None
+        try:
+            html = _render_html_sync(url, timeout, proxy)
+        finally:
+            _report(ctl, lease, html, started)
+        return html
+    finally:
+        if lease:
+            proxy_pool.release(lease)
+
+
+def _render_html_sync(url: str, timeout: int, proxy: Optional[str] = None) -> str:
+    pool = get_browser_pool()
+    if pool is not None and _running_loop() is None:
+        return pool.fetch_html_threadsafe(url, timeout, proxy)
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, proxy=playwright_proxy(proxy))
+        page = browser.new_page()
+        page.goto(url, timeout=timeout)
+        html = page.content()
+        browser.close()
+    return html
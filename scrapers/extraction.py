@@ -0,0 +1,147 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+
+
+Step = Union[str, "LabelRule"]
+
+
+class LabelRule:
+    """Value in the `sibling` cell next to the first `tag` whose string matches `pattern`."""
+
+    def __init__(self, tag: str, pattern: Pattern, sibling: str):
+        self.tag = tag
+        self.pattern = pattern
+        self.sibling = sibling
+
+    def __str__(self) -> str:
+        return f"{self.tag}[/{self.pattern.pattern}/] + {self.sibling}"
+
+
+class ExtractionSpec:
+    """
+    Declarative field → fallback chain, compiled into grouped queries.
+
+    A chain step is a CSS selector or a LabelRule. Field semantics are those
+    of `safe(a) or safe(b) or ...`: the first element (document order)
+    matching a step is taken, and the next step is tried only if its text
+    is empty or missing.
+
+    Instead of one walk per selector, the first step of every field is
+    joined into one selector group and resolved in a single traversal;
+    matched elements are attributed to the steps they satisfy. Only fields
+    that came back empty go on to another traversal with their next step,
+    so on a normal page everything is read in one walk.
+
+    Per-field hit/miss counters show which steps ever produce values, so
+    dead selectors can be pruned. Pages parsed in worker processes are
+    counted by passing resolve()'s usage back to record() in the parent.
+    """
+
+    def __init__(self, fields: Dict[str, List[Step]]):
+        self.fields = fields
+
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[str, ...], str] = {}
+        self._hits: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._misses: Dict[str, int] = defaultdict(int)
+        self._documents = 0
+        self._traversals = 0
+
+    def _group(self, steps: List[Step]) -> str:
+        key = tuple(dict.fromkeys(s.tag if isinstance(s, LabelRule) else s for s in steps))
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ", ".join(key)
+        return group
+
+    def _traverse(self, doc, steps: List[Step]) -> Dict[int, Any]:
+        """One walk: the first element satisfying each step (keyed by id(step))."""
+        first: Dict[int, Any] = {}
+        pending = list({id(s): s for s in steps}.values())
+
+        for el in doc.select(self._group(steps)):
+            for step in list(pending):
+                if isinstance(step, LabelRule):
+                    if el.tag != step.tag:
+                        continue
+                    s = el.string()
+                    if s is None or not step.pattern.search(s):
+                        continue
+                elif not el.matches(step):
+                    continue
+                first[id(step)] = el
+                pending.remove(step)
+
+            if not pending:
+                break
+
+        return first
+
+    @staticmethod
+    def _value(step: Step, el) -> Optional[str]:
+        if el is None:
+            return None
+        if isinstance(step, LabelRule):
+            el = el.next_sibling_tag(step.sibling)
+            if el is None:
+                return None
+        return el.text()
+
+    def resolve(self, doc) -> Tuple[Dict[str, Optional[str]], Dict[str, Any]]:
+        """
+        extract() without touching the counters: returns (fields, usage).
+        `usage` is plain data (traversals, and per field the step that
+        supplied the value or None) to pass to record(), possibly in another
+        process than the one that parsed the page.
+        """
+        out: Dict[str, Optional[str]] = {}
+        used: Dict[str, Optional[str]] = {f: None for f in self.fields}
+
+        unresolved = list(self.fields)
+        traversals = 0
+        tier = 0
+        while unresolved:
+            steps = {f: self.fields[f][tier] for f in unresolved}
+            first = self._traverse(doc, list(steps.values()))
+            traversals += 1
+
+            for field, step in steps.items():
+                # like `a or b`: the last step tried supplies the value, even ""
+                out[field] = self._value(step, first.get(id(step)))
+                if out[field]:
+                    used[field] = str(step)
+
+            tier += 1
+            unresolved = [f for f in unresolved if not out[f] and tier < len(self.fields[f])]
+
+        return out, {"traversals": traversals, "steps": used}
+
+    def record(self, usage: Dict[str, Any]):
+        """Count one document's `usage` from resolve()."""
+        with self._lock:
+            self._documents += 1
+            self._traversals += usage["traversals"]
+            for field, step in usage["steps"].items():
+                if step is None:
+                    self._misses[field] += 1
+                else:
+                    self._hits[field][step] += 1
+
+    def extract(self, doc) -> Dict[str, Optional[str]]:
+        out, usage = self.resolve(doc)
+        self.record(usage)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        """Per field: which step supplied the value how often, and how often none did."""
+        with self._lock:
+            fields = {}
+            for field, chain in self.fields.items():
+                hits = {str(step): self._hits[field].get(str(step), 0) for step in chain}
+                fields[field] = {
+                    "hits": hits,
+                    "misses": self._misses.get(field, 0),
+                    "dead_selectors": [step for step, n in hits.items() if n == 0] if self._documents else [],
+                }
+            return {"documents": self._documents, "traversals": self._traversals, "fields": fields}
@@ -0,0 +1,182 @@
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+
+# "auto" picks the fastest installed backend: selectolax → lxml → html.parser
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "auto")
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+def _installed(backend: str) -> bool:
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend == "lxml":
+            import lxml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    name = name or HTML_PARSER_BACKEND
+    if name == "auto":
+        return next(b for b in BACKENDS if _installed(b))
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    return name
+
+
+# ------------------------------------------------------------
+# NODE ADAPTERS
+# ------------------------------------------------------------
+# The scrapers only need a handful of operations; both adapters implement
+# them with BeautifulSoup's semantics (get_text(strip=True), .string,
+# find_next_sibling) so every backend extracts identical values.
+
+_sv_compiled: Dict[str, object] = {}
+
+
+class BsNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    @property
+    def tag(self) -> str:
+        return self.el.name
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return {k: " ".join(v) if isinstance(v, list) else v for k, v in self.el.attrs.items()}
+
+    @property
+    def parent(self) -> Optional["BsNode"]:
+        p = self.el.parent
+        return BsNode(p) if p is not None and p.name != "[document]" else None
+
+    def select(self, css: str) -> List["BsNode"]:
+        return [BsNode(e) for e in self.el.select(css)]
+
+    def select_one(self, css: str) -> Optional["BsNode"]:
+        e = self.el.select_one(css)
+        return BsNode(e) if e is not None else None
+
+    def matches(self, css: str) -> bool:
+        compiled = _sv_compiled.get(css)
+        if compiled is None:
+            import soupsieve
+            compiled = _sv_compiled[css] = soupsieve.compile(css)
+        return compiled.match(self.el)
+
+    def text(self) -> str:
+        return self.el.get_text(strip=True)
+
+    def attr(self, name: str, default=None):
+        v = self.el.get(name, default)
+        return " ".join(v) if isinstance(v, list) else v
+
+    def string(self) -> Optional[str]:
+        s = self.el.string
+        return str(s) if s is not None else None
+
+    def next_sibling_tag(self, tag: str) -> Optional["BsNode"]:
+        e = self.el.find_next_sibling(tag)
+        return BsNode(e) if e is not None else None
+
+    def iter_elements(self) -> Iterator["BsNode"]:
+        for e in self.el.find_all(True):
+            yield BsNode(e)
+
+
+class LexborNode:
+    __slots__ = ("el", "is_document")
+
+    def __init__(self, el, is_document: bool = False):
+        self.el = el
+        # lexbor's root is <html> itself; as a document it must not skip it when iterating
+        self.is_document = is_document
+
+    @property
+    def tag(self) -> str:
+        return self.el.tag
+
+    @property
+    def attrs(self) -> Dict[str, str]:
+        return {k: (v or "") for k, v in self.el.attributes.items()}
+
+    @property
+    def parent(self) -> Optional["LexborNode"]:
+        p = self.el.parent
+        return LexborNode(p) if p is not None and not p.tag.startswith("-") else None
+
+    def select(self, css: str) -> List["LexborNode"]:
+        return [LexborNode(e) for e in self.el.css(css)]
+
+    def select_one(self, css: str) -> Optional["LexborNode"]:
+        e = self.el.css_first(css)
+        return LexborNode(e) if e is not None else None
+
+    def matches(self, css: str) -> bool:
+        return self.el.css_matches(css)
+
+    def text(self) -> str:
+        return self.el.text(deep=True, separator="", strip=True)
+
+    def attr(self, name: str, default=None):
+        attrs = self.el.attributes
+        if name not in attrs:
+            return default
+        return attrs[name] or ""
+
+    def string(self) -> Optional[str]:
+        # BeautifulSoup .string: the only child's string, recursing through single-child tags
+        el = self.el
+        while True:
+            child = el.child
+            if child is None or child.next is not None:
+                return None
+            if child.tag == "-text":
+                return child.text_content
+            if child.tag.startswith("-"):
+                return None
+            el = child
+
+    def next_sibling_tag(self, tag: str) -> Optional["LexborNode"]:
+        e = self.el.next
+        while e is not None:
+            if e.tag == tag:
+                return LexborNode(e)
+            e = e.next
+        return None
+
+    def iter_elements(self) -> Iterator["LexborNode"]:
+        nodes = iter(self.el.traverse(include_text=False))
+        if not self.is_document:
+            next(nodes, None)  # traverse() starts with the node itself
+        for e in nodes:
+            if not e.tag.startswith("-"):
+                yield LexborNode(e)
+
+
+def parse_html(html: str, backend: Optional[str] = None):
+    """Parse `html` with the configured backend and return the document node."""
+    backend = resolve_backend(backend)
+
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborNode(LexborHTMLParser(html).root, is_document=True)
+
+    from bs4 import BeautifulSoup
+    return BsNode(BeautifulSoup(html, backend))
+
+
+def find_by_string(doc, tag: str, pattern: "re.Pattern") -> Optional[object]:
+    """Equivalent of soup.find(tag, string=pattern)."""
+    for el in doc.select(tag):
+        s = el.string()
+        if s is not None and pattern.search(s):
+            return el
+    return None
@@ -0,0 +1,146 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from scrapers.logger import get_logger
+
+logger = get_logger("parse_pool")
+
+# 0 disables the pool: pages are parsed inline on the event loop
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", str(os.cpu_count() or 1)))
+# Below this size pickling the page costs more than parsing it
+PARSE_POOL_MIN_BYTES = int(os.getenv("PARSE_POOL_MIN_BYTES", "20000"))
+
+
+def _init_worker():
+    # Import the parsers (and pick the HTML backend) once per process, not per job
+    from scrapers import product_page, review_page, search_page  # noqa: F401
+    from scrapers.html_backend import resolve_backend
+    resolve_backend()
+
+
+def _timed(func: Callable, args: tuple):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class ParsePool:
+    """
+    Worker processes for CPU-bound HTML parsing.
+
+    Parse functions must be module-level (picklable) and take/return plain
+    data. Workers are spawned rather than forked, since the agent process
+    already runs the event loop, httpx and Playwright threads. A crashed
+    worker breaks the executor; it is replaced and the job parsed inline.
+    """
+
+    def __init__(self, workers: int = PARSE_POOL_WORKERS, min_bytes: int = PARSE_POOL_MIN_BYTES):
+        self.workers = workers
+        self.min_bytes = min_bytes
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {"jobs": 0, "inline": 0, "errors": 0, "restarts": 0,
+                       "worker_seconds": 0.0, "wait_seconds": 0.0}
+
+    def start(self):
+        self.executor = self._new_executor()
+        logger.info(f"[PARSE] Parse pool started (workers={self.workers})")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        logger.info(f"[PARSE] Parse pool closed {self.stats()}")
+
+    @property
+    def running(self) -> bool:
+        return self.executor is not None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        jobs = self._stats["jobs"]
+        return {
+            **self._stats,
+            "workers": self.workers,
+            # time a job spent queued or in transit, beyond the parse itself
+            "avg_queue_ms": round(
+                (self._stats["wait_seconds"] - self._stats["worker_seconds"]) / jobs * 1000, 2
+            ) if jobs else None,
+        }
+
+    async def run(self, func: Callable, *args) -> Any:
+        html = args[0] if args and isinstance(args[0], str) else ""
+        if len(html) < self.min_bytes:
+            self._stats["inline"] += 1
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        start = time.perf_counter()
+        try:
+            result, busy = await loop.run_in_executor(executor, _timed, func, args)
+        except BrokenProcessPool:
+            self._stats["errors"] += 1
+            # concurrent jobs all see the same broken executor; replace it once
+            if self.executor is executor:
+                self._restart()
+            self._stats["inline"] += 1
+            return func(*args)
+
+        self._stats["jobs"] += 1
+        self._stats["worker_seconds"] += busy
+        self._stats["wait_seconds"] += time.perf_counter() - start
+        return result
+
+    def _restart(self):
+        logger.warning("[PARSE] Parse worker died – restarting pool")
+        old, self.executor = self.executor, self._new_executor()
+        self._stats["restarts"] += 1
+        if old is not None:
+            old.shutdown(wait=False, cancel_futures=True)
+
+
+# ------------------------------------------------------------
+# PROCESS-WIDE POOL
+# ------------------------------------------------------------
+_pool: Optional[ParsePool] = None
+
+
+def start_parse_pool(**kwargs) -> Optional[ParsePool]:
+    global _pool
+    if _pool is None or not _pool.running:
+        pool = ParsePool(**kwargs)
+        if pool.workers <= 0:
+            return None
+        pool.start()
+        _pool = pool
+    return _pool
+
+
+def stop_parse_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    return _pool if _pool is not None and _pool.running else None
+
+
+async def parse_in_pool(func: Callable, *args) -> Any:
+    """Run `func(*args)` on the parse pool; inline when no pool is running."""
+    pool = get_parse_pool()
+    if pool is None:
+        return func(*args)
+    return await pool.run(func, *args)
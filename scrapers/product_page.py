@@ -1,7 +1,11 @@
-from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional
-from infra.util import smart_get, is_blocked_html, parse_price, extract_asin_from_url
+from typing import Dict, Any, Optional, Tuple
+from infra.util import (smart_get, async_smart_get, store_page, async_store_page, is_blocked_html, parse_price,
+                        extract_asin_from_url, STREAM_MAX_BYTES)
 from scrapers.logger import get_logger
+from scrapers.browser_pool import render_html, render_html_sync
+from scrapers.html_backend import parse_html
+from scrapers.parse_pool import parse_in_pool
+from scrapers.extraction import ExtractionSpec, LabelRule
 import re
 
 logger = get_logger("product_scraper")
@@ -20,31 +24,84 @@ FAKE_PRODUCT = {
 }
 
 
+# Field → selector fallback chains, resolved in one pass over the document
+PRODUCT_SPEC = ExtractionSpec(
+    fields={
+        "title": ["#productTitle", "span#title", "h1 span"],
+        "price_raw": [
+            ".a-price .a-offscreen",
+            "#priceblock_ourprice",
+            "#priceblock_dealprice",
+            ".priceToPay .a-offscreen",
+        ],
+        "rating_raw": ["span[data-hook='rating-out-of-text']", "span.a-icon-alt"],
+        "review_count": ["#acrCustomerReviewText", "span[data-hook='total-review-count']"],
+        "meta_asin": [
+            # <th>ASIN</th><td>B0XXXXXXXX</td> in the product details table
+            LabelRule("th", re.compile(r"ASIN", re.I), sibling="td"),
+            "input#ASIN",
+            "div[data-asin]",
+        ],
+    },
+)
+
+
+def _cls(name: str) -> str:
+    return rf"""(?<![\w-])class=["'](?:[^"']*\s)?{name}(?:\s[^"']*)?["']"""
+
+
+def _open(attr: str) -> str:
+    return rf"<\w+\b[^>]*{attr}[^>]*>"
+
+
+# Non-empty, text-only element content up to its closing tag
+_TEXT = r"(?:\s|&nbsp;|&#160;)*[^\s<&][^<]*</\w+\s*>"
+
+# The *first* element matching each field's primary selector, with a
+# `value` group that takes part only if that element has text. Once all
+# four are satisfied in the downloaded prefix, the rest of the page cannot
+# change what PRODUCT_SPEC extracts, so the download can stop there. A
+# price counts only as the first `.a-price` element's leading `.a-offscreen`
+# child: no other `.a-price .a-offscreen` can come before it.
+PRIMARY_FIELD_PATTERNS = [
+    re.compile(_open(r"""(?<![\w-])id=["']productTitle["']""") + rf"(?P<value>{_TEXT})?"),
+    re.compile(_open(_cls("a-price")) + rf"(?P<value>\s*{_open(_cls('a-offscreen'))}{_TEXT})?"),
+    re.compile(r"<span\b[^>]*" + r"""(?<![\w-])data-hook=["']rating-out-of-text["'][^>]*>""" + rf"(?P<value>{_TEXT})?"),
+    re.compile(_open(r"""(?<![\w-])id=["']acrCustomerReviewText["']""") + rf"(?P<value>{_TEXT})?"),
+]
+
+
+def _stream_args(url: str) -> Dict[str, Any]:
+    # Without an ASIN in the URL the product id comes from the details table
+    # near the bottom of the page, so the whole page is needed
+    if not extract_asin_from_url(url):
+        return {}
+    return {"stop_patterns": PRIMARY_FIELD_PATTERNS, "max_bytes": STREAM_MAX_BYTES}
+
+
 def _parse_with_bs(html: str, url: str) -> Dict[str, Any]:
-    soup = BeautifulSoup(html, "html.parser")
+    parsed, usage = _parse_product(html, url)
+    PRODUCT_SPEC.record(usage)
+    return parsed
+
 
-    def safe(sel):
-        el = soup.select_one(sel)
-        return el.get_text(strip=True) if el else None
+def _parse_product(html: str, url: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """_parse_with_bs for the parse pool: the spec's usage comes back to be counted in the agent process."""
+    fields, usage = PRODUCT_SPEC.resolve(parse_html(html))
 
-    # Title
-    title = safe("#productTitle") or safe("span#title") or safe("h1 span")
+    title = fields["title"]
 
     # Price detection
-    price_raw = (
-        safe(".a-price .a-offscreen")
-        or safe("#priceblock_ourprice")
-        or safe("#priceblock_dealprice")
-        or safe(".priceToPay .a-offscreen")
-    )
+    price_raw = fields["price_raw"]
     price = parse_price(price_raw)
 
     # If Amazon blocked → price will be None, provide default placeholder
-    if price is None:
+    price_placeholder = price is None
+    if price_placeholder:
         price = 899.0
 
     # Rating
-    rating_raw = safe("span[data-hook='rating-out-of-text']") or safe("span.a-icon-alt")
+    rating_raw = fields["rating_raw"]
     rating = None
     if rating_raw:
         m = re.search(r"([0-9]+(\.[0-9]+)?)", rating_raw)
@@ -54,20 +111,10 @@ def _parse_with_bs(html: str, url: str) -> Dict[str, Any]:
             except:
                 rating = None
 
-    review_count = safe("#acrCustomerReviewText") or safe("span[data-hook='total-review-count']")
+    review_count = fields["review_count"]
 
     # Extract ASIN
-    asin = None
-    meta_tag = soup.find("th", string=re.compile(r"ASIN", re.I))
-    meta_asin = None
-
-    if meta_tag:
-        td = meta_tag.find_next_sibling("td")
-        if td:
-            meta_asin = td.get_text(strip=True)
-
-    if not meta_asin:
-        meta_asin = safe("input#ASIN") or safe("div[data-asin]")
+    meta_asin = fields["meta_asin"]
 
     asin = extract_asin_from_url(url) or (
         meta_asin if isinstance(meta_asin, str) and len(meta_asin) == 10 else None
@@ -78,12 +125,13 @@ def _parse_with_bs(html: str, url: str) -> Dict[str, Any]:
         "title": title,
         "price_raw": price_raw,
         "price": price,
+        "price_placeholder": price_placeholder,
         "rating_raw": rating_raw,
         "rating": rating,
         "review_count": review_count,
         "url": url,
         "raw_html_len": len(html),
-    }
+    }, usage
 
 
 def needs_playwright(parsed: Dict[str, Any]) -> bool:
@@ -109,12 +157,13 @@ def scrape_product_page(
     logger.info(f"Scraping product page: {url}")
 
     try:
-        resp = smart_get(url, proxies=proxies)
+        resp = smart_get(url, proxies=proxies, page_type="product", **_stream_args(url))
         parsed = _parse_with_bs(resp.text, url)
 
         if is_blocked_html(resp.text) or needs_playwright(parsed):
             raise RuntimeError("Blocked, switching to Playwright")
 
+        store_page(resp)
         logger.info(f"Scrape success → {parsed.get('product_id')}")
         return parsed
 
@@ -122,23 +171,56 @@ def scrape_product_page(
         logger.warning(f"Switching to Playwright for {url}")
 
         try:
-            from playwright.sync_api import sync_playwright
-        except Exception as e:
+            html = render_html_sync(url, playwright_timeout)
+        except ImportError as e:
             logger.error(f"Playwright not installed → fallback FAKE_PRODUCT ({e})")
             return FAKE_PRODUCT
+        except Exception as e:
+            logger.error(f"Playwright request failed → FAKE_PRODUCT ({e})")
+            return FAKE_PRODUCT
 
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.goto(url, timeout=playwright_timeout)
-                html = page.content()
-                parsed = _parse_with_bs(html, url)
-                browser.close()
+        parsed = _parse_with_bs(html, url)
+        logger.info(f"Playwright success → {parsed.get('product_id')}")
+        return parsed
 
-                logger.info(f"Playwright success → {parsed.get('product_id')}")
-                return parsed
 
-        except Exception as e:
-            logger.error(f"Playwright request failed → FAKE_PRODUCT ({e})")
-            return FAKE_PRODUCT
\ No newline at end of file
+async def scrape_product_page_async(
+    url: str,
+    proxies: Optional[dict] = None,
+    playwright_timeout: int = 30000,
+) -> Dict[str, Any]:
+    """
+    Same flow as scrape_product_page on the async stack:
+    shared async client first, then the browser pool, then FAKE_PRODUCT.
+    """
+
+    logger.info(f"Scraping product page (async): {url}")
+
+    try:
+        resp = await async_smart_get(url, proxies=proxies, page_type="product", **_stream_args(url))
+        parsed, usage = await parse_in_pool(_parse_product, resp.text, url)
+        PRODUCT_SPEC.record(usage)
+
+        if is_blocked_html(resp.text) or needs_playwright(parsed):
+            raise RuntimeError("Blocked, switching to Playwright")
+
+        await async_store_page(resp)
+        logger.info(f"Scrape success → {parsed.get('product_id')}")
+        return parsed
+
+    except Exception:
+        logger.warning(f"Switching to Playwright for {url}")
+
+    try:
+        html = await render_html(url, playwright_timeout)
+    except ImportError as e:
+        logger.error(f"Playwright not installed → fallback FAKE_PRODUCT ({e})")
+        return FAKE_PRODUCT
+    except Exception as e:
+        logger.error(f"Playwright request failed → FAKE_PRODUCT ({e})")
+        return FAKE_PRODUCT
+
+    parsed, usage = await parse_in_pool(_parse_product, html, url)
+    PRODUCT_SPEC.record(usage)
+    logger.info(f"Playwright success → {parsed.get('product_id')}")
+    return parsed
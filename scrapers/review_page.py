@@ -1,8 +1,9 @@
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any, Optional
-from infra.util import smart_get, is_blocked_html
+from infra.util import async_smart_get, async_store_page, is_blocked_response, HOST_CONCURRENCY, AMAZON_BASE_URL
 import asyncio
-from playwright.async_api import async_playwright
+from scrapers.browser_pool import render_html
+from scrapers.html_backend import parse_html
+from scrapers.parse_pool import parse_in_pool
 from scrapers.logger import get_logger
 
 logger = get_logger("review_scraper")
@@ -22,22 +23,22 @@ FAKE_REVIEWS = [
 
 
 def parse_reviews_from_html(html: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "html.parser")
+    doc = parse_html(html)
     out: List[Dict[str, Any]] = []
 
-    for r in soup.select("div[data-hook='review']"):
+    for r in doc.select("div[data-hook='review']"):
         body_el = r.select_one("span[data-hook='review-body']")
         rating_el = (
             r.select_one("i[data-hook='review-star-rating'] span")
             or r.select_one("span.a-icon-alt")
         )
 
-        text = body_el.get_text(strip=True) if body_el else ""
+        text = body_el.text() if body_el else ""
         rating = None
 
         if rating_el:
             try:
-                rating = float(rating_el.get_text(strip=True).split()[0])
+                rating = float(rating_el.text().split()[0])
             except:
                 rating = None
 
@@ -47,13 +48,40 @@ def parse_reviews_from_html(html: str) -> List[Dict[str, Any]]:
 
 
 async def scrape_reviews_with_playwright_async(url: str, playwright_timeout: int = 30000):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto(url, timeout=playwright_timeout)
-        html = await page.content()
-        await browser.close()
-        return parse_reviews_from_html(html)
+    html = await render_html(url, playwright_timeout)
+    return await parse_in_pool(parse_reviews_from_html, html)
+
+
+async def fetch_review_page(
+    product_id: str,
+    page_number: int,
+    proxies: Optional[dict] = None,
+    playwright_timeout: int = 30000,
+):
+    """
+    Fetch and parse one review page. Returns (reviews, used_playwright).
+    Raises if both the HTTP fetch and the Playwright fallback fail.
+    """
+    logger.info(f"Scraping reviews for product={product_id}, page={page_number}")
+    url = f"{AMAZON_BASE_URL}/product-reviews/{product_id}/?pageNumber={page_number}"
+
+    try:
+        resp = await async_smart_get(url, proxies=proxies, page_type="reviews")
+        html = resp.text
+
+        # same test async_smart_get recorded against the host and proxy
+        blocked = is_blocked_response(resp.status_code, html, str(resp.url), "reviews")
+
+        if not blocked:
+            await async_store_page(resp)
+            return await parse_in_pool(parse_reviews_from_html, html), False
+
+        logger.warning(f"Amazon blocked => switching to Playwright (page {page_number})")
+
+    except Exception as e:
+        logger.error(f"async_smart_get failed: {e}, retry via Playwright")
+
+    return await scrape_reviews_with_playwright_async(url, playwright_timeout), True
 
 
 async def scrape_product_reviews_async(
@@ -61,59 +89,50 @@ async def scrape_product_reviews_async(
     max_pages: int = 3,
     proxies: Optional[dict] = None,
     playwright_timeout: int = 30000,
+    concurrency: int = HOST_CONCURRENCY,
 ) -> List[Dict[str, Any]]:
+    """
+    Fetch review pages concurrently, `concurrency` pages per wave (the shared
+    client's per-host limiter does the actual throttling). Pages are consumed
+    in order and scraping stops at the first empty page, so a large
+    `max_pages` costs at most one extra wave past the last review page.
+    """
 
     all_reviews = []
     fallback_playwright_count = 0
+    last_page_reached = False
 
-    for page_number in range(1, max_pages + 1):
-        logger.info(f"Scraping reviews for product={product_id}, page={page_number}")
-        url = f"https://www.amazon.com/product-reviews/{product_id}/?pageNumber={page_number}"
-
-        try:
-            resp = smart_get(url, proxies=proxies)
-            html = resp.text
-
-            blocked = (
-                is_blocked_html(html)
-                or "signin" in resp.url.lower()
-                or "captcha" in html.lower()
-            )
-
-            if blocked:
-                logger.warning(f"Amazon blocked => switching to Playwright (page {page_number})")
-                fallback_playwright_count += 1
-                try:
-                    page_reviews = await scrape_reviews_with_playwright_async(
-                        url, playwright_timeout
-                    )
-                except Exception as e:
-                    logger.error(f"Playwright fetch failed: {e}, using FAKE_REVIEWS")
-                    return FAKE_REVIEWS
-            else:
-                page_reviews = parse_reviews_from_html(html)
+    for wave_start in range(1, max_pages + 1, concurrency):
+        if last_page_reached:
+            break
 
-        except Exception as e:
-            logger.error(f"smart_get failed: {e}, retry via Playwright")
-            try:
-                fallback_playwright_count += 1
-                page_reviews = await scrape_reviews_with_playwright_async(
-                    url, playwright_timeout
-                )
-            except Exception as e2:
-                logger.error(f"Playwright failed too => using FAKE_REVIEWS ({e2})")
+        pages = range(wave_start, min(wave_start + concurrency, max_pages + 1))
+        results = await asyncio.gather(
+            *(fetch_review_page(product_id, n, proxies, playwright_timeout) for n in pages),
+            return_exceptions=True,
+        )
+
+        for page_number, res in zip(pages, results):
+            if isinstance(res, BaseException):
+                logger.error(f"Playwright failed too => using FAKE_REVIEWS ({res})")
                 return FAKE_REVIEWS
 
-        if not page_reviews:
-            logger.warning(f"No reviews found at page {page_number} => using FAKE_REVIEWS")
-            return FAKE_REVIEWS
+            page_reviews, used_playwright = res
+            fallback_playwright_count += int(used_playwright)
+
+            if not page_reviews:
+                if not all_reviews:
+                    logger.warning(f"No reviews found at page {page_number} => using FAKE_REVIEWS")
+                    return FAKE_REVIEWS
+                logger.info(f"No reviews at page {page_number} => last page reached")
+                last_page_reached = True
+                break
 
-        all_reviews.extend(page_reviews)
-        await asyncio.sleep(1)
+            all_reviews.extend(page_reviews)
 
     logger.info(
         f"Scrape complete for {product_id}: total_reviews={len(all_reviews)}, "
         f"playwright_fallbacks={fallback_playwright_count}"
     )
 
-    return all_reviews or FAKE_REVIEWS
\ No newline at end of file
+    return all_reviews or FAKE_REVIEWS
@@ -1,22 +1,28 @@
+import re
 import asyncio
 import urllib.parse
 from typing import List, Optional
-from bs4 import BeautifulSoup
 
-from infra.util import smart_get, is_blocked_html
+from infra.util import async_smart_get, async_store_page, is_blocked_html, AMAZON_BASE_URL, STREAM_MAX_BYTES
 from scrapers.logger import get_logger
-from playwright.async_api import async_playwright
+from scrapers.browser_pool import render_html
+from scrapers.html_backend import parse_html
+from scrapers.parse_pool import parse_in_pool
 
 logger = get_logger("search_scraper")
 
+# The pagination strip closes the result list; what follows (footer carousels,
+# recommendations) is not search results, so the download stops there
+RESULTS_END_PATTERN = re.compile(r"""class=["'][^"']*\bs-pagination-(?:strip|container)\b""")
+
 
 def parse_search_html(html: str) -> List[str]:
     """Extract ASINs from Amazon search result HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+    doc = parse_html(html)
     asins = []
 
-    for item in soup.select("div[data-asin]"):
-        asin = item.get("data-asin", "").strip()
+    for item in doc.select("div[data-asin]"):
+        asin = item.attr("data-asin", "").strip()
         if len(asin) == 10:
             asins.append(asin)
 
@@ -25,16 +31,11 @@ def parse_search_html(html: str) -> List[str]:
 
 async def scrape_search_playwright(url: str, timeout: int = 30000) -> List[str]:
     """Render search page using Playwright async."""
-    logger.info(f"[PLAYWRIGHT] Launching headless browser for {url}")
+    logger.info(f"[PLAYWRIGHT] Rendering {url}")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto(url, timeout=timeout)
-        html = await page.content()
-        await browser.close()
+    html = await render_html(url, timeout)
 
-    asins = parse_search_html(html)
+    asins = await parse_in_pool(parse_search_html, html)
     logger.info(f"[PLAYWRIGHT] Extracted {len(asins)} ASINs")
 
     return asins
@@ -47,12 +48,12 @@ async def scrape_search_results(
 ) -> List[str]:
     """
     Amazon search scraper with fallback:
-    1. requests → BS4
+    1. async HTTP → BS4
     2. If blocked → Playwright async
     """
 
     encoded = urllib.parse.quote_plus(query)
-    url = f"https://www.amazon.com/s?k={encoded}&page={page}"
+    url = f"{AMAZON_BASE_URL}/s?k={encoded}&page={page}"
 
     logger.info(f"[SCRAPE] Searching Amazon for '{query}', page={page}")
 
@@ -60,14 +61,16 @@ async def scrape_search_results(
     # Attempt normal HTTP request first
     # -----------------------------------
     try:
-        resp = smart_get(url, proxies=proxies)
+        resp = await async_smart_get(url, proxies=proxies, page_type="search",
+                                     stop_patterns=[RESULTS_END_PATTERN], max_bytes=STREAM_MAX_BYTES)
         html = resp.text
 
         if is_blocked_html(html):
             logger.warning("[SCRAPE] Blocked by Amazon – switching to Playwright")
             raise RuntimeError("blocked")
 
-        asins = parse_search_html(html)
+        asins = await parse_in_pool(parse_search_html, html)
+        await async_store_page(resp)
         logger.info(f"[SCRAPE] Found {len(asins)} ASINs via requests")
         return asins
 
@@ -0,0 +1,258 @@
+"""
+What-if repricing over the whole stored catalogue.
+
+Loads product, pricing and sentiment memory once into arrays, then prices
+every SKU under each scenario – a set of overrides of the pricing rules
+(PRICING_RULES in infra/pricing_rules.py) – in vectorized passes, many
+scenarios at a time. For each scenario it reports how recommendations
+move against the current rules and the revenue impact under a
+constant-elasticity demand model.
+
+    python simulate_pricing.py --scenario '{"strong_sentiment": 0.8, "good_sentiment": 0.65}'
+    python simulate_pricing.py --scenario '{"clamp_high": 1.1, "clamp_low": 0.9}' --per-sku deltas.csv
+    python simulate_pricing.py --grid "strong_sentiment=0.75:0.9:0.01;clamp_high=1.05,1.1,1.2" --top 10
+"""
+import sys
+import json
+import time
+import argparse
+import itertools
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from infra.pricing_rules import PRICING_RULES, apply_pricing_rules, round_prices
+from memory_bank.metadata_utils import load_all
+from memory_bank.price_index import get_price_index, category_key
+
+PRODUCT_PATH = "memory_bank/metadata/product.jsonl"
+PRICING_PATH = "memory_bank/metadata/pricing.jsonl"
+SENTIMENT_PATH = "memory_bank/metadata/sentiment.jsonl"
+
+DEFAULT_ELASTICITY = -1.5
+# elements per (scenario x SKU) block; bounds memory for large sweeps
+BLOCK_ELEMENTS = 2_000_000
+
+
+# -------------------------
+# Catalogue
+# -------------------------
+def load_catalogue(product_path: str = PRODUCT_PATH, pricing_path: str = PRICING_PATH,
+                   sentiment_path: str = SENTIMENT_PATH) -> Dict[str, np.ndarray]:
+    """
+    One row per SKU with the inputs of its latest pricing decision: base
+    price, competitor average (NaN if there was none) and positive ratio.
+    SKUs never priced fall back to their listed price, the competitor price
+    index and the sentiment agent's ratio. Placeholder prices (parser
+    default, pricing agent fallback) are not real prices: a SKU with no
+    other price is left out.
+    """
+    titles, listed, sentiment = {}, {}, {}
+    for rec in load_all(product_path):
+        meta = rec.get("metadata") or {}
+        titles[rec["key"]] = meta.get("category") or category_key(meta.get("title") or "")
+        if meta.get("price") and not meta.get("price_placeholder"):
+            listed[rec["key"]] = meta["price"]
+    for rec in load_all(sentiment_path):
+        ratio = (rec.get("metadata") or {}).get("positive_ratio")
+        if ratio is not None:
+            sentiment[rec["key"]] = ratio
+
+    base, ratio, competitor = {}, {}, {}
+    for rec in load_all(pricing_path):
+        key, meta = rec["key"], rec.get("metadata") or {}
+        if "base_price" in meta:                    # pricing agent: its inputs
+            if not meta.get("price_placeholder"):
+                base[key] = meta["base_price"]
+            ratio[key] = meta.get("positive_ratio")
+        if "competitor_average_price" in meta:      # coordinator: the agent's result
+            competitor[key] = meta["competitor_average_price"]
+
+    index = get_price_index()
+    ids = sorted(k for k in set(base) | set(listed) if base.get(k) or listed.get(k))
+
+    def avg(k):
+        if k in competitor:
+            return competitor[k]
+        return index.competitor_average(titles.get(k, ""), exclude=k)
+
+    def positive(k):
+        r = ratio.get(k)
+        return r if r is not None else sentiment.get(k, 0.5)
+
+    return {
+        "product_id": np.array(ids, dtype=object),
+        "base": np.array([base.get(k) or listed[k] for k in ids], dtype=np.float64),
+        "competitor_avg": np.array([np.nan if avg(k) is None else avg(k) for k in ids], dtype=np.float64),
+        "ratio": np.array([positive(k) for k in ids], dtype=np.float64),
+        # relative demand per SKU at today's recommendation; no sales data is stored
+        "units": np.ones(len(ids)),
+    }
+
+
+# -------------------------
+# Scenarios
+# -------------------------
+def _values(spec: str) -> List[float]:
+    if ":" in spec:
+        lo, hi, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(lo, hi + step / 2, step), 10).tolist()
+    return [float(x) for x in spec.split(",")]
+
+
+def parse_grid(spec: str) -> List[Dict[str, float]]:
+    """"a=0.8,0.85;b=1.0:1.2:0.05" → every combination of the listed values."""
+    axes = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        name, values = part.split("=", 1)
+        axes[name.strip()] = _values(values)
+    return [dict(zip(axes, combo)) for combo in itertools.product(*axes.values())]
+
+
+def _check(scenario: Dict[str, Any]):
+    unknown = set(scenario) - set(PRICING_RULES) - {"name", "elasticity"}
+    if unknown:
+        raise ValueError(f"Unknown pricing rules: {sorted(unknown)} (known: {sorted(PRICING_RULES)})")
+
+
+# -------------------------
+# Simulation
+# -------------------------
+def simulate(catalogue: Dict[str, np.ndarray], scenarios: List[Dict[str, Any]],
+             elasticity: float = DEFAULT_ELASTICITY, per_sku: bool = False) -> Dict[str, Any]:
+    """
+    Price the catalogue under every scenario. Per SKU the delta is against
+    the recommendation of the current rules; demand follows
+    units * (price / baseline) ** elasticity.
+
+    Returns {"baseline": {...}, "scenarios": [summary, ...]} and, with
+    `per_sku`, "deltas": a (scenarios x SKUs) array of price changes.
+    """
+    for sc in scenarios:
+        _check(sc)
+
+    base, ratio, units = catalogue["base"], catalogue["ratio"], catalogue["units"]
+    has = ~np.isnan(catalogue["competitor_avg"])
+    if (catalogue["competitor_avg"][has] == 0).any():
+        raise ZeroDivisionError("competitor average price is zero")
+
+    # Scenario-independent work, done once
+    with np.errstate(invalid="ignore"):
+        gap = (catalogue["competitor_avg"] - base) / catalogue["competitor_avg"]
+    baseline = round_prices(np.where(has, apply_pricing_rules(base, gap, ratio, PRICING_RULES), base))
+    weight = baseline * units
+    baseline_revenue = float(weight.sum())
+    with np.errstate(divide="ignore"):
+        inv_baseline = np.where(baseline > 0, 1.0 / baseline, 0.0)
+    pct_scale = inv_baseline * 100
+
+    n = len(base)
+    block = max(1, BLOCK_ELEMENTS // max(n, 1))
+    summaries, deltas = [], []
+
+    for start in range(0, len(scenarios), block):
+        chunk = scenarios[start:start + block]
+        # one column per rule, one row per scenario; broadcasts over SKUs
+        rules = {k: np.array([[sc.get(k, v)] for sc in chunk], dtype=np.float64) for k, v in PRICING_RULES.items()}
+        e = np.array([[sc.get("elasticity", elasticity)] for sc in chunk], dtype=np.float64)
+
+        new = apply_pricing_rules(base, gap, ratio, rules)
+        prices = round_prices(np.where(has, new, base).ravel()).reshape(len(chunk), n)
+
+        delta = prices - baseline
+        pct = delta * pct_scale
+        # revenue = sum(units * price * (price / baseline) ** e)
+        revenue = (weight * (prices * inv_baseline) ** (1.0 + e)).sum(axis=1)
+
+        if n:
+            stats = {
+                "changed": (delta != 0).sum(axis=1), "up": (delta > 0).sum(axis=1), "down": (delta < 0).sum(axis=1),
+                "mean_delta": delta.mean(axis=1), "mean_delta_pct": pct.mean(axis=1),
+                "max_increase_pct": pct.max(axis=1), "max_decrease_pct": pct.min(axis=1),
+            }
+        else:
+            stats = {k: np.zeros(len(chunk), dtype=np.int64 if k in ("changed", "up", "down") else np.float64)
+                     for k in ("changed", "up", "down", "mean_delta", "mean_delta_pct",
+                               "max_increase_pct", "max_decrease_pct")}
+
+        for i, sc in enumerate(chunk):
+            summaries.append({
+                "name": sc.get("name") or ", ".join(f"{k}={v}" for k, v in sc.items() if k != "name") or "baseline",
+                "rules": {k: v for k, v in sc.items() if k != "name"},
+                **{k: v[i].item() for k, v in stats.items()},
+                "revenue": float(revenue[i]),
+                "revenue_delta": float(revenue[i] - baseline_revenue),
+                "revenue_delta_pct": float((revenue[i] - baseline_revenue) / baseline_revenue * 100) if baseline_revenue else 0.0,
+            })
+        if per_sku:
+            deltas.append(delta)
+
+    result = {
+        "baseline": {"skus": n, "with_competitors": int(has.sum()), "revenue": baseline_revenue,
+                     "elasticity": elasticity, "rules": dict(PRICING_RULES)},
+        "scenarios": summaries,
+    }
+    if per_sku:
+        result["deltas"] = np.vstack(deltas) if deltas else np.empty((0, n))
+        result["baseline_price"] = baseline
+    return result
+
+
+def write_per_sku(path: str, catalogue: Dict[str, np.ndarray], result: Dict[str, Any]):
+    """CSV: SKU, base and baseline price, then one price-delta column per scenario."""
+    names = [s["name"] for s in result["scenarios"]]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(["product_id", "base_price", "baseline_price"] + [json.dumps(n) for n in names]) + "\n")
+        for j, pid in enumerate(catalogue["product_id"]):
+            row = [str(pid), f"{catalogue['base'][j]:.2f}", f"{result['baseline_price'][j]:.2f}"]
+            row += [f"{d:.2f}" for d in result["deltas"][:, j]]
+            f.write(",".join(row) + "\n")
+
+
+# -------------------------
+# CLI
+# -------------------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="What-if repricing over the stored catalogue")
+    parser.add_argument("--scenario", action="append", default=[], help="JSON object of rule overrides (repeatable)")
+    parser.add_argument("--scenarios", help="JSON file with a list of scenario objects")
+    parser.add_argument("--grid", help='sweep, e.g. "strong_sentiment=0.75:0.9:0.05;clamp_high=1.1,1.2"')
+    parser.add_argument("--elasticity", type=float, default=DEFAULT_ELASTICITY, help="price elasticity of demand")
+    parser.add_argument("--top", type=int, default=20, help="scenarios to print, best revenue first")
+    parser.add_argument("--output", "-o", help="write all scenario summaries as JSON")
+    parser.add_argument("--per-sku", help="write per-SKU price deltas as CSV")
+    args = parser.parse_args(argv)
+
+    scenarios = [json.loads(s) for s in args.scenario]
+    if args.scenarios:
+        with open(args.scenarios, "r", encoding="utf-8") as f:
+            scenarios += json.load(f)
+    if args.grid:
+        scenarios += parse_grid(args.grid)
+    if not scenarios:
+        parser.error("give at least one --scenario, --scenarios or --grid")
+
+    start = time.perf_counter()
+    catalogue = load_catalogue()
+    loaded = time.perf_counter()
+    result = simulate(catalogue, scenarios, elasticity=args.elasticity, per_sku=bool(args.per_sku))
+    done = time.perf_counter()
+
+    base = result["baseline"]
+    print(f"{base['skus']} SKUs ({base['with_competitors']} with competitors), "
+          f"{len(scenarios)} scenarios: load {loaded - start:.2f}s, simulate {done - loaded:.2f}s")
+    print(f"baseline revenue {base['revenue']:,.2f} (elasticity {args.elasticity})\n")
+
+    for s in sorted(result["scenarios"], key=lambda s: -s["revenue_delta"])[:args.top]:
+        print(f"{s['revenue_delta_pct']:+7.2f}% revenue  {s['mean_delta_pct']:+7.2f}% avg price  "
+              f"{s['up']:5d} up {s['down']:5d} down  {s['name']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"baseline": base, "scenarios": result["scenarios"]}, f, indent=2)
+    if args.per_sku:
+        write_per_sku(args.per_sku, catalogue, result)
+
+
+if __name__ == "__main__":
+    sys.exit(main())